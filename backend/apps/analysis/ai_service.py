@@ -1,14 +1,44 @@
+import asyncio
+import functools
+import hashlib
 import json
 import logging
 import re
+import time
 
 import anthropic
+import httpx
 import openai
+import orjson
 from django.conf import settings
 
+from apps.resumes.normalize import truncate_text
+
+from . import metrics, provider_health, rate_limit
+from .compression import compress_resume, estimate_tokens, resume_excerpts
+from .providers import (
+    async_provider_slot,
+    get_async_client,
+    get_client,
+    provider_slot,
+    run_sync,
+)
+from .streaming import recover_fields
+
 logger = logging.getLogger(__name__)
 
-MAX_RESUME_CHARS = 8000
+# Model responses: every first response, truncated (max_tokens) and invalid
+# (malformed JSON or off-schema) ones, continuation requests for the fields
+# they were missing, and provider attempts that still came up short
+RESPONSE_METRIC = "response.total"
+TRUNCATED_METRIC = "response.truncated"
+INVALID_METRIC = "response.invalid"
+CONTINUATION_METRIC = "response.continuation"
+FAILED_METRIC = "response.failed"
+
+# Hard ceiling on the job description; the resume's is RESUME_MAX_CHARS,
+# shared with extraction (compress_resume() fits the resume to
+# ANALYSIS_RESUME_TOKEN_BUDGET first)
 MAX_JD_CHARS = 4000
 
 # Known prompt-injection patterns to strip before sending to the model
@@ -21,63 +51,390 @@ _INJECTION_RE = re.compile(
 
 def sanitize_text(text: str, max_length: int) -> str:
     """Truncate, HTML-encode angle brackets, and strip injection patterns."""
-    text = text[:max_length]
+    text, _ = truncate_text(text, max_length)
     text = text.replace("<", "&lt;").replace(">", "&gt;")
     text = _INJECTION_RE.sub("[removed]", text)
     return text
 
 
-def build_analysis_prompt(resume_text: str, jd_text: str) -> str:
-    safe_resume = sanitize_text(resume_text, MAX_RESUME_CHARS)
-    safe_jd = sanitize_text(jd_text, MAX_JD_CHARS)
-    return f"""You are a professional resume analyst and career coach.
-Analyze the resume against the job description provided below.
-
-<resume>
-{safe_resume}
-</resume>
-
-<job_description>
-{safe_jd}
-</job_description>
+ANALYSIS_INSTRUCTIONS = """You are a professional resume analyst and career coach.
+You will be given a resume and then a job description, followed by the parts
+of the analysis to produce.
 
 Respond with ONLY a valid JSON object — no markdown fences, no explanation, no trailing text.
-Use exactly this schema:
-{{
-  "match_score": <integer 0-100>,
-  "hire_probability": <float 0.0-1.0>,
-  "ats_flags": [<string>, ...],
-  "rewritten_bullets": [<string>, ...],
-  "cover_letter": <string>
-}}
 
 Scoring guidelines:
 - match_score: how well the resume matches the role requirements (skills, experience, keywords)
 - hire_probability: estimated probability of getting an interview call (based on match quality)
-- ats_flags: specific ATS issues — missing keywords, non-standard section headers, tables/graphics, etc.
 - rewritten_bullets: 3–5 improved bullet points from the resume, tailored to this JD with quantified impact
 - cover_letter: 3-paragraph professional cover letter addressed to the hiring team"""
 
+_FIELD_SCHEMA = {
+    "match_score": "<integer 0-100>",
+    "hire_probability": "<float 0.0-1.0>",
+    "rewritten_bullets": "[<string>, ...]",
+    "cover_letter": "<string>",
+}
+
+# ATS checks are deterministic and run locally (apps/resumes/ats.py), so the
+# model is only asked for the judgments that need it.
+
+# Independently scheduled parts of an analysis (ANALYSIS_SPLIT_SECTIONS). The
+# cheap score section is not held up by the cover letter, and each section
+# only pays for the output tokens it needs.
+ANALYSIS_SECTIONS = {
+    "score": {"fields": ("match_score", "hire_probability"), "max_tokens": 256},
+    "bullets": {"fields": ("rewritten_bullets",), "max_tokens": 1024},
+    "cover_letter": {"fields": ("cover_letter",), "max_tokens": 1536},
+}
+ANALYSIS_FIELDS = tuple(_FIELD_SCHEMA)
+
+# Types a response's fields must have, checked after parsing
+_FIELD_TYPES = {
+    "match_score": (int, float),
+    "hire_probability": (int, float),
+    "rewritten_bullets": list,
+    "cover_letter": str,
+}
+
+_SCHEMA_INTRO = (
+    "Analyze the resume above against this job description. Respond with "
+    "the JSON object only, using exactly this schema:"
+)
+
+
+@functools.lru_cache(maxsize=128)
+def resume_prompt_block(resume_text: str) -> str:
+    """
+    The sanitized resume block of the prompt. Memoized, so a resume analyzed
+    against many job descriptions (a batch) is only prepared once per process.
+    """
+    return f"<resume>\n{sanitize_text(resume_text, settings.RESUME_MAX_CHARS)}\n</resume>"
+
+
+def resume_prompt_for(resume_text: str) -> str:
+    """
+    The resume block of the prompt: the resume fitted to
+    ANALYSIS_RESUME_TOKEN_BUDGET, identical for every job description so it
+    stays in the cached prefix.
+    """
+    budget = settings.ANALYSIS_RESUME_TOKEN_BUDGET
+    return resume_prompt_block(compress_resume(resume_text, budget))
+
+
+def resume_excerpts_for(resume_text: str, jd_text: str) -> str:
+    """
+    The JD-specific part of the resume, sent after the cache breakpoint: up
+    to ANALYSIS_RESUME_EXCERPT_BUDGET tokens of the lines resume_prompt_for()
+    left out that match ``jd_text``. Empty for resumes under budget.
+    """
+    excerpts = resume_excerpts(
+        resume_text,
+        jd_text,
+        settings.ANALYSIS_RESUME_TOKEN_BUDGET,
+        settings.ANALYSIS_RESUME_EXCERPT_BUDGET,
+    )
+    if not excerpts:
+        return ""
+    return (
+        "<resume_excerpts>\nMore lines of the resume above, left out for length, "
+        f"that concern this job:\n{sanitize_text(excerpts, settings.RESUME_MAX_CHARS)}\n"
+        "</resume_excerpts>\n\n"
+    )
+
+
+def build_analysis_prompt(resume_text: str, jd_text: str, section: str | None = None) -> dict:
+    """
+    Split the prompt into its static instructions, the resume block and the
+    job description block, in that order. The first two form a prefix that
+    is identical whenever one resume is analyzed against several JDs — or
+    for every section of one analysis — so the provider can serve it from its
+    prompt cache; only the JD block, which names the fields to produce and
+    carries any resume excerpts chosen for this JD, varies.
+
+    ``section`` (a key of ANALYSIS_SECTIONS) asks for just that section's
+    fields; by default the prompt asks for the whole analysis.
+    """
+    fields = ANALYSIS_SECTIONS[section]["fields"] if section else ANALYSIS_FIELDS
+    safe_jd = sanitize_text(jd_text, MAX_JD_CHARS)
+    return {
+        "system": ANALYSIS_INSTRUCTIONS,
+        "resume": resume_prompt_for(resume_text),
+        "job_description": (
+            f"{resume_excerpts_for(resume_text, jd_text)}"
+            f"<job_description>\n{safe_jd}\n</job_description>\n\n{_schema_request(fields)}"
+        ),
+        "max_tokens": ANALYSIS_SECTIONS[section]["max_tokens"] if section else 2048,
+        "fields": fields,
+    }
+
+
+def _schema_request(fields) -> str:
+    schema = ",\n".join(f'  "{field}": {_FIELD_SCHEMA[field]}' for field in fields)
+    return f"{_SCHEMA_INTRO}\n{{\n{schema}\n}}"
+
+
+def continuation_prompt(prompt: dict, fields) -> dict:
+    """
+    ``prompt`` narrowed to ``fields`` — the ones a truncated or invalid
+    response left out. The cached instructions and resume prefix are
+    unchanged, and max_tokens is what those fields' sections allow.
+    """
+    jd_block = prompt["job_description"].rsplit(_SCHEMA_INTRO, 1)[0]
+    return {
+        **prompt,
+        "job_description": jd_block + _schema_request(fields),
+        "max_tokens": sum(
+            section["max_tokens"]
+            for section in ANALYSIS_SECTIONS.values()
+            if set(section["fields"]) & set(fields)
+        ),
+        "fields": tuple(fields),
+    }
+
+
+# Fingerprint of the prompt templates. Any edit to build_analysis_prompt, the
+# instructions or the sections changes this value, which in turn invalidates
+# every cached analysis built from it.
+PROMPT_VERSION = hashlib.sha256(
+    json.dumps(
+        [build_analysis_prompt("", "", section) for section in (None, *ANALYSIS_SECTIONS)],
+        sort_keys=True,
+    ).encode()
+).hexdigest()[:12]
+
 
-def _call_claude(prompt: str) -> str:
-    client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-    message = client.messages.create(
-        model=settings.ANTHROPIC_MODEL,
-        max_tokens=2048,
-        messages=[{"role": "user", "content": prompt}],
+def get_provider_and_model() -> tuple[str, str]:
+    """Return the configured (provider, model) pair."""
+    provider = settings.AI_PROVIDER.lower()
+    if provider == "openai":
+        return provider, settings.OPENAI_MODEL
+    return provider, settings.ANTHROPIC_MODEL
+
+
+def provider_order() -> list[str]:
+    """
+    Providers to try, primary first. The secondary is included when
+    AI_FAILOVER_ENABLED or AI_HEDGING_ENABLED is on, since a hedge needs
+    somewhere to go. Providers whose circuit breaker is open are skipped
+    unless every candidate is open, in which case the primary is tried.
+    """
+    primary, _ = get_provider_and_model()
+    order = [primary]
+    if settings.AI_FAILOVER_ENABLED or settings.AI_HEDGING_ENABLED:
+        order.append("claude" if primary == "openai" else "openai")
+    available = [p for p in order if provider_health.is_available(p)]
+    return available or [primary]
+
+
+def _claude_request(prompt: dict) -> dict:
+    """
+    Messages API arguments for ``prompt``. The cache breakpoint sits on the
+    resume block, so the instructions plus resume are cached as one prefix.
+    Prefixes shorter than the model's minimum cacheable length (about 1024
+    tokens) are simply not cached.
+    """
+    resume_block = {"type": "text", "text": prompt["resume"]}
+    request = {
+        "model": settings.ANTHROPIC_MODEL,
+        "max_tokens": prompt["max_tokens"],
+        "system": prompt["system"],
+        "messages": [{
+            "role": "user",
+            "content": [resume_block, {"type": "text", "text": prompt["job_description"]}],
+        }],
+    }
+    if settings.ANTHROPIC_PROMPT_CACHING:
+        resume_block["cache_control"] = {"type": "ephemeral"}
+        request["extra_headers"] = {"anthropic-beta": "prompt-caching-2024-07-31"}
+    return request
+
+
+def _openai_request(prompt: dict) -> dict:
+    """
+    Chat Completions arguments for ``prompt``. OpenAI caches long prompt
+    prefixes automatically, so the stable parts just have to come first.
+    """
+    return {
+        "model": settings.OPENAI_MODEL,
+        "max_tokens": prompt["max_tokens"],
+        "response_format": {"type": "json_object"},
+        "messages": [
+            {"role": "system", "content": prompt["system"]},
+            {"role": "user", "content": prompt["resume"]},
+            {"role": "user", "content": prompt["job_description"]},
+        ],
+    }
+
+
+def _claude_usage(usage) -> dict:
+    return {
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+        "cache_read_tokens": getattr(usage, "cache_read_input_tokens", None) or 0,
+        "cache_write_tokens": getattr(usage, "cache_creation_input_tokens", None) or 0,
+    }
+
+
+def _openai_usage(usage) -> dict:
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = (getattr(details, "cached_tokens", None) or 0) if details else 0
+    # prompt_tokens includes the cached ones; report them separately like Claude
+    return {
+        "input_tokens": usage.prompt_tokens - cached,
+        "output_tokens": usage.completion_tokens,
+        "cache_read_tokens": cached,
+        "cache_write_tokens": 0,
+    }
+
+
+def _add_usage(usage: dict, more: dict) -> dict:
+    return {field: usage.get(field, 0) + more.get(field, 0) for field in usage.keys() | more.keys()}
+
+
+def _reserved_tokens(prompt: dict) -> int:
+    """What a call may use of the provider's token budget: input plus max output."""
+    text = prompt["system"] + prompt["resume"] + prompt["job_description"]
+    return estimate_tokens(text) + prompt["max_tokens"]
+
+
+def _unused_tokens(reserved: int, usage: dict) -> int:
+    return reserved - sum(usage.values())
+
+
+# Errors worth retrying later: rate limits, timeouts, dropped connections and
+# provider-side 5xx/overloaded responses. Anything else (a 400, an invalid
+# response after continuation) would fail the same way again.
+_TRANSIENT_ERRORS = (
+    anthropic.RateLimitError,
+    anthropic.APIConnectionError,
+    anthropic.InternalServerError,
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+    httpx.TransportError,
+    rate_limit.RateLimitTimeout,
+)
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    return isinstance(exc, _TRANSIENT_ERRORS)
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """The provider's Retry-After hint, in seconds, if the error carries one."""
+    response = getattr(exc, "response", None)
+    try:
+        return float(response.headers["retry-after"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+
+# Provider calls return (raw text, token usage, whether max_tokens cut it off)
+
+
+def _call_claude(prompt: dict) -> tuple[str, dict, bool]:
+    with provider_slot("claude"):
+        message = get_client("claude").messages.create(**_claude_request(prompt))
+    return (
+        message.content[0].text.strip(),
+        _claude_usage(message.usage),
+        message.stop_reason == "max_tokens",
     )
-    return message.content[0].text.strip()
 
 
-def _call_openai(prompt: str) -> str:
-    client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-    response = client.chat.completions.create(
-        model=settings.OPENAI_MODEL,
-        max_tokens=2048,
-        response_format={"type": "json_object"},
-        messages=[{"role": "user", "content": prompt}],
+def _call_openai(prompt: dict) -> tuple[str, dict, bool]:
+    with provider_slot("openai"):
+        response = get_client("openai").chat.completions.create(**_openai_request(prompt))
+    choice = response.choices[0]
+    return (
+        choice.message.content.strip(),
+        _openai_usage(response.usage),
+        choice.finish_reason == "length",
+    )
+
+
+async def _acall_claude(prompt: dict) -> tuple[str, dict, bool]:
+    async with async_provider_slot("claude"):
+        message = await get_async_client("claude").messages.create(**_claude_request(prompt))
+    return (
+        message.content[0].text.strip(),
+        _claude_usage(message.usage),
+        message.stop_reason == "max_tokens",
+    )
+
+
+async def _acall_openai(prompt: dict) -> tuple[str, dict, bool]:
+    async with async_provider_slot("openai"):
+        response = await get_async_client("openai").chat.completions.create(
+            **_openai_request(prompt)
+        )
+    choice = response.choices[0]
+    return (
+        choice.message.content.strip(),
+        _openai_usage(response.usage),
+        choice.finish_reason == "length",
+    )
+
+
+def _limited_call(call, provider: str, prompt: dict) -> tuple[str, dict, bool]:
+    """``call(prompt)`` once the shared rate limiter has capacity for it."""
+    reserved = _reserved_tokens(prompt)
+    rate_limit.acquire(provider, reserved)
+    raw, usage, truncated = call(prompt)
+    rate_limit.refund(provider, _unused_tokens(reserved, usage))
+    return raw, usage, truncated
+
+
+async def _alimited_call(call, provider: str, prompt: dict) -> tuple[str, dict, bool]:
+    reserved = _reserved_tokens(prompt)
+    await rate_limit.aacquire(provider, reserved)
+    raw, usage, truncated = await call(prompt)
+    await asyncio.to_thread(rate_limit.refund, provider, _unused_tokens(reserved, usage))
+    return raw, usage, truncated
+
+
+# Streaming calls yield the completion text and fill ``outcome`` with
+# "usage" and "truncated" (whether max_tokens cut it off) once exhausted
+
+
+async def _stream_claude(prompt: dict, outcome: dict):
+    reserved = _reserved_tokens(prompt)
+    await rate_limit.aacquire("claude", reserved)
+    async with async_provider_slot("claude"):
+        async with get_async_client("claude").messages.stream(
+            **_claude_request(prompt)
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+            message = await stream.get_final_message()
+    outcome["usage"] = _claude_usage(message.usage)
+    outcome["truncated"] = message.stop_reason == "max_tokens"
+    await asyncio.to_thread(
+        rate_limit.refund, "claude", _unused_tokens(reserved, outcome["usage"])
+    )
+
+
+async def _stream_openai(prompt: dict, outcome: dict):
+    reserved = _reserved_tokens(prompt)
+    await rate_limit.aacquire("openai", reserved)
+    outcome["usage"] = {}
+    async with async_provider_slot("openai"):
+        stream = await get_async_client("openai").chat.completions.create(
+            **_openai_request(prompt),
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            if chunk.choices and chunk.choices[0].finish_reason:
+                outcome["truncated"] = chunk.choices[0].finish_reason == "length"
+            if chunk.usage:
+                outcome["usage"] = _openai_usage(chunk.usage)
+    await asyncio.to_thread(
+        rate_limit.refund, "openai", _unused_tokens(reserved, outcome["usage"])
     )
-    return response.choices[0].message.content.strip()
 
 
 def _strip_fences(text: str) -> str:
@@ -89,23 +446,265 @@ def _strip_fences(text: str) -> str:
     return text.strip()
 
 
-def run_analysis(resume_text: str, jd_text: str) -> dict:
-    """Call the configured AI provider and return the parsed JSON result dict."""
-    prompt = build_analysis_prompt(resume_text, jd_text)
-    provider = settings.AI_PROVIDER.lower()
+def _valid_fields(data: dict, fields) -> dict:
+    """The ``fields`` of ``data`` whose values match the schema's types."""
+    valid = {}
+    for field in fields:
+        value = data.get(field)
+        if isinstance(value, bool) or not isinstance(value, _FIELD_TYPES[field]):
+            continue
+        if isinstance(value, list) and not all(isinstance(item, str) for item in value):
+            continue
+        valid[field] = value
+    return valid
 
-    if provider == "openai":
-        raw = _call_openai(prompt)
-    else:
-        raw = _call_claude(prompt)
 
+def read_analysis_response(
+    raw: str, provider: str, fields=ANALYSIS_FIELDS, truncated: bool = False
+) -> tuple[dict, list]:
+    """
+    Parse a completion with orjson and check it against the schema for
+    ``fields``. A truncated or malformed completion still yields every
+    top-level field it completed. Returns (valid fields, names of the
+    requested fields that are missing or invalid).
+    """
+    if truncated:
+        metrics.incr(TRUNCATED_METRIC)
     raw = _strip_fences(raw)
     try:
-        return json.loads(raw)
-    except json.JSONDecodeError:
-        logger.error(
-            "AI (%s) returned non-JSON response (first 300 chars): %s",
+        data = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        data = None
+    if not isinstance(data, dict):
+        data = recover_fields(raw)
+    valid = _valid_fields(data, fields)
+    missing = [field for field in fields if field not in valid]
+    if missing and not truncated:
+        metrics.incr(INVALID_METRIC)
+        logger.warning(
+            "AI (%s) response is missing or has invalid %s (first 300 chars): %s",
             provider,
+            ", ".join(missing),
             raw[:300],
         )
-        raise ValueError("AI returned a non-JSON response")
+    return valid, missing
+
+
+def parse_analysis_response(raw: str, provider: str) -> dict:
+    """Parse the model's raw completion into the result dict."""
+    data, missing = read_analysis_response(raw, provider)
+    if missing:
+        raise ValueError(f"AI response is missing or has invalid {', '.join(missing)}")
+    return data
+
+
+def _incomplete(provider: str, missing: list) -> ValueError:
+    metrics.incr(FAILED_METRIC)
+    return ValueError(f"AI ({provider}) response is missing or has invalid {', '.join(missing)}")
+
+
+def _continue(
+    call, provider: str, prompt: dict, data: dict, missing: list, usage: dict
+) -> tuple[dict, dict]:
+    """
+    Request the ``missing`` fields of a truncated or invalid response again,
+    up to ANALYSIS_MAX_CONTINUATIONS times, merging them into ``data``.
+    Returns (data, total usage); raises if fields are still missing.
+    """
+    for _ in range(settings.ANALYSIS_MAX_CONTINUATIONS):
+        if not missing:
+            break
+        metrics.incr(CONTINUATION_METRIC)
+        raw, more_usage, truncated = _limited_call(
+            call, provider, continuation_prompt(prompt, missing)
+        )
+        usage = _add_usage(usage, more_usage)
+        more, missing = read_analysis_response(raw, provider, missing, truncated)
+        data.update(more)
+    if missing:
+        raise _incomplete(provider, missing)
+    return data, usage
+
+
+async def _acontinue(
+    call, provider: str, prompt: dict, data: dict, missing: list, usage: dict
+) -> tuple[dict, dict]:
+    """Async twin of _continue."""
+    for _ in range(settings.ANALYSIS_MAX_CONTINUATIONS):
+        if not missing:
+            break
+        metrics.incr(CONTINUATION_METRIC)
+        raw, more_usage, truncated = await _alimited_call(
+            call, provider, continuation_prompt(prompt, missing)
+        )
+        usage = _add_usage(usage, more_usage)
+        more, missing = read_analysis_response(raw, provider, missing, truncated)
+        data.update(more)
+    if missing:
+        raise _incomplete(provider, missing)
+    return data, usage
+
+
+def _call_provider(provider: str, prompt: dict) -> tuple[dict, dict]:
+    """
+    One provider attempt, returning (result dict, token usage). Fields a
+    truncated or invalid response left out are requested again, up to
+    ANALYSIS_MAX_CONTINUATIONS times, instead of failing the whole call.
+    Each request first waits for the shared rate limiter. Feeds latency and
+    errors to provider_health.
+    """
+    call = _call_openai if provider == "openai" else _call_claude
+    start = time.monotonic()
+    try:
+        metrics.incr(RESPONSE_METRIC)
+        raw, usage, truncated = _limited_call(call, provider, prompt)
+        data, missing = read_analysis_response(raw, provider, prompt["fields"], truncated)
+        data, usage = _continue(call, provider, prompt, data, missing, usage)
+    except Exception:
+        provider_health.record_failure(provider)
+        raise
+    provider_health.record_success(provider, time.monotonic() - start)
+    return data, usage
+
+
+async def _acall_provider(provider: str, prompt: dict) -> tuple[dict, dict]:
+    """Async twin of _call_provider. A cancelled (hedged-out) call is not a failure."""
+    call = _acall_openai if provider == "openai" else _acall_claude
+    start = time.monotonic()
+    try:
+        metrics.incr(RESPONSE_METRIC)
+        raw, usage, truncated = await _alimited_call(call, provider, prompt)
+        data, missing = read_analysis_response(raw, provider, prompt["fields"], truncated)
+        data, usage = await _acontinue(call, provider, prompt, data, missing, usage)
+    except Exception:
+        provider_health.record_failure(provider)
+        raise
+    provider_health.record_success(provider, time.monotonic() - start)
+    return data, usage
+
+
+def run_analysis(resume_text: str, jd_text: str) -> tuple[dict, str, dict]:
+    """
+    Call the configured AI provider and return (parsed JSON result dict,
+    provider that served it, token usage). Fails over to the secondary provider when
+    enabled, and hedges across both when AI_HEDGING_ENABLED is on.
+    """
+    if settings.AI_HEDGING_ENABLED:
+        return run_sync(run_analysis_async(resume_text, jd_text))
+
+    prompt = build_analysis_prompt(resume_text, jd_text)
+    last_exc = None
+    for provider in provider_order():
+        try:
+            data, usage = _call_provider(provider, prompt)
+            return data, provider, usage
+        except Exception as exc:
+            logger.warning("AI provider %s failed: %s", provider, exc)
+            last_exc = exc
+    raise last_exc
+
+
+async def run_analysis_async(
+    resume_text: str, jd_text: str, section: str | None = None
+) -> tuple[dict, str, dict]:
+    """
+    Async run_analysis, optionally for a single ``section``. With hedging on,
+    if the primary has not answered within the AI_HEDGE_PERCENTILE of its
+    recent latency the same prompt also goes to the secondary; the first
+    valid JSON wins and the other call is cancelled. An error on one provider
+    starts the next one immediately.
+    """
+    prompt = build_analysis_prompt(resume_text, jd_text, section)
+    candidates = provider_order()
+    running = {}
+    last_exc = None
+
+    def launch():
+        provider = candidates.pop(0)
+        running[asyncio.ensure_future(_acall_provider(provider, prompt))] = provider
+
+    launch()
+    try:
+        while running:
+            hedge_after = None
+            if settings.AI_HEDGING_ENABLED and candidates:
+                hedge_after = provider_health.hedge_delay(next(iter(running.values())))
+            done, _ = await asyncio.wait(
+                running, timeout=hedge_after, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                logger.info("Hedging analysis request to %s", candidates[0])
+                launch()
+                continue
+            for task in done:
+                provider = running.pop(task)
+                if task.exception() is None:
+                    data, usage = task.result()
+                    return data, provider, usage
+                logger.warning("AI provider %s failed: %s", provider, task.exception())
+                last_exc = task.exception()
+            if not running and candidates:
+                launch()
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+    raise last_exc
+
+
+async def run_analysis_sections(
+    resume_text: str, jd_text: str, on_section, sections=None
+) -> list:
+    """
+    Run the ``sections`` (default: every ANALYSIS_SECTIONS entry)
+    concurrently, awaiting ``on_section(section, data, provider, usage)`` as
+    each one finishes so it can be persisted straight away. Returns
+    [(section, exception), ...] for the sections that failed; the others are
+    unaffected.
+    """
+    sections = list(sections or ANALYSIS_SECTIONS)
+
+    async def run_one(section):
+        data, provider, usage = await run_analysis_async(resume_text, jd_text, section)
+        await on_section(section, data, provider, usage)
+
+    outcomes = await asyncio.gather(
+        *(run_one(section) for section in sections), return_exceptions=True
+    )
+    return [
+        (section, outcome)
+        for section, outcome in zip(sections, outcomes)
+        if isinstance(outcome, BaseException)
+    ]
+
+
+def stream_analysis(resume_text: str, jd_text: str, provider: str, outcome: dict):
+    """
+    Async iterator over the raw completion text from ``provider``, yielded
+    chunk by chunk as the provider's streaming API delivers it. ``outcome``
+    is filled with the token "usage" and whether max_tokens "truncated" the
+    completion once the stream is exhausted. Pass the concatenated text and
+    ``outcome`` to complete_streamed_analysis() then.
+    """
+    prompt = build_analysis_prompt(resume_text, jd_text)
+
+    if provider == "openai":
+        return _stream_openai(prompt, outcome)
+    return _stream_claude(prompt, outcome)
+
+
+async def complete_streamed_analysis(
+    raw: str, resume_text: str, jd_text: str, provider: str, outcome: dict
+) -> tuple[dict, dict]:
+    """
+    (result dict, token usage) of a streamed completion. Like a non-streamed
+    call, fields a truncated or invalid completion left out are requested
+    again (without streaming) before the analysis counts as failed.
+    """
+    prompt = build_analysis_prompt(resume_text, jd_text)
+    call = _acall_openai if provider == "openai" else _acall_claude
+    data, missing = read_analysis_response(
+        raw, provider, prompt["fields"], outcome.get("truncated", False)
+    )
+    return await _acontinue(call, provider, prompt, data, missing, outcome.get("usage", {}))
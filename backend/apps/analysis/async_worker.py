@@ -0,0 +1,290 @@
+import asyncio
+import logging
+import time
+import uuid
+
+import redis.asyncio as aioredis
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from .ai_service import is_transient_error, run_analysis_async
+from .events import get_redis_client, publish_status
+from .models import AnalysisResult
+from .queues import analysis_queues, record_queue_wait, weighted_order
+from .result_cache import get_cached_analysis, store_analysis
+from .tasks import (
+    apply_analysis_data,
+    mark_analysis_failed,
+    release_for_retry,
+    retry_countdown,
+    run_analysis_task,
+    run_sectioned_analysis,
+)
+
+logger = logging.getLogger(__name__)
+
+# Redis keys for ANALYSIS_EXECUTION_MODE = "async": a FIFO list per analysis
+# queue of "<analysis id> <enqueued at> <retries>" jobs, plus a sorted set of
+# delayed "<queue> <analysis id> <retries>" members scored by the time they
+# become due. A worker moves each job it takes onto its own processing list
+# and keeps a heartbeat key alive while it runs; the jobs of a worker whose
+# heartbeat lapsed (it crashed or was killed) are recovered by the others.
+ASYNC_QUEUE_KEY = "analysis-async:queue:{queue}"
+ASYNC_DELAYED_KEY = "analysis-async:delayed"
+ASYNC_PROCESSING_KEY = "analysis-async:processing:{worker}:{queue}"
+ASYNC_HEARTBEAT_KEY = "analysis-async:worker:{worker}"
+ASYNC_WORKERS_KEY = "analysis-async:workers"
+
+# How long an idle worker waits before polling the queues again, and how
+# often it refreshes its heartbeat, promotes due jobs and looks for lost ones
+POLL_INTERVAL = 0.5  # seconds
+HOUSEKEEPING_INTERVAL = 1  # seconds
+
+
+class WorkerLostError(Exception):
+    """The worker running an analysis stopped before finishing it."""
+
+
+def _queue_key(queue: str) -> str:
+    return ASYNC_QUEUE_KEY.format(queue=queue)
+
+
+def _processing_key(worker: str, queue: str) -> str:
+    return ASYNC_PROCESSING_KEY.format(worker=worker, queue=queue)
+
+
+def _heartbeat_key(worker: str) -> str:
+    return ASYNC_HEARTBEAT_KEY.format(worker=worker)
+
+
+def _job(analysis_id: str, enqueued_at: float, retries: int = 0) -> str:
+    return f"{analysis_id} {enqueued_at:.3f} {retries}"
+
+
+def _parse_job(job: str) -> tuple[str, float, int]:
+    # Jobs queued before retries were counted have no third field
+    analysis_id, enqueued_at, *retries = job.split(" ")
+    return analysis_id, float(enqueued_at), int(retries[0]) if retries else 0
+
+
+def push_async_job(
+    analysis_id: str, countdown: float = 0, *, queue: str, retries: int = 0
+) -> None:
+    """
+    Queue an analysis for the asyncio worker, optionally after a delay.
+    ``retries`` counts the attempts already retried, as Celery's
+    request.retries does.
+    """
+    client = get_redis_client()
+    if countdown:
+        client.zadd(
+            ASYNC_DELAYED_KEY, {f"{queue} {analysis_id} {retries}": time.time() + countdown}
+        )
+    else:
+        client.rpush(_queue_key(queue), _job(analysis_id, time.time(), retries))
+
+
+def push_async_jobs(analysis_ids: list[str], *, queue: str) -> None:
+    """Queue several analyses for the asyncio worker in one round trip."""
+    now = time.time()
+    get_redis_client().rpush(
+        _queue_key(queue), *(_job(analysis_id, now) for analysis_id in analysis_ids)
+    )
+
+
+async def process_analysis_async(analysis_id: str, queue: str, retries: int = 0) -> None:
+    """
+    Async twin of run_analysis_task. The provider call is awaited on the
+    shared event loop; DB and cache work is short and runs through
+    sync_to_async, which serialises it on Django's single DB thread.
+    A transient provider error puts the job back on ``queue`` after the
+    same backoff and up to the same number of retries as the Celery task.
+    """
+    await sync_to_async(close_old_connections)()
+
+    # Claim the row atomically — a streaming request may already own it
+    claimed = await AnalysisResult.objects.filter(
+        id=analysis_id, status=AnalysisResult.Status.PENDING, awaiting_resume=False
+    ).aupdate(status=AnalysisResult.Status.PROCESSING)
+    if not claimed:
+        logger.info("AnalysisResult %s missing or already claimed — skipped", analysis_id)
+        return
+    await sync_to_async(publish_status)(analysis_id, AnalysisResult.Status.PROCESSING)
+
+    result = None
+    try:
+        result = await AnalysisResult.objects.select_related(
+            "resume", "job_description__text"
+        ).aget(id=analysis_id)
+        resume_text = result.resume.parsed_text
+        jd_text = result.job_description.raw_text
+
+        cached = await sync_to_async(get_cached_analysis)(
+            resume_text, jd_text, record_metrics=False
+        )
+        if cached is not None:
+            await sync_to_async(apply_analysis_data)(result, cached["data"], cached["provider"])
+        elif settings.ANALYSIS_SPLIT_SECTIONS:
+            data = await run_sectioned_analysis(result, resume_text, jd_text)
+            await sync_to_async(store_analysis)(resume_text, jd_text, data, result.provider)
+        else:
+            data, provider, usage = await run_analysis_async(resume_text, jd_text)
+            await sync_to_async(apply_analysis_data)(result, data, provider, usage)
+            await sync_to_async(store_analysis)(resume_text, jd_text, data, provider)
+    except Exception as exc:
+        if (
+            result is not None
+            and is_transient_error(exc)
+            and retries < run_analysis_task.max_retries
+        ):
+            countdown = retry_countdown(retries, exc)
+            logger.warning(
+                "Analysis %s hit a transient provider error (%s); retrying in %.0fs",
+                analysis_id, exc, countdown,
+            )
+            await sync_to_async(release_for_retry)(result)
+            await sync_to_async(push_async_job)(
+                analysis_id, countdown, queue=queue, retries=retries + 1
+            )
+            return
+        logger.exception("Async analysis failed for %s", analysis_id)
+        if result is None:
+            # The row could not be loaded; release the claim directly
+            await AnalysisResult.objects.filter(id=analysis_id).aupdate(
+                status=AnalysisResult.Status.FAILED, error_message=str(exc)
+            )
+            await sync_to_async(publish_status)(analysis_id, AnalysisResult.Status.FAILED)
+        else:
+            await sync_to_async(mark_analysis_failed)(result, exc)
+
+
+async def _promote_delayed(client) -> None:
+    due = await client.zrangebyscore(ASYNC_DELAYED_KEY, 0, time.time(), withscores=True)
+    for member, due_at in due:
+        # ZREM succeeds for exactly one worker, so each id is queued once
+        if await client.zrem(ASYNC_DELAYED_KEY, member):
+            queue, analysis_id, *retries = member.decode().split(" ")
+            await client.rpush(
+                _queue_key(queue), _job(analysis_id, due_at, int(retries[0]) if retries else 0)
+            )
+
+
+async def _recover_job(client, worker: str, queue: str, job: str) -> None:
+    # ``job`` was taken by a worker that died; it is now on ``worker``'s
+    # processing list, so a crash here leaves it to be recovered again
+    analysis_id, _, retries = _parse_job(job)
+    result = await AnalysisResult.objects.filter(id=analysis_id).afirst()
+    status = result.status if result is not None else None
+    if status == AnalysisResult.Status.PENDING:
+        # Lost before it was claimed: it never ran
+        await client.rpush(_queue_key(queue), _job(analysis_id, time.time(), retries))
+    elif status == AnalysisResult.Status.PROCESSING:
+        if retries < run_analysis_task.max_retries:
+            logger.warning("Analysis %s was lost with its worker; requeued", analysis_id)
+            await sync_to_async(release_for_retry)(result)
+            await client.rpush(_queue_key(queue), _job(analysis_id, time.time(), retries + 1))
+        else:
+            await sync_to_async(mark_analysis_failed)(
+                result, WorkerLostError("The analysis worker stopped before finishing")
+            )
+    await client.lrem(_processing_key(worker, queue), 1, job)
+
+
+async def _reclaim_lost_jobs(client, worker: str) -> None:
+    """
+    Recover the jobs of workers whose heartbeat has lapsed: an unclaimed
+    analysis is queued again, a claimed one is released and retried (the
+    lost attempt counts against the retry cap) or failed once out of retries.
+    """
+    for member in await client.smembers(ASYNC_WORKERS_KEY):
+        dead = member.decode()
+        if dead == worker or await client.exists(_heartbeat_key(dead)):
+            continue
+        for queue in analysis_queues():
+            # LMOVE hands each job to exactly one recovering worker
+            while job := await client.lmove(
+                _processing_key(dead, queue), _processing_key(worker, queue), "LEFT", "RIGHT"
+            ):
+                await _recover_job(client, worker, queue, job.decode())
+        await client.srem(ASYNC_WORKERS_KEY, dead)
+
+
+async def _housekeeping(client, worker: str) -> None:
+    while True:
+        try:
+            await client.set(
+                _heartbeat_key(worker), 1, ex=settings.ANALYSIS_ASYNC_VISIBILITY_TIMEOUT
+            )
+            await _promote_delayed(client)
+            await _reclaim_lost_jobs(client, worker)
+        except Exception:
+            logger.exception("Async worker housekeeping failed")
+        await asyncio.sleep(HOUSEKEEPING_INTERVAL)
+
+
+async def _claim_job(client, worker: str, queues: list[str]) -> tuple[str, str] | None:
+    for queue in weighted_order(queues):
+        job = await client.lmove(_queue_key(queue), _processing_key(worker, queue), "LEFT", "RIGHT")
+        if job is not None:
+            return queue, job.decode()
+    return None
+
+
+async def _run_job(client, worker: str, queue: str, job: str, slots: asyncio.Semaphore) -> None:
+    analysis_id, enqueued_at, retries = _parse_job(job)
+    try:
+        await sync_to_async(record_queue_wait)(queue, enqueued_at)
+        await process_analysis_async(analysis_id, queue, retries)
+    except Exception:
+        logger.exception("Async worker crashed on analysis %s", analysis_id)
+    finally:
+        await client.lrem(_processing_key(worker, queue), 1, job)
+        slots.release()
+
+
+async def run_worker(
+    concurrency: int,
+    stop: asyncio.Event,
+    queues: list[str] | None = None,
+    client: aioredis.Redis | None = None,
+) -> None:
+    """
+    Consume the async analysis ``queues`` (default: all of them), keeping up
+    to ``concurrency`` analyses in flight on this process's event loop until
+    ``stop`` is set. Each free slot polls the queues in weighted_order().
+    In-flight analyses are allowed to finish before returning.
+    """
+    queues = queues or analysis_queues()
+    own_client = client is None
+    if own_client:
+        client = aioredis.Redis.from_url(settings.REDIS_URL)
+    worker = uuid.uuid4().hex
+    await client.set(_heartbeat_key(worker), 1, ex=settings.ANALYSIS_ASYNC_VISIBILITY_TIMEOUT)
+    await client.sadd(ASYNC_WORKERS_KEY, worker)
+    housekeeping = asyncio.create_task(_housekeeping(client, worker))
+    slots = asyncio.Semaphore(concurrency)
+    in_flight = set()
+    try:
+        while not stop.is_set():
+            await slots.acquire()
+            claimed = await _claim_job(client, worker, queues)
+            if claimed is None:
+                slots.release()
+                try:
+                    await asyncio.wait_for(stop.wait(), POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            task = asyncio.create_task(_run_job(client, worker, *claimed, slots))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+    finally:
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+        housekeeping.cancel()
+        await asyncio.gather(housekeeping, return_exceptions=True)
+        await client.srem(ASYNC_WORKERS_KEY, worker)
+        await client.delete(_heartbeat_key(worker))
+        if own_client:
+            await client.aclose()
@@ -0,0 +1,292 @@
+import io
+import json
+import logging
+
+import httpx
+from anthropic.types import Message
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from openai.types.chat import ChatCompletion
+
+from . import ai_service
+from .events import publish_status
+from .models import AnalysisResult, BulkJob
+from .providers import get_client
+from .result_cache import store_analysis
+from .tasks import USAGE_FIELDS, fill_analysis_data, mark_analysis_failed, record_usage
+
+logger = logging.getLogger(__name__)
+
+# Offline bulk mode: pending analyses with execution_mode=bulk are sent
+# through the providers' batch APIs (about half the per-token price and a
+# separate rate limit) instead of one request each. Results arrive within
+# the provider's completion window, typically minutes to hours.
+
+_RESULT_FIELDS = [
+    "match_score",
+    "hire_probability",
+    "rewritten_bullets",
+    "cover_letter",
+    "provider",
+    "status",
+    "completed_at",
+    "error_message",
+    *USAGE_FIELDS,
+]
+
+_BATCHES_BETA = {"anthropic-beta": "message-batches-2024-09-24"}
+
+
+class BulkBatchFailed(Exception):
+    """The provider reports the whole batch as failed, expired or cancelled."""
+
+
+def _prompt(result: AnalysisResult) -> dict:
+    return ai_service.build_analysis_prompt(
+        result.resume.parsed_text, result.job_description.raw_text
+    )
+
+
+def _claude_params(result: AnalysisResult) -> dict:
+    params = ai_service._claude_request(_prompt(result))
+    params.pop("extra_headers", None)
+    return params
+
+
+def _openai_body(result: AnalysisResult) -> dict:
+    return ai_service._openai_request(_prompt(result))
+
+
+def _submit_claude(results: list) -> str:
+    requests = [
+        {"custom_id": str(result.id), "params": _claude_params(result)} for result in results
+    ]
+    response = get_client("claude").post(
+        "/v1/messages/batches",
+        body={"requests": requests},
+        cast_to=httpx.Response,
+        options={"headers": _BATCHES_BETA},
+    )
+    return response.json()["id"]
+
+
+def _submit_openai(results: list) -> str:
+    lines = [
+        json.dumps({
+            "custom_id": str(result.id),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": _openai_body(result),
+        })
+        for result in results
+    ]
+    client = get_client("openai")
+    upload = client.files.create(
+        file=("analyses.jsonl", io.BytesIO("\n".join(lines).encode())),
+        purpose="batch",
+    )
+    batch = client.batches.create(
+        input_file_id=upload.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    return batch.id
+
+
+def submit_bulk_analyses(limit: int | None = None) -> BulkJob | None:
+    """
+    Claim up to ``limit`` (default ANALYSIS_BULK_MAX_REQUESTS) pending bulk
+    analyses and submit them as one provider batch. Returns the BulkJob, or
+    None when nothing was pending.
+    """
+    limit = limit or settings.ANALYSIS_BULK_MAX_REQUESTS
+    provider, _ = ai_service.get_provider_and_model()
+
+    with transaction.atomic():
+        ids = list(
+            AnalysisResult.objects.select_for_update(skip_locked=True)
+            .filter(
+                execution_mode=AnalysisResult.ExecutionMode.BULK,
+                status=AnalysisResult.Status.PENDING,
+                awaiting_resume=False,
+            )
+            .order_by("created_at")
+            .values_list("id", flat=True)[:limit]
+        )
+        if not ids:
+            return None
+        job = BulkJob.objects.create(provider=provider, request_count=len(ids))
+        AnalysisResult.objects.filter(id__in=ids).update(
+            status=AnalysisResult.Status.PROCESSING, bulk_job=job
+        )
+
+    results = list(
+        AnalysisResult.objects.select_related("resume", "job_description__text").filter(
+            bulk_job=job
+        )
+    )
+    try:
+        submit = _submit_openai if provider == "openai" else _submit_claude
+        job.provider_batch_id = submit(results)
+    except Exception as exc:
+        logger.exception("Bulk submission of %d analyses failed", len(results))
+        # Hand the rows back so the next run retries them
+        AnalysisResult.objects.filter(bulk_job=job).update(
+            status=AnalysisResult.Status.PENDING, bulk_job=None
+        )
+        job.status = BulkJob.Status.FAILED
+        job.error_message = str(exc)
+        job.completed_at = timezone.now()
+        job.save(update_fields=["status", "error_message", "completed_at"])
+        raise
+    job.save(update_fields=["provider_batch_id"])
+    logger.info("Submitted %d analyses as %s batch %s", len(results), provider, job.provider_batch_id)
+    return job
+
+
+def _fetch_claude(job: BulkJob) -> dict | None:
+    """
+    {custom_id: (raw text, usage, whether max_tokens cut it off) or error
+    message}, or None while running.
+    """
+    client = get_client("claude")
+    batch = client.get(
+        f"/v1/messages/batches/{job.provider_batch_id}",
+        cast_to=httpx.Response,
+        options={"headers": _BATCHES_BETA},
+    ).json()
+    if batch["processing_status"] != "ended":
+        return None
+
+    body = client.get(
+        batch["results_url"], cast_to=httpx.Response, options={"headers": _BATCHES_BETA}
+    ).text
+    outcomes = {}
+    for line in body.splitlines():
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        result = item["result"]
+        if result["type"] == "succeeded":
+            message = Message.model_validate(result["message"])
+            outcomes[item["custom_id"]] = (
+                message.content[0].text.strip(),
+                ai_service._claude_usage(message.usage),
+                message.stop_reason == "max_tokens",
+            )
+        else:
+            error = result.get("error") or {}
+            outcomes[item["custom_id"]] = f"Batch request {result['type']}: {error}"
+    return outcomes
+
+
+def _fetch_openai(job: BulkJob) -> dict | None:
+    """
+    {custom_id: (raw text, usage, whether max_tokens cut it off) or error
+    message}, or None while running.
+    """
+    client = get_client("openai")
+    batch = client.batches.retrieve(job.provider_batch_id)
+    if batch.status in ("validating", "in_progress", "finalizing", "cancelling"):
+        return None
+    if batch.status != "completed" and not batch.output_file_id:
+        raise BulkBatchFailed(f"OpenAI batch {batch.id} {batch.status}")
+
+    outcomes = {}
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if not file_id:
+            continue
+        for line in client.files.content(file_id).text.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            response = item.get("response") or {}
+            if response.get("status_code") == 200:
+                completion = ChatCompletion.model_validate(response["body"])
+                outcomes[item["custom_id"]] = (
+                    completion.choices[0].message.content.strip(),
+                    ai_service._openai_usage(completion.usage),
+                    completion.choices[0].finish_reason == "length",
+                )
+            else:
+                outcomes[item["custom_id"]] = f"Batch request failed: {item.get('error') or response}"
+    return outcomes
+
+
+def collect_bulk_job(job: BulkJob) -> bool:
+    """
+    Poll one submitted job; once the provider batch has ended, write every
+    result back with a single bulk_update, then finish the ones that errored
+    or came back incomplete through mark_analysis_failed(). Returns True when
+    the job is done.
+    """
+    fetch = _fetch_openai if job.provider == "openai" else _fetch_claude
+    try:
+        outcomes = fetch(job)
+    except BulkBatchFailed as exc:
+        logger.error("Bulk job %s failed: %s", job.id, exc)
+        outcomes = {}
+        job.status = BulkJob.Status.FAILED
+        job.error_message = str(exc)
+    except Exception:
+        # Network or API hiccup — the batch is still there; try again next poll
+        logger.warning("Could not poll bulk job %s", job.id, exc_info=True)
+        return False
+    if outcomes is None:
+        return False
+
+    results = list(
+        AnalysisResult.objects.select_related("resume", "job_description__text").filter(
+            bulk_job=job, status=AnalysisResult.Status.PROCESSING
+        )
+    )
+    to_cache, failed = [], []
+    for result in results:
+        outcome = outcomes.get(str(result.id), job.error_message or "Missing from batch output")
+        if isinstance(outcome, str):
+            failed.append((result, Exception(outcome)))
+            continue
+        raw, usage, truncated = outcome
+        data, missing = ai_service.read_analysis_response(raw, job.provider, truncated=truncated)
+        if not missing:
+            fill_analysis_data(result, data, job.provider, usage)
+            to_cache.append((result, data))
+            continue
+        # Keep the fields the completion did deliver; mark_analysis_failed()
+        # decides whether they stand as a degraded result
+        for field, value in data.items():
+            setattr(result, field, value)
+        result.provider = job.provider
+        for field in USAGE_FIELDS:
+            setattr(result, field, usage.get(field, 0))
+        record_usage(usage)
+        failed.append((result, ai_service._incomplete(job.provider, missing)))
+
+    with transaction.atomic():
+        AnalysisResult.objects.bulk_update(results, _RESULT_FIELDS, batch_size=500)
+        if job.status != BulkJob.Status.FAILED:
+            job.status = BulkJob.Status.ENDED
+        job.completed_at = timezone.now()
+        job.save(update_fields=["status", "error_message", "completed_at"])
+
+    # Failures are finished one by one, as interactive ones are: with the
+    # local pre-score as a degraded result when there is one
+    for result, exc in failed:
+        mark_analysis_failed(result, exc)
+    for result, data in to_cache:
+        store_analysis(result.resume.parsed_text, result.job_description.raw_text, data, job.provider)
+        publish_status(result.id, result.status)
+    logger.info("Bulk job %s wrote back %d analyses", job.id, len(results))
+    return True
+
+
+def poll_bulk_jobs() -> int:
+    """Collect every submitted job whose batch has ended; returns how many finished."""
+    finished = 0
+    for job in BulkJob.objects.filter(status=BulkJob.Status.SUBMITTED).exclude(
+        provider_batch_id=""
+    ):
+        if collect_bulk_job(job):
+            finished += 1
+    return finished
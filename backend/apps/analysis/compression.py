@@ -0,0 +1,209 @@
+import functools
+import re
+from collections import Counter
+
+from apps.resumes.ats import REQUIRED_SECTIONS
+
+from .prescore import _terms, jd_keyword_vector, tokenize
+
+# Fits a parsed resume into the prompt's token budget. Resumes under budget
+# only lose boilerplate. Longer resumes keep their most recent lines and
+# the lines of the sections that matter most, instead of being cut off at a
+# fixed character count. The choice never depends on the job description,
+# so the resume block stays one prompt-cache prefix for every JD; the lines
+# it left out that matter for a particular JD are added after the prefix
+# (resume_excerpts).
+
+_WORD_RE = re.compile(r"\w+|[^\w\s]")
+
+OMITTED_MARKER = "[…]"
+
+SECTION_HEADERS = frozenset().union(*REQUIRED_SECTIONS.values()) | frozenset({
+    "summary", "professional summary", "profile", "objective", "about me", "projects",
+    "certifications", "certificates", "awards", "publications", "languages",
+    "volunteering", "volunteer experience", "interests", "hobbies", "references",
+    "achievements", "leadership", "training", "courses", "contact",
+})
+
+_BOILERPLATE_RE = re.compile(
+    r"^(references (are )?available (up)?on request\.?|page \d+( of \d+)?|\d+|curriculum vitae|resume)$",
+    re.IGNORECASE,
+)
+# Sections that cost tokens without informing a match
+_LOW_VALUE_SECTIONS = frozenset({"references", "interests", "hobbies"})
+
+# Value of a line by its section, before recency
+_SECTION_WEIGHTS = {
+    **dict.fromkeys(REQUIRED_SECTIONS["Experience"] | REQUIRED_SECTIONS["Skills"], 1.0),
+    **dict.fromkeys(REQUIRED_SECTIONS["Education"], 0.5),
+    **dict.fromkeys(("summary", "professional summary", "profile", "projects"), 0.6),
+}
+_DEFAULT_SECTION_WEIGHT = 0.3
+# Lines earlier in a section (the latest role) get up to this much extra value
+_RECENCY_BONUS = 1.0
+# Share of the budget reserved for the header block (name, contact, title)
+_HEADER_SHARE = 0.1
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Local token estimate: one token per word or punctuation mark, plus one
+    per further eight characters of long words. Within about 10% of the
+    provider tokenizers on English resumes.
+    """
+    return sum(1 + (len(piece) - 1) // 8 for piece in _WORD_RE.findall(text))
+
+
+def _header_name(line: str) -> str | None:
+    if len(line) > 40:
+        return None
+    name = " ".join(re.sub(r"[^a-z ]", " ", line.rstrip(":").replace("&", " and ").lower()).split())
+    if name in SECTION_HEADERS:
+        return name
+    if line.isupper() and len(line.split()) <= 4 and not line.endswith("."):
+        return name
+    return None
+
+
+def split_sections(text: str) -> list[dict]:
+    """
+    Split a resume into [{"header": line or None, "name": ..., "lines": [...]}],
+    dropping blank lines, boilerplate and repeats of lines that occur on
+    every page.
+    """
+    lines = [line.strip() for line in text.splitlines()]
+    counts = Counter(line for line in lines if line)
+    sections = [{"header": None, "name": "", "lines": []}]
+    seen = set()
+    for line in lines:
+        if not line or _BOILERPLATE_RE.match(line):
+            continue
+        # Page headers/footers repeat; real content rarely does verbatim
+        if counts[line] > 2 and line in seen:
+            continue
+        seen.add(line)
+        name = _header_name(line)
+        if name is not None:
+            sections.append({"header": line, "name": name, "lines": []})
+        else:
+            sections[-1]["lines"].append(line)
+    return [s for s in sections if s["lines"] or s["header"]]
+
+
+def _join(sections: list[dict]) -> str:
+    out = []
+    for section in sections:
+        if section["header"]:
+            out.append(section["header"])
+        out.extend(section["lines"])
+    return "\n".join(out)
+
+
+def _relevance(line: str, weights: dict) -> float:
+    return sum(weights.get(term, 0.0) for term in set(_terms(tokenize(line))))
+
+
+@functools.lru_cache(maxsize=256)
+def _select(resume_text: str, budget: int) -> tuple[list[dict], list[set] | None]:
+    """
+    The resume's sections and, per section, the indexes of the lines kept
+    within ``budget`` (None when everything fits). Lines are ranked by their
+    section's weight plus a recency bonus for their position in the section.
+    """
+    sections = split_sections(resume_text)
+    if estimate_tokens(_join(sections)) <= budget:
+        return sections, None
+
+    # (value density, section index, line index, tokens)
+    candidates = []
+    # Every section may need a marker
+    used = estimate_tokens(OMITTED_MARKER) * len(sections)
+    keep = [set() for _ in sections]
+    for s, section in enumerate(sections):
+        if section["header"]:
+            used += estimate_tokens(section["header"])
+        if section["header"] is None:
+            # Name, contact details and title come first; keep them in order
+            header_used = 0
+            for i, line in enumerate(section["lines"]):
+                cost = estimate_tokens(line)
+                if cost > budget * _HEADER_SHARE - header_used:
+                    break
+                keep[s].add(i)
+                header_used += cost
+            used += header_used
+            continue
+        if section["name"] in _LOW_VALUE_SECTIONS:
+            continue
+        weight = _SECTION_WEIGHTS.get(section["name"], _DEFAULT_SECTION_WEIGHT)
+        count = len(section["lines"])
+        for i, line in enumerate(section["lines"]):
+            cost = estimate_tokens(line)
+            value = weight + _RECENCY_BONUS * (1 - i / count)
+            candidates.append((value / cost, s, i, cost))
+
+    for _, s, i, cost in sorted(candidates, key=lambda c: -c[0]):
+        if used + cost <= budget:
+            keep[s].add(i)
+            used += cost
+    return sections, keep
+
+
+@functools.lru_cache(maxsize=256)
+def compress_resume(resume_text: str, budget: int) -> str:
+    """
+    Return the resume within ``budget`` estimated tokens, the same whatever
+    the job description. Under budget, only boilerplate is removed. Over
+    budget, the best-ranked lines (_select) are kept in their original
+    order; a section that lost lines ends with OMITTED_MARKER.
+    """
+    sections, keep = _select(resume_text, budget)
+    if keep is None:
+        return _join(sections)
+
+    out = []
+    for s, section in enumerate(sections):
+        if not keep[s]:
+            continue
+        if section["header"]:
+            out.append(section["header"])
+        out.extend(line for i, line in enumerate(section["lines"]) if i in keep[s])
+        if len(keep[s]) < len(section["lines"]):
+            out.append(OMITTED_MARKER)
+    return "\n".join(out)
+
+
+@functools.lru_cache(maxsize=256)
+def resume_excerpts(resume_text: str, jd_text: str, budget: int, excerpt_budget: int) -> str:
+    """
+    The lines compress_resume() left out that mention ``jd_text``'s
+    keywords, the most relevant per token first, within ``excerpt_budget``
+    estimated tokens and in their original order. Empty for resumes under
+    ``budget``.
+    """
+    sections, keep = _select(resume_text, budget)
+    if keep is None or excerpt_budget <= 0:
+        return ""
+    vector = jd_keyword_vector(jd_text)
+    weights = dict(zip(vector["terms"], vector["weights"]))
+    candidates = []
+    for s, section in enumerate(sections):
+        for i, line in enumerate(section["lines"]):
+            if i in keep[s]:
+                continue
+            relevance = _relevance(line, weights)
+            if relevance > 0:
+                cost = estimate_tokens(line)
+                candidates.append((relevance / cost, s, i, cost))
+
+    chosen, used = set(), 0
+    for _, s, i, cost in sorted(candidates, key=lambda c: -c[0]):
+        if used + cost <= excerpt_budget:
+            chosen.add((s, i))
+            used += cost
+    return "\n".join(
+        line
+        for s, section in enumerate(sections)
+        for i, line in enumerate(section["lines"])
+        if (s, i) in chosen
+    )
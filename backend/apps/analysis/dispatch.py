@@ -0,0 +1,146 @@
+import logging
+import time
+from collections import defaultdict
+
+from celery import chain
+from django.conf import settings
+from django.db import transaction
+
+from apps.resumes.ats import keyword_flags, resume_ats_flags
+from apps.resumes.models import Resume
+
+from .async_worker import push_async_job, push_async_jobs
+from .events import publish_status
+from .models import AnalysisResult
+from .near_duplicates import find_near_duplicate, reusable_data
+from .prescore import prescore
+from .queues import queue_for
+from .result_cache import get_cached_analysis
+from .tasks import (
+    fill_analysis_data,
+    mark_analysis_failed,
+    run_analysis_task,
+    start_analysis_group,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_analysis(
+    analysis_id: str, countdown: float = 0, origin: str = AnalysisResult.Origin.PAID
+) -> None:
+    """
+    Hand an analysis to the configured executor: a Celery prefork worker
+    (default) or the asyncio worker (ANALYSIS_EXECUTION_MODE = "async"), on
+    the queue for its ``origin``.
+    """
+    queue = queue_for(origin)
+    if settings.ANALYSIS_EXECUTION_MODE == "async":
+        push_async_job(analysis_id, countdown=countdown, queue=queue)
+        return
+    kwargs = {"queue": queue, "enqueued_at": time.time() + countdown}
+    run_analysis_task.apply_async((analysis_id,), kwargs, countdown=countdown or None, queue=queue)
+
+
+def enqueue_analyses(analysis_ids: list[str], origin: str = AnalysisResult.Origin.BATCH) -> None:
+    """
+    Fan a batch of analyses of the same resume out to the executor. Under
+    Celery the first one runs on its own before the rest start as a group, so
+    it writes the resume prefix to the provider's prompt cache and the others
+    read it instead of each paying to write it.
+    """
+    if not analysis_ids:
+        return
+    queue = queue_for(origin)
+    if settings.ANALYSIS_EXECUTION_MODE == "async":
+        push_async_jobs(analysis_ids, queue=queue)
+        return
+    kwargs = {"queue": queue, "enqueued_at": time.time()}
+    first, rest = analysis_ids[0], analysis_ids[1:]
+    if not rest:
+        run_analysis_task.apply_async((first,), kwargs, queue=queue)
+        return
+    # The rest are only sent once the first finishes, and their queue wait is
+    # measured from then
+    chain(
+        run_analysis_task.si(first, **kwargs).set(queue=queue),
+        start_analysis_group.si(rest, queue).set(queue=queue),
+    ).apply_async()
+
+
+def prefill_analysis(result: AnalysisResult, resume_flags: list[str]) -> None:
+    """
+    Set a new result's local pre-score and ATS flags (``resume_flags`` plus
+    its missing keywords), and answer it from the result cache or an
+    analysis of a near-duplicate JD when there is one, without saving. The
+    pre-score is returned immediately, and is the fallback if the provider
+    call fails.
+    """
+    resume, job_desc = result.resume, result.job_description
+    result.provisional_score, result.missing_keywords = prescore(
+        resume.parsed_text, job_desc.raw_text, job_desc.text.keywords
+    )
+    result.ats_flags = [*resume_flags, *keyword_flags(result.missing_keywords)]
+    # Identical resume/JD pairs (retries, double clicks, "run again") are
+    # answered from the result cache without touching the provider.
+    cached = get_cached_analysis(resume.parsed_text, job_desc.raw_text)
+    if cached is not None:
+        fill_analysis_data(result, cached["data"], cached["provider"])
+        return
+    # The same posting pasted again with small edits reuses its analysis
+    earlier = find_near_duplicate(resume, job_desc)
+    if earlier is not None:
+        result.reused_from = earlier
+        fill_analysis_data(result, reusable_data(earlier), earlier.provider)
+
+
+def release_awaiting_analyses(resume_id: int) -> None:
+    """
+    Start the analyses created while ``resume_id`` was still being parsed,
+    now that its parse_status is final: pre-score and enqueue them like a
+    new analysis once the text is in, or fail them if parsing failed. Each
+    result is claimed before it is touched, so running this twice (the
+    resume_parsed signal racing a view that just created a result) starts
+    it once.
+    """
+    resume = Resume.objects.get(id=resume_id)
+    if resume.parse_status not in (Resume.ParseStatus.DONE, Resume.ParseStatus.FAILED):
+        return
+    released = []
+    for result in AnalysisResult.objects.select_related("job_description__text").filter(
+        resume=resume, awaiting_resume=True
+    ):
+        claimed = AnalysisResult.objects.filter(id=result.id, awaiting_resume=True).update(
+            awaiting_resume=False
+        )
+        if claimed:
+            result.resume = resume
+            result.awaiting_resume = False
+            released.append(result)
+    if not released:
+        return
+    logger.info("Releasing %d analyses waiting on resume %s", len(released), resume_id)
+
+    if resume.parse_status == Resume.ParseStatus.FAILED:
+        for result in released:
+            mark_analysis_failed(result, Exception(resume.parse_error or "Resume could not be parsed"))
+        return
+
+    resume_flags = resume_ats_flags(resume)
+    queued = defaultdict(list)
+    with transaction.atomic():
+        for result in released:
+            prefill_analysis(result, resume_flags)
+            result.save()
+            if result.status != AnalysisResult.Status.PENDING:
+                publish_status(result.id, result.status)
+            elif result.execution_mode == AnalysisResult.ExecutionMode.INTERACTIVE:
+                # Bulk-mode results are picked up by submit_bulk_analyses
+                queued[result.origin].append(str(result.id))
+
+    for origin, ids in queued.items():
+        if origin == AnalysisResult.Origin.BATCH:
+            enqueue_analyses(ids, origin=origin)
+        else:
+            for analysis_id in ids:
+                enqueue_analysis(analysis_id, origin=origin)
@@ -0,0 +1,74 @@
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+
+import redis
+import redis.asyncio as aioredis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_client = None
+
+
+def status_channel(analysis_id) -> str:
+    return f"analysis-status:{analysis_id}"
+
+
+def get_redis_client() -> redis.Redis:
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.REDIS_URL)
+    return _client
+
+
+def publish_status(analysis_id, status: str, **extra) -> None:
+    """
+    Announce an AnalysisResult status transition on its pub/sub channel.
+    ``extra`` is sent along with it, e.g. the fields of a finished section.
+    Best-effort: subscribers re-read the row on connect, so a lost message
+    only delays a client until its next reconnect.
+    """
+    try:
+        get_redis_client().publish(
+            status_channel(analysis_id),
+            json.dumps({"status": status, **extra}, default=str),
+        )
+    except redis.RedisError:
+        logger.warning("Could not publish status for analysis %s", analysis_id, exc_info=True)
+
+
+@asynccontextmanager
+async def status_subscription(analysis_id):
+    """Async context manager yielding a PubSub subscribed to one analysis."""
+    client = aioredis.Redis.from_url(settings.REDIS_URL)
+    pubsub = client.pubsub()
+    try:
+        await pubsub.subscribe(status_channel(analysis_id))
+        yield pubsub
+    finally:
+        await pubsub.aclose()
+        await client.aclose()
+
+
+async def iter_status_messages(pubsub, heartbeat: float, max_duration: float):
+    """
+    Yield each published status message (a dict with at least "status") as it
+    arrives, or None after each ``heartbeat`` seconds of silence, until
+    ``max_duration`` elapses.
+    """
+    deadline = time.monotonic() + max_duration
+    beat_at = time.monotonic() + heartbeat
+    while (now := time.monotonic()) < deadline:
+        message = await pubsub.get_message(
+            ignore_subscribe_messages=True, timeout=min(beat_at, deadline) - now
+        )
+        if message is not None:
+            yield json.loads(message["data"])
+            beat_at = time.monotonic() + heartbeat
+        elif time.monotonic() >= beat_at:
+            # get_message() also returns None early for the subscribe
+            # confirmation; only real silence earns a heartbeat
+            yield None
+            beat_at = time.monotonic() + heartbeat
@@ -0,0 +1,354 @@
+import email.policy
+import json
+import re
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for the Anthropic and OpenAI HTTP APIs, used by benchmarks
+# and for running the pipeline without network access. Point
+# ANTHROPIC_BASE_URL at http://host:port and OPENAI_BASE_URL at
+# http://host:port/v1 to use it.
+
+SAMPLE_ANALYSIS = {
+    "match_score": 72,
+    "hire_probability": 0.41,
+    "ats_flags": [
+        "Missing keyword: Kubernetes",
+        "Non-standard section header 'Where I've Worked'; use 'Experience'",
+        "Two-column layout may be read out of order by ATS parsers",
+        "Inconsistent date formats: 'Jan 2020' and '03/2021'",
+    ],
+    "rewritten_bullets": [
+        "Cut API p95 latency 38% by introducing connection pooling across 12 services",
+    ],
+    "cover_letter": "Dear Hiring Team,\n\nI am excited to apply...",
+}
+
+
+def _approx_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _text_of(content) -> str:
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content)
+
+
+_SCHEMA_KEY_RE = re.compile(r'^\s*"(\w+)":', re.MULTILINE)
+
+
+def _requested_fields(messages: list) -> list[str]:
+    """Field names of the JSON schema the prompt's last message asks for."""
+    text = _text_of(messages[-1]["content"]) if messages else ""
+    _, _, schema = text.rpartition("schema:")
+    return _SCHEMA_KEY_RE.findall(schema)
+
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+    # Avoid Nagle/delayed-ACK stalls on reused connections
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _send_json(self, payload: dict, status: int = 200) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_text(self, text: str, content_type: str = "application/jsonl") -> None:
+        body = text.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if self.path.endswith("/files"):
+            request = self._read_multipart()
+        else:
+            request = self._read_json()
+        if not self.path.endswith(("/batches", "/files")):
+            time.sleep(self.server.latency)
+        try:
+            self._respond(request)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client cancelled the call (e.g. a hedged-out request)
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if "/messages/batches/" in path:
+            batch_id, _, tail = path.split("/messages/batches/", 1)[1].partition("/")
+            batch = self.server.batches.get(batch_id)
+            if batch is None:
+                return self._not_found()
+            if tail == "results":
+                return self._send_text(self._batch_results(batch))
+            return self._send_json(self._claude_batch(batch))
+        if "/batches/" in path:
+            batch = self.server.batches.get(path.rsplit("/", 1)[1])
+            if batch is None:
+                return self._not_found()
+            return self._send_json(self._openai_batch(batch))
+        if path.endswith("/content") and "/files/" in path:
+            file_id = path.split("/files/", 1)[1].rsplit("/", 1)[0]
+            if file_id not in self.server.files:
+                return self._not_found()
+            return self._send_text(self.server.files[file_id])
+        self._not_found()
+
+    def _not_found(self) -> None:
+        self._send_json({"error": {"message": f"Unknown path {self.path}"}}, status=404)
+
+    def _read_multipart(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        message = BytesParser(policy=email.policy.HTTP).parsebytes(
+            f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + raw
+        )
+        fields = {}
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            fields[name] = part.get_payload(decode=True).decode()
+        return fields
+
+    def _cache_lookup(self, prefix: str) -> bool:
+        """True if ``prefix`` was seen before; remembers it either way."""
+        with self.server.cache_lock:
+            hit = prefix in self.server.prompt_cache
+            self.server.prompt_cache.add(prefix)
+        return hit
+
+    def _output(self, request: dict) -> tuple[str, int]:
+        """
+        The canned analysis restricted to the fields the prompt asks for, and
+        its token count. With ``server.output_tps`` set, waits as long as a
+        model would take to generate that many tokens.
+        """
+        fields = _requested_fields(request.get("messages", []))
+        analysis = self.server.analysis
+        text = json.dumps({f: analysis[f] for f in fields if f in analysis} or analysis)
+        tokens = _approx_tokens(text)
+        if self.server.output_tps:
+            time.sleep(tokens / self.server.output_tps)
+        return text, tokens
+
+    def _claude_usage(self, request: dict, output_tokens: int) -> dict:
+        # Mimic Anthropic prompt caching: everything up to the last block
+        # marked with cache_control is the cacheable prefix
+        parts = [_text_of(request.get("system", ""))]
+        cached_upto = 0
+        for message in request.get("messages", []):
+            content = message["content"]
+            blocks = [{"text": content}] if isinstance(content, str) else content
+            for block in blocks:
+                parts.append(block.get("text", ""))
+                if "cache_control" in block:
+                    cached_upto = len(parts)
+        total = _approx_tokens("".join(parts))
+        usage = {"input_tokens": total, "output_tokens": output_tokens}
+        if cached_upto:
+            prefix_tokens = _approx_tokens("".join(parts[:cached_upto]))
+            hit = self._cache_lookup("".join(parts[:cached_upto]))
+            usage["input_tokens"] = total - prefix_tokens
+            usage["cache_read_input_tokens"] = prefix_tokens if hit else 0
+            usage["cache_creation_input_tokens"] = 0 if hit else prefix_tokens
+        return usage
+
+    def _openai_usage(self, request: dict, output_tokens: int) -> dict:
+        # Mimic OpenAI automatic caching of every message but the last
+        messages = request.get("messages", [])
+        prefix = "".join(_text_of(m["content"]) for m in messages[:-1])
+        total = _approx_tokens("".join(_text_of(m["content"]) for m in messages))
+        cached = _approx_tokens(prefix) if prefix and self._cache_lookup(prefix) else 0
+        return {
+            "prompt_tokens": total,
+            "completion_tokens": output_tokens,
+            "total_tokens": total + output_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached},
+        }
+
+    def _claude_message(self, request: dict) -> dict:
+        text, output_tokens = self._output(request)
+        return {
+            "id": f"msg_{uuid.uuid4().hex}",
+            "type": "message",
+            "role": "assistant",
+            "model": request.get("model", "fake"),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": self._claude_usage(request, output_tokens),
+        }
+
+    def _openai_completion(self, request: dict) -> dict:
+        text, output_tokens = self._output(request)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }],
+            "usage": self._openai_usage(request, output_tokens),
+        }
+
+    # --- Batch APIs: a batch ends ``server.batch_latency`` seconds after creation
+
+    def _create_batch(self, requests: list, **extra) -> dict:
+        batch = {
+            "id": uuid.uuid4().hex,
+            "created_at": time.time(),
+            "requests": requests,
+            **extra,
+        }
+        self.server.batches[batch["id"]] = batch
+        return batch
+
+    def _batch_ended(self, batch: dict) -> bool:
+        return time.time() - batch["created_at"] >= self.server.batch_latency
+
+    def _batch_results(self, batch: dict) -> str:
+        if "results" not in batch:
+            lines = []
+            for item in batch["requests"]:
+                if batch["kind"] == "claude":
+                    result = {"type": "succeeded", "message": self._claude_message(item["params"])}
+                    lines.append({"custom_id": item["custom_id"], "result": result})
+                else:
+                    lines.append({
+                        "id": f"batch_req_{uuid.uuid4().hex}",
+                        "custom_id": item["custom_id"],
+                        "response": {
+                            "status_code": 200,
+                            "request_id": uuid.uuid4().hex,
+                            "body": self._openai_completion(item["body"]),
+                        },
+                        "error": None,
+                    })
+            batch["results"] = "".join(json.dumps(line) + "\n" for line in lines)
+        return batch["results"]
+
+    def _claude_batch(self, batch: dict) -> dict:
+        ended = self._batch_ended(batch)
+        count = len(batch["requests"])
+        return {
+            "id": batch["id"],
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else count,
+                "succeeded": count if ended else 0,
+                "errored": 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "created_at": batch["created_at"],
+            "results_url": f"/v1/messages/batches/{batch['id']}/results" if ended else None,
+        }
+
+    def _openai_batch(self, batch: dict) -> dict:
+        ended = self._batch_ended(batch)
+        output_file_id = None
+        if ended:
+            output_file_id = batch.setdefault("output_file_id", f"file-{uuid.uuid4().hex}")
+            self.server.files[output_file_id] = self._batch_results(batch)
+        count = len(batch["requests"])
+        return {
+            "id": batch["id"],
+            "object": "batch",
+            "endpoint": batch["endpoint"],
+            "input_file_id": batch["input_file_id"],
+            "completion_window": "24h",
+            "status": "completed" if ended else "in_progress",
+            "created_at": int(batch["created_at"]),
+            "output_file_id": output_file_id,
+            "error_file_id": None,
+            "request_counts": {
+                "total": count,
+                "completed": count if ended else 0,
+                "failed": 0,
+            },
+        }
+
+    def _respond(self, request: dict) -> None:
+        if self.path.endswith("/messages/batches"):
+            batch = self._create_batch(request["requests"], kind="claude")
+            self._send_json(self._claude_batch(batch))
+        elif self.path.endswith("/messages"):
+            self._send_json(self._claude_message(request))
+        elif self.path.endswith("/chat/completions"):
+            self._send_json(self._openai_completion(request))
+        elif self.path.endswith("/files"):
+            file_id = f"file-{uuid.uuid4().hex}"
+            self.server.files[file_id] = request["file"]
+            self._send_json({
+                "id": file_id,
+                "object": "file",
+                "bytes": len(request["file"]),
+                "created_at": int(time.time()),
+                "filename": "batch.jsonl",
+                "purpose": request.get("purpose", "batch"),
+                "status": "processed",
+            })
+        elif self.path.endswith("/batches"):
+            lines = self.server.files.get(request["input_file_id"], "").splitlines()
+            batch = self._create_batch(
+                [json.loads(line) for line in lines if line.strip()],
+                kind="openai",
+                endpoint=request["endpoint"],
+                input_file_id=request["input_file_id"],
+            )
+            self._send_json(self._openai_batch(batch))
+        else:
+            self._not_found()
+
+
+class FakeProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # benchmarks open hundreds of connections at once
+
+
+def start_fake_provider(
+    latency: float = 0.0,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    batch_latency: float = 0.0,
+    output_tps: float = 0.0,
+):
+    """
+    Serve the fake provider API on a background thread. Besides single calls
+    it implements the Anthropic Message Batches and OpenAI Files/Batch
+    endpoints; a batch ends ``batch_latency`` seconds after it is created.
+    Responses contain only the fields the prompt's schema asks for; a
+    non-zero ``output_tps`` adds generation time at that many tokens/second.
+    Returns the server; its base URL is http://host:server.server_port.
+    Call server.shutdown() when done.
+    """
+    server = FakeProviderServer((host, port), FakeProviderHandler)
+    server.latency = latency
+    server.analysis = SAMPLE_ANALYSIS
+    server.prompt_cache = set()
+    server.cache_lock = threading.Lock()
+    server.batch_latency = batch_latency
+    server.output_tps = output_tps
+    server.batches = {}
+    server.files = {}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,52 @@
+import hashlib
+
+from .models import JobDescriptionText
+from .near_duplicates import index_texts
+from .prescore import build_keyword_vector
+
+# Job description text is stored once per content hash in
+# JobDescriptionText and shared by every JobDescription that submits it, so
+# re-submitting a posting adds a small row instead of another copy of the
+# text. Data derived from the text (keyword vector, MinHash signature, LSH
+# bands) is computed once and kept on the shared row.
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def prepare_texts(texts: list[JobDescriptionText]) -> None:
+    """Compute and save the derived data of (saved) text rows."""
+    for text in texts:
+        text.keywords = build_keyword_vector(text.text)
+    index_texts(texts)
+    JobDescriptionText.objects.bulk_update(texts, ["keywords", "minhash"])
+
+
+def texts_for(raw_texts: list[str]) -> list[JobDescriptionText]:
+    """
+    The shared JobDescriptionText row for each of ``raw_texts``, in order,
+    creating and preparing rows for texts not stored yet.
+    """
+    hashes = [text_hash(text) for text in raw_texts]
+    rows = {row.sha256: row for row in JobDescriptionText.objects.filter(sha256__in=set(hashes))}
+    new = {digest: text for digest, text in zip(hashes, raw_texts) if digest not in rows}
+    if new:
+        # A concurrent request may insert the same text; its row wins
+        JobDescriptionText.objects.bulk_create(
+            [JobDescriptionText(sha256=digest, text=text) for digest, text in new.items()],
+            ignore_conflicts=True,
+        )
+        rows.update(
+            (row.sha256, row) for row in JobDescriptionText.objects.filter(sha256__in=list(new))
+        )
+    # Also covers rows a concurrent request has not prepared yet, and rows
+    # from before the derived data existed
+    unprepared = [row for row in rows.values() if row.minhash is None]
+    if unprepared:
+        prepare_texts(unprepared)
+    return [rows[digest] for digest in hashes]
+
+
+def text_for(raw_text: str) -> JobDescriptionText:
+    return texts_for([raw_text])[0]
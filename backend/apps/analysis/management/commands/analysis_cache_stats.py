@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+
+from apps.analysis import ai_service, metrics
+from apps.analysis.near_duplicates import NEAR_DUPLICATE_HIT_METRIC
+from apps.analysis.result_cache import HIT_METRIC, MISS_METRIC
+from apps.analysis.tasks import USAGE_FIELDS
+
+
+class Command(BaseCommand):
+    help = (
+        "Print analysis result cache hit/miss counters and provider token "
+        "usage, including prompt-cache reads and writes, and how often model "
+        "responses were truncated, invalid, continued or failed. Counters live in the "
+        "\"analysis\" cache: with the per-process LocMemCache used in dev they "
+        "only reflect lookups made by this process, so run against Redis for "
+        "real numbers."
+    )
+
+    def handle(self, *args, **options):
+        counters = metrics.get_counters(HIT_METRIC, MISS_METRIC)
+        hits, misses = counters[HIT_METRIC], counters[MISS_METRIC]
+        lookups = hits + misses
+        ratio = hits / lookups if lookups else 0.0
+        near = metrics.get_counters(NEAR_DUPLICATE_HIT_METRIC)[NEAR_DUPLICATE_HIT_METRIC]
+        self.stdout.write(
+            f"hits={hits} misses={misses} hit_ratio={ratio:.1%} near_duplicate_hits={near}"
+        )
+
+        tokens = metrics.get_counters(*(f"tokens.{field}" for field in USAGE_FIELDS))
+        usage = {field: tokens[f"tokens.{field}"] for field in USAGE_FIELDS}
+        prompt_tokens = (
+            usage["input_tokens"] + usage["cache_read_tokens"] + usage["cache_write_tokens"]
+        )
+        read_ratio = usage["cache_read_tokens"] / prompt_tokens if prompt_tokens else 0.0
+        self.stdout.write(
+            " ".join(f"{field}={value}" for field, value in usage.items())
+            + f" prompt_cache_read_ratio={read_ratio:.1%}"
+        )
+
+        names = {
+            "truncated": ai_service.TRUNCATED_METRIC,
+            "invalid": ai_service.INVALID_METRIC,
+            "continuations": ai_service.CONTINUATION_METRIC,
+            "failed": ai_service.FAILED_METRIC,
+        }
+        responses = metrics.get_counters(ai_service.RESPONSE_METRIC, *names.values())
+        total = responses[ai_service.RESPONSE_METRIC]
+        self.stdout.write(
+            f"responses={total} "
+            + " ".join(
+                f"{label}={responses[name]} ({responses[name] / total if total else 0.0:.1%})"
+                for label, name in names.items()
+            )
+        )
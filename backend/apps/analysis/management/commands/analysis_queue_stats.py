@@ -0,0 +1,43 @@
+import redis
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.analysis import metrics
+from apps.analysis.async_worker import ASYNC_QUEUE_KEY
+from apps.analysis.events import get_redis_client
+from apps.analysis.queues import WAIT_BUCKETS, analysis_queues, wait_metric_names
+
+
+class Command(BaseCommand):
+    help = (
+        "Print per-queue analysis wait times (jobs, mean wait and a histogram "
+        "of how long analyses sat in the queue before a worker started them) "
+        "and the current queue depth, to size each worker pool. Counters live "
+        "in the \"analysis\" cache, so run against Redis for real numbers."
+    )
+
+    def handle(self, *args, **options):
+        for queue in analysis_queues():
+            names = wait_metric_names(queue)
+            counters = metrics.get_counters(*names)
+            jobs, wait_ms, buckets = counters[names[0]], counters[names[1]], names[2:]
+            mean = wait_ms / jobs / 1000 if jobs else 0.0
+            labels = [f"<={bound}s" for bound in WAIT_BUCKETS] + [f">{WAIT_BUCKETS[-1]}s"]
+            histogram = " ".join(
+                f"{label}={counters[name] / jobs if jobs else 0.0:.0%}"
+                for label, name in zip(labels, buckets)
+            )
+            self.stdout.write(
+                f"{queue:<22} depth={self._depth(queue):>5} jobs={jobs} "
+                f"mean_wait={mean:.1f}s {histogram}"
+            )
+
+    def _depth(self, queue: str) -> str:
+        key = ASYNC_QUEUE_KEY.format(queue=queue)
+        if settings.ANALYSIS_EXECUTION_MODE != "async":
+            # Celery's Redis transport keeps each queue in a list of its name
+            key = queue
+        try:
+            return str(get_redis_client().llen(key))
+        except redis.RedisError:
+            return "?"
@@ -0,0 +1,116 @@
+import asyncio
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from apps.analysis import ai_service
+from apps.analysis.fake_provider import start_fake_provider
+
+
+def _memory_kb() -> dict:
+    """Peak RSS and current PSS of this process, from /proc."""
+    usage = {"rss": 0, "pss": 0}
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                usage["rss"] = int(line.split()[1])
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    usage["pss"] = int(line.split()[1])
+    except OSError:
+        pass
+    return usage
+
+
+def _prefork_worker(provider, prompt, calls, queue):
+    # Like a Celery prefork child: one blocking provider call at a time
+    for _ in range(calls):
+        ai_service._call_provider(provider, prompt)
+    queue.put(_memory_kb())
+
+
+def _async_worker(provider, prompt, calls, concurrency, queue):
+    async def main():
+        slots = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with slots:
+                await ai_service._acall_provider(provider, prompt)
+
+        await asyncio.gather(*(one() for _ in range(calls)))
+
+    asyncio.run(main())
+    queue.put(_memory_kb())
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent analysis throughput and memory of the Celery prefork "
+        "model (one process per in-flight call) with the asyncio worker (one "
+        "process, many calls) against a stubbed provider with fixed latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--provider", choices=["claude", "openai"], default="claude")
+        parser.add_argument("--analyses", type=int, default=400)
+        parser.add_argument("--concurrency", type=int, default=100)
+        parser.add_argument(
+            "--latency", type=float, default=1.0, help="Stub provider latency (seconds)."
+        )
+
+    def handle(self, *args, **options):
+        provider = options["provider"]
+        concurrency = options["concurrency"]
+        analyses = options["analyses"]
+        server = start_fake_provider(latency=options["latency"])
+        base_url = f"http://127.0.0.1:{server.server_port}"
+        prompt = ai_service.build_analysis_prompt("Senior Python engineer. " * 200, "Django role. " * 100)
+        ctx = multiprocessing.get_context("fork")
+
+        try:
+            with override_settings(
+                ANTHROPIC_BASE_URL=base_url,
+                OPENAI_BASE_URL=f"{base_url}/v1",
+                ANTHROPIC_API_KEY="bench",
+                OPENAI_API_KEY="bench",
+                ANTHROPIC_MAX_CONCURRENCY=concurrency,
+                OPENAI_MAX_CONCURRENCY=concurrency,
+            ):
+                per_process = -(-analyses // concurrency)
+                prefork = self._run(
+                    ctx,
+                    [(_prefork_worker, (provider, prompt, per_process)) for _ in range(concurrency)],
+                )
+                asyncio_ = self._run(
+                    ctx, [(_async_worker, (provider, prompt, analyses, concurrency))]
+                )
+        finally:
+            server.shutdown()
+
+        total_prefork = per_process * concurrency
+        for label, count, (elapsed, memory, processes) in (
+            (f"prefork x{concurrency}", total_prefork, prefork),
+            ("asyncio x1", analyses, asyncio_),
+        ):
+            self.stdout.write(
+                f"{label:<14} {count / elapsed:8.1f} analyses/s  "
+                f"processes={processes:<4} peak RSS={memory['rss'] / 1024:8.1f}MB  "
+                f"PSS={memory['pss'] / 1024:8.1f}MB"
+            )
+
+    def _run(self, ctx, jobs):
+        queue = ctx.Queue()
+        procs = [ctx.Process(target=target, args=(*args, queue)) for target, args in jobs]
+        start = time.perf_counter()
+        for proc in procs:
+            proc.start()
+        usages = [queue.get() for _ in procs]
+        elapsed = time.perf_counter() - start
+        for proc in procs:
+            proc.join()
+        memory = {key: sum(u[key] for u in usages) for key in ("rss", "pss")}
+        return elapsed, memory, len(procs)
@@ -0,0 +1,115 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from apps.analysis import ai_service, providers
+from apps.analysis.fake_provider import start_fake_provider
+from apps.resumes.ats import check_resume
+
+SAMPLE_RESUME = """Jane Doe
+jane@example.com | +1 (555) 123-4567
+
+Summary
+Backend engineer with eight years of Python experience.
+
+Work Experience
+Senior Engineer, Acme — Jan 2020 to 03/2023
+""" + "- Built and operated Django services handling 40k requests per minute\n" * 30 + """
+Education
+BSc Computer Science, Sep 2012 to Jun 2016
+
+Skills
+Python, Django, PostgreSQL, Redis, Celery, Docker
+"""
+SAMPLE_LAYOUT = {"tables": 1, "columns": 2, "images": 0, "text_boxes": 0}
+SAMPLE_JD = "Senior backend engineer: Python, Django, Kubernetes, AWS. " * 40
+
+# What the prompt used to ask for before the checks moved to apps/resumes/ats.py
+_MODEL_ATS_INSTRUCTION = (
+    "\n- ats_flags: specific ATS issues — missing keywords, non-standard section "
+    "headers, tables/graphics, etc."
+)
+_MODEL_ATS_SCHEMA = ',\n  "ats_flags": [<string>, ...]\n}'
+
+
+def _with_model_ats(prompt: dict) -> dict:
+    return {
+        **prompt,
+        "system": prompt["system"] + _MODEL_ATS_INSTRUCTION,
+        "job_description": prompt["job_description"].replace("\n}", _MODEL_ATS_SCHEMA),
+        "max_tokens": prompt["max_tokens"] + 256,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure what running the ATS checks locally saves per analysis: the "
+        "local check time, and the tokens and latency of prompts with and "
+        "without model-generated ats_flags against a local mock API."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--provider", choices=["claude", "openai"], default="claude")
+        parser.add_argument("--calls", type=int, default=20)
+        parser.add_argument(
+            "--output-tps",
+            type=float,
+            default=60.0,
+            help="Simulated model generation speed (output tokens per second).",
+        )
+
+    def handle(self, *args, **options):
+        runs = 2000
+        start = time.perf_counter()
+        for _ in range(runs):
+            check_resume(SAMPLE_RESUME, SAMPLE_LAYOUT)
+        local_us = (time.perf_counter() - start) / runs * 1e6
+        self.stdout.write(f"local ATS checks: {local_us:.1f}µs per resume")
+
+        provider = options["provider"]
+        server = start_fake_provider(output_tps=options["output_tps"])
+        base_url = f"http://127.0.0.1:{server.server_port}"
+        call = ai_service._call_openai if provider == "openai" else ai_service._call_claude
+        try:
+            with override_settings(
+                AI_PROVIDER=provider,
+                ANTHROPIC_BASE_URL=base_url,
+                OPENAI_BASE_URL=f"{base_url}/v1",
+                ANTHROPIC_API_KEY="bench",
+                OPENAI_API_KEY="bench",
+            ):
+                providers._reset_after_fork()
+                for label, section in (("score section", "score"), ("full analysis", None)):
+                    prompt = ai_service.build_analysis_prompt(SAMPLE_RESUME, SAMPLE_JD, section)
+                    before = self._run(call, _with_model_ats(prompt), options["calls"])
+                    after = self._run(call, prompt, options["calls"])
+                    self._report(label, before, after)
+        finally:
+            server.shutdown()
+
+    def _run(self, call, prompt, calls):
+        latencies, usage = [], {}
+        for _ in range(calls):
+            start = time.perf_counter()
+            _, usage, _ = call(prompt)
+            latencies.append((time.perf_counter() - start) * 1000)
+        tokens_in = usage["input_tokens"] + usage["cache_read_tokens"] + usage["cache_write_tokens"]
+        return {
+            "latency": statistics.mean(latencies),
+            "input": tokens_in,
+            "output": usage["output_tokens"],
+        }
+
+    def _report(self, label, before, after):
+        for name, run in (("model ATS", before), ("local ATS", after)):
+            self.stdout.write(
+                f"{label:<14} {name:<10} in={run['input']:5d} out={run['output']:4d} "
+                f"tokens  mean={run['latency']:8.1f}ms"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"{label}: saved {before['input'] - after['input']} input and "
+            f"{before['output'] - after['output']} output tokens, "
+            f"{before['latency'] - after['latency']:.1f}ms per call"
+        ))
@@ -0,0 +1,75 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from apps.analysis import ai_service, providers
+from apps.analysis.fake_provider import start_fake_provider
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark per-call latency of a fresh provider client per call (the old "
+        "behaviour) against the pooled client registry, using a local mock API."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--provider", choices=["claude", "openai"], default="claude")
+        parser.add_argument("--calls", type=int, default=200)
+        parser.add_argument(
+            "--latency", type=float, default=0.0, help="Simulated server latency (seconds)."
+        )
+
+    def handle(self, *args, **options):
+        provider = options["provider"]
+        server = start_fake_provider(latency=options["latency"])
+        base_url = f"http://127.0.0.1:{server.server_port}"
+        prompt = ai_service.build_analysis_prompt("Senior Python engineer. " * 200, "Django role. " * 100)
+
+        try:
+            with override_settings(
+                AI_PROVIDER=provider,
+                ANTHROPIC_BASE_URL=base_url,
+                OPENAI_BASE_URL=f"{base_url}/v1",
+                ANTHROPIC_API_KEY="bench",
+                OPENAI_API_KEY="bench",
+            ):
+                fresh = self._run(lambda: self._call_fresh(provider, prompt), options["calls"])
+                providers._reset_after_fork()
+                call = ai_service._call_openai if provider == "openai" else ai_service._call_claude
+                pooled = self._run(lambda: call(prompt), options["calls"])
+        finally:
+            server.shutdown()
+
+        for label, samples in (("fresh client", fresh), ("pooled client", pooled)):
+            self.stdout.write(
+                f"{label:<14} mean={statistics.mean(samples):7.2f}ms "
+                f"p50={_percentile(samples, 50):7.2f}ms p95={_percentile(samples, 95):7.2f}ms"
+            )
+        saved = statistics.mean(fresh) - statistics.mean(pooled)
+        self.stdout.write(self.style.SUCCESS(f"saved per call: {saved:.2f}ms (mean)"))
+
+    def _call_fresh(self, provider, prompt):
+        client = providers._build_client(provider, is_async=False)
+        try:
+            if provider == "openai":
+                client.chat.completions.create(**ai_service._openai_request(prompt))
+            else:
+                client.messages.create(**ai_service._claude_request(prompt))
+        finally:
+            client.close()
+
+    def _run(self, fn, calls):
+        fn()  # warm-up
+        samples = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - start) * 1000)
+        return samples
@@ -0,0 +1,123 @@
+import random
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.analysis.ai_service import sanitize_text
+from apps.analysis.compression import compress_resume, estimate_tokens, resume_excerpts
+from apps.analysis.prescore import _terms, jd_keyword_vector, prescore, tokenize
+
+# Previous behaviour: the resume was cut at this many characters
+TRUNCATE_AT = 8000
+
+SKILLS = [
+    "Python", "Django", "PostgreSQL", "Kubernetes", "AWS", "React", "TypeScript", "Kafka",
+    "Terraform", "Spark", "Airflow", "Redis", "Go", "Java", "GraphQL", "Snowflake",
+]
+VERBS = ["Built", "Led", "Migrated", "Designed", "Scaled", "Automated", "Cut costs of", "Owned"]
+THINGS = [
+    "the billing platform", "a real-time analytics pipeline", "the customer API",
+    "internal tooling", "the search service", "a reporting dashboard", "the mobile backend",
+]
+FILLER = [
+    "Mentored interns and ran the weekly reading group",
+    "Organised the team offsite and quarterly hackathon",
+    "Took part in hiring loops and onboarding",
+    "Presented at the company all-hands",
+]
+
+
+def _bullet(rng) -> str:
+    skills = " and ".join(rng.sample(SKILLS, 2))
+    return f"- {rng.choice(VERBS)} {rng.choice(THINGS)} with {skills}, serving {rng.randint(2, 90)}k users"
+
+
+def _resume(rng, roles: int) -> str:
+    lines = ["Alex Candidate", "alex@example.com | +1 555 010 0199", "", "SUMMARY",
+             "Engineer with a decade of backend and data experience.", "", "EXPERIENCE"]
+    for role in range(roles):
+        if role and role % 3 == 0:
+            lines += ["Alex Candidate — Resume", f"Page {role // 3 + 1}"]
+        lines.append(f"Senior Engineer, Company {role} ({2024 - 2 * role - 2} - {2024 - 2 * role})")
+        for _ in range(rng.randint(4, 9)):
+            lines.append(_bullet(rng) if rng.random() < 0.7 else f"- {rng.choice(FILLER)}")
+    lines += ["", "EDUCATION", "BSc Computer Science", "", "SKILLS", ", ".join(SKILLS),
+              "", "HOBBIES", "Climbing, chess, sourdough", "", "References available upon request"]
+    return "\n".join(lines)
+
+
+def _jd(rng) -> str:
+    skills = ", ".join(rng.sample(SKILLS, 5))
+    return (
+        f"We are hiring a senior engineer. Must have: {skills}. "
+        f"You will own {rng.choice(THINGS)} and {rng.choice(THINGS)}."
+    )
+
+
+def build_corpus(seed: int = 13, size: int = 60) -> list[tuple[str, str]]:
+    """Fixed (resume, JD) pairs from one to thirty roles long."""
+    rng = random.Random(seed)
+    return [(_resume(rng, 1 + i % 30), _jd(rng)) for i in range(size)]
+
+
+def _keywords_lost(text: str, full_text: str, jd: str) -> int:
+    """JD keywords the full resume mentions but ``text`` does not."""
+    jd_terms = set(jd_keyword_vector(jd)["terms"])
+    present = jd_terms & set(_terms(tokenize(text)))
+    return len((jd_terms & set(_terms(tokenize(full_text)))) - present)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare prompt resume tokens and match-score drift of blind truncation "
+        "at 8000 characters against compression, over a fixed synthetic "
+        "corpus: the JD-independent compressed resume alone (the cached "
+        "prefix) and with the JD-specific excerpts sent after it. Without "
+        "model calls, stability is measured locally: JD keywords the prompt "
+        "loses relative to the full resume, and drift of the keyword pre-score."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--budget", type=int, default=settings.ANALYSIS_RESUME_TOKEN_BUDGET)
+        parser.add_argument(
+            "--excerpt-budget", type=int, default=settings.ANALYSIS_RESUME_EXCERPT_BUDGET
+        )
+        parser.add_argument("--seed", type=int, default=13)
+
+    def handle(self, *args, **options):
+        budget = options["budget"]
+        corpus = build_corpus(options["seed"])
+        names = ("truncated", "prefix", "prefix+excerpts")
+        rows = {name: [] for name in names}
+        drift = {name: [] for name in names}
+        lost = {name: [] for name in names}
+        elapsed = 0.0
+        for resume, jd in corpus:
+            full_score, _ = prescore(resume, jd)
+            start = time.perf_counter()
+            prefix = compress_resume(resume, budget)
+            excerpts = resume_excerpts(resume, jd, budget, options["excerpt_budget"])
+            elapsed += time.perf_counter() - start
+            for name, text in (
+                ("truncated", sanitize_text(resume, TRUNCATE_AT)),
+                ("prefix", prefix),
+                ("prefix+excerpts", f"{prefix}\n{excerpts}"),
+            ):
+                rows[name].append(estimate_tokens(text))
+                drift[name].append(abs(prescore(text, jd)[0] - full_score))
+                lost[name].append(_keywords_lost(text, resume, jd))
+
+        self.stdout.write(f"{len(corpus)} resume/JD pairs, budget {budget} tokens")
+        for name in rows:
+            self.stdout.write(
+                f"{name:<15} tokens mean={statistics.mean(rows[name]):7.1f} "
+                f"max={max(rows[name]):5d}  keywords lost={sum(lost[name]):3d}  "
+                f"score drift mean={statistics.mean(drift[name]):5.2f} max={max(drift[name]):3d}"
+            )
+        saved = 1 - sum(rows["prefix+excerpts"]) / sum(rows["truncated"])
+        self.stdout.write(self.style.SUCCESS(
+            f"prompt resume tokens {-saved:+.1%}; "
+            f"compression {elapsed / len(corpus) * 1000:.2f}ms per resume"
+        ))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from apps.analysis.jd_texts import prepare_texts
+from apps.analysis.models import JobDescriptionText
+
+
+class Command(BaseCommand):
+    help = (
+        "Compute the keyword vectors, MinHash signatures and LSH band keys of "
+        "stored job description texts that do not have them yet (rows from "
+        "before migration 0011), in primary-key chunks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        last_id, indexed = 0, 0
+        while True:
+            chunk = list(
+                JobDescriptionText.objects.filter(id__gt=last_id, minhash__isnull=True)
+                .order_by("id")
+                .only("id", "text")[: options["chunk_size"]]
+            )
+            if not chunk:
+                break
+            prepare_texts(chunk)
+            last_id = chunk[-1].id
+            indexed += len(chunk)
+            self.stdout.write(f"indexed {indexed} job description texts (last id {last_id})")
+        self.stdout.write(self.style.SUCCESS(f"Done: {indexed} job description texts indexed"))
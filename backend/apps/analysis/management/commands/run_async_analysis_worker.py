@@ -0,0 +1,46 @@
+import asyncio
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.analysis.async_worker import run_worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the asyncio analysis worker: one event loop multiplexing many "
+        "provider calls (ANALYSIS_EXECUTION_MODE=async)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.ANALYSIS_ASYNC_CONCURRENCY,
+            help="Maximum analyses in flight in this process.",
+        )
+        parser.add_argument(
+            "--queues",
+            default="",
+            help=(
+                "Comma-separated analysis queues to consume (default: all), "
+                "polled by ANALYSIS_QUEUE_WEIGHTS."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        queues = [queue for queue in options["queues"].split(",") if queue]
+        asyncio.run(self._main(options["concurrency"], queues))
+
+    async def _main(self, concurrency, queues):
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        self.stdout.write(
+            f"Async analysis worker started (concurrency={concurrency}, "
+            f"queues={','.join(queues) or 'all'})"
+        )
+        await run_worker(concurrency, stop, queues)
+        self.stdout.write("Async analysis worker stopped")
@@ -0,0 +1,46 @@
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.analysis.bulk import poll_bulk_jobs, submit_bulk_analyses
+
+
+class Command(BaseCommand):
+    help = (
+        "Submit pending bulk-mode analyses through the provider batch API and "
+        "write back finished batches. Runs until stopped, or once with --once "
+        "(e.g. from a nightly cron job)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="Submit and poll a single time, then exit."
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=settings.ANALYSIS_BULK_POLL_INTERVAL,
+            help="Seconds between polls.",
+        )
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda signum, frame: stop.set())
+
+        while True:
+            self._tick()
+            if options["once"] or stop.wait(options["interval"]):
+                break
+
+    def _tick(self):
+        try:
+            while job := submit_bulk_analyses():
+                self.stdout.write(f"Submitted {job.request_count} analyses as bulk job {job.id}")
+        except Exception as exc:
+            self.stderr.write(f"Bulk submission failed: {exc}")
+        finished = poll_bulk_jobs()
+        if finished:
+            self.stdout.write(f"Wrote back {finished} finished bulk job(s)")
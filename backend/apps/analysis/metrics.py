@@ -0,0 +1,29 @@
+import logging
+
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+METRICS_CACHE_ALIAS = "analysis"
+_KEY_PREFIX = "metrics:"
+
+
+def incr(name: str, amount: int = 1) -> None:
+    """
+    Increment a process-independent counter stored in the analysis cache.
+    Metrics are best-effort — a cache outage must never fail an analysis.
+    """
+    cache = caches[METRICS_CACHE_ALIAS]
+    key = _KEY_PREFIX + name
+    try:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key, amount)
+    except Exception:
+        logger.warning("Could not increment metric %s", name, exc_info=True)
+
+
+def get_counters(*names: str) -> dict:
+    """Return the current value of each named counter (0 if never incremented)."""
+    cache = caches[METRICS_CACHE_ALIAS]
+    values = cache.get_many([_KEY_PREFIX + name for name in names])
+    return {name: values.get(_KEY_PREFIX + name, 0) for name in names}
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.14 on 2026-10-18 14:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("analysis", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="analysisresult",
+            name="provider",
+            field=models.CharField(
+                blank=True,
+                help_text="AI provider that served the result",
+                max_length=20,
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.14 on 2026-10-18 14:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analysis", "0002_analysisresult_provider"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="analysisresult",
+            name="cache_read_tokens",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="analysisresult",
+            name="cache_write_tokens",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="analysisresult",
+            name="input_tokens",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="analysisresult",
+            name="output_tokens",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.0.14 on 2026-10-18 14:34
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analysis", "0004_analysisbatch"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BulkJob",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("provider", models.CharField(max_length=20)),
+                ("provider_batch_id", models.CharField(blank=True, max_length=255)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("submitted", "Submitted"),
+                            ("ended", "Ended"),
+                            ("failed", "Failed"),
+                        ],
+                        default="submitted",
+                        max_length=20,
+                    ),
+                ),
+                ("request_count", models.PositiveIntegerField(default=0)),
+                ("error_message", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("completed_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.AddField(
+            model_name="analysisresult",
+            name="execution_mode",
+            field=models.CharField(
+                choices=[("interactive", "Interactive"), ("bulk", "Bulk")],
+                default="interactive",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="analysisresult",
+            name="bulk_job",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="results",
+                to="analysis.bulkjob",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 14:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analysis", "0005_bulkjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="analysisresult",
+            name="sections",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
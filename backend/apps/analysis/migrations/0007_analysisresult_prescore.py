@@ -0,0 +1,30 @@
+# Generated by Django 5.0.14 on 2026-10-18 14:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analysis", "0006_analysisresult_sections"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="analysisresult",
+            name="is_degraded",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="analysisresult",
+            name="missing_keywords",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name="analysisresult",
+            name="provisional_score",
+            field=models.PositiveSmallIntegerField(
+                blank=True, help_text="0–100", null=True
+            ),
+        ),
+    ]
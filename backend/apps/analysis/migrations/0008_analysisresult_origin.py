@@ -0,0 +1,27 @@
+# Generated by Django 5.0.14 on 2026-10-18 14:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analysis", "0007_analysisresult_prescore"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="analysisresult",
+            name="origin",
+            field=models.CharField(
+                choices=[
+                    ("paid", "Paid single analysis"),
+                    ("staff", "Staff"),
+                    ("batch", "Batch"),
+                    ("backfill", "Backfill"),
+                ],
+                default="paid",
+                max_length=20,
+            ),
+        ),
+    ]
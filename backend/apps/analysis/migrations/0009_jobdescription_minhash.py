@@ -0,0 +1,53 @@
+# Generated by Django 5.0.14 on 2026-10-18 15:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analysis", "0008_analysisresult_origin"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="analysisresult",
+            name="reused_from",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="analysis.analysisresult",
+            ),
+        ),
+        migrations.AddField(
+            model_name="jobdescription",
+            name="minhash",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="JobDescriptionBand",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.BigIntegerField(db_index=True)),
+                (
+                    "job_description",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="minhash_bands",
+                        to="analysis.jobdescription",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,74 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analysis", "0009_jobdescription_minhash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobDescriptionText",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sha256", models.CharField(max_length=64, unique=True)),
+                ("text", models.TextField()),
+                ("keywords", models.JSONField(blank=True, null=True)),
+                ("minhash", models.BinaryField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="jobdescription",
+            name="text",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="job_descriptions",
+                to="analysis.jobdescriptiontext",
+            ),
+        ),
+        # Band keys now belong to the shared text; index_job_descriptions
+        # rebuilds them once 0011 has filled in the text rows
+        migrations.DeleteModel(
+            name="JobDescriptionBand",
+        ),
+        migrations.CreateModel(
+            name="JobDescriptionBand",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.BigIntegerField(db_index=True)),
+                (
+                    "text",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="minhash_bands",
+                        to="analysis.jobdescriptiontext",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("text", "key"), name="unique_jd_text_band"),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,79 @@
+import hashlib
+
+from django.db import migrations
+
+CHUNK_SIZE = 2000
+
+
+def dedupe_texts(apps, schema_editor):
+    """
+    Point every JobDescription at a JobDescriptionText row holding its
+    raw_text, creating one row per distinct text. Runs in primary-key chunks,
+    each committed on its own, so a large table is never held in memory or
+    in one transaction, and an interrupted run resumes where it stopped.
+    """
+    JobDescription = apps.get_model("analysis", "JobDescription")
+    JobDescriptionText = apps.get_model("analysis", "JobDescriptionText")
+
+    last_id = 0
+    while True:
+        chunk = list(
+            JobDescription.objects.filter(id__gt=last_id, text__isnull=True)
+            .order_by("id")
+            .only("id", "raw_text")[:CHUNK_SIZE]
+        )
+        if not chunk:
+            break
+        hashes = {jd.id: hashlib.sha256(jd.raw_text.encode()).hexdigest() for jd in chunk}
+        texts = dict(
+            JobDescriptionText.objects.filter(sha256__in=set(hashes.values())).values_list(
+                "sha256", "id"
+            )
+        )
+        new = {}
+        for jd in chunk:
+            if hashes[jd.id] not in texts:
+                new.setdefault(hashes[jd.id], jd.raw_text)
+        JobDescriptionText.objects.bulk_create(
+            [JobDescriptionText(sha256=digest, text=text) for digest, text in new.items()],
+            ignore_conflicts=True,
+        )
+        if new:
+            texts.update(
+                JobDescriptionText.objects.filter(sha256__in=list(new)).values_list("sha256", "id")
+            )
+        for jd in chunk:
+            jd.text_id = texts[hashes[jd.id]]
+        JobDescription.objects.bulk_update(chunk, ["text"])
+        last_id = chunk[-1].id
+
+
+def restore_raw_text(apps, schema_editor):
+    JobDescription = apps.get_model("analysis", "JobDescription")
+
+    last_id = 0
+    while True:
+        chunk = list(
+            JobDescription.objects.filter(id__gt=last_id)
+            .select_related("text")
+            .order_by("id")[:CHUNK_SIZE]
+        )
+        if not chunk:
+            break
+        for jd in chunk:
+            jd.raw_text = jd.text.text if jd.text_id else jd.raw_text
+        JobDescription.objects.bulk_update(chunk, ["raw_text"])
+        last_id = chunk[-1].id
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("analysis", "0010_jobdescriptiontext"),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_texts, restore_raw_text, atomic=False),
+    ]
@@ -0,0 +1,29 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analysis", "0011_dedupe_jobdescription_text"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="jobdescription",
+            name="minhash",
+        ),
+        migrations.RemoveField(
+            model_name="jobdescription",
+            name="raw_text",
+        ),
+        migrations.AlterField(
+            model_name="jobdescription",
+            name="text",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="job_descriptions",
+                to="analysis.jobdescriptiontext",
+            ),
+        ),
+    ]
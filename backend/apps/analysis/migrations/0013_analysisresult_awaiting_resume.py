@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 15:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analysis", "0012_remove_jobdescription_raw_text"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="analysisresult",
+            name="awaiting_resume",
+            field=models.BooleanField(default=False),
+        ),
+    ]
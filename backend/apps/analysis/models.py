@@ -6,6 +6,39 @@ from django.db import models
 from apps.resumes.models import Resume
 
 
+class JobDescriptionText(models.Model):
+    """
+    A job description's text, stored once per content hash and shared by
+    every JobDescription with that text, with the data derived from it
+    (apps/analysis/jd_texts.py).
+    """
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    text = models.TextField()
+    # build_keyword_vector(text)
+    keywords = models.JSONField(null=True, blank=True)
+    # MinHash signature of text (apps/analysis/near_duplicates.py)
+    minhash = models.BinaryField(null=True, blank=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"JD text {self.sha256[:12]}"
+
+
+class JobDescriptionBand(models.Model):
+    """One LSH band key of a JobDescriptionText's MinHash signature."""
+
+    text = models.ForeignKey(
+        JobDescriptionText, on_delete=models.CASCADE, related_name="minhash_bands"
+    )
+    key = models.BigIntegerField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["text", "key"], name="unique_jd_text_band"),
+        ]
+
+
 class JobDescription(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -14,7 +47,9 @@ class JobDescription(models.Model):
     )
     title = models.CharField(max_length=255, blank=True)
     company = models.CharField(max_length=255, blank=True)
-    raw_text = models.TextField()
+    text = models.ForeignKey(
+        JobDescriptionText, on_delete=models.PROTECT, related_name="job_descriptions"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -23,22 +58,105 @@ class JobDescription(models.Model):
     def __str__(self):
         return f"{self.title} @ {self.company}" if self.title else f"JD #{self.id}"
 
+    @property
+    def raw_text(self) -> str:
+        return self.text.text
+
+
+class AnalysisBatch(models.Model):
+    """One resume analyzed against several job descriptions in a single request."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="analysis_batches",
+    )
+    resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name="analysis_batches")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"Batch {self.id}"
+
+
+class BulkJob(models.Model):
+    """One submission to a provider's batch API (Anthropic Message Batches or OpenAI Batch)."""
+
+    class Status(models.TextChoices):
+        SUBMITTED = "submitted", "Submitted"
+        ENDED = "ended", "Ended"
+        FAILED = "failed", "Failed"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    provider = models.CharField(max_length=20)
+    provider_batch_id = models.CharField(max_length=255, blank=True)
+    status = models.CharField(
+        max_length=20, choices=Status.choices, default=Status.SUBMITTED
+    )
+    request_count = models.PositiveIntegerField(default=0)
+    error_message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"Bulk job {self.id} [{self.provider} {self.status}]"
+
 
 class AnalysisResult(models.Model):
+    class ExecutionMode(models.TextChoices):
+        INTERACTIVE = "interactive", "Interactive"
+        # Picked up by run_bulk_analyses and sent through a provider batch API
+        BULK = "bulk", "Bulk"
+
     class Status(models.TextChoices):
         PENDING = "pending", "Pending"
         PROCESSING = "processing", "Processing"
         DONE = "done", "Done"
         FAILED = "failed", "Failed"
 
+    class Origin(models.TextChoices):
+        """How the analysis was requested; picks its worker queue (ANALYSIS_QUEUES)."""
+
+        PAID = "paid", "Paid single analysis"
+        STAFF = "staff", "Staff"
+        BATCH = "batch", "Batch"
+        BACKFILL = "backfill", "Backfill"
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name="analyses")
     job_description = models.ForeignKey(
         JobDescription, on_delete=models.CASCADE, related_name="analyses"
     )
+    batch = models.ForeignKey(
+        AnalysisBatch,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="results",
+    )
+    execution_mode = models.CharField(
+        max_length=20, choices=ExecutionMode.choices, default=ExecutionMode.INTERACTIVE
+    )
+    origin = models.CharField(max_length=20, choices=Origin.choices, default=Origin.PAID)
+    bulk_job = models.ForeignKey(
+        BulkJob,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="results",
+    )
     status = models.CharField(
         max_length=20, choices=Status.choices, default=Status.PENDING
     )
+    # Created before its resume finished parsing: not enqueued, and skipped by
+    # workers, until release_awaiting_analyses() runs on resume_parsed
+    awaiting_resume = models.BooleanField(default=False)
     match_score = models.PositiveSmallIntegerField(
         null=True, blank=True, help_text="0–100"
     )
@@ -46,6 +164,31 @@ class AnalysisResult(models.Model):
     rewritten_bullets = models.JSONField(default=list, blank=True)
     hire_probability = models.FloatField(null=True, blank=True, help_text="0.0–1.0")
     cover_letter = models.TextField(blank=True)
+    # Local keyword pre-score (apps/analysis/prescore.py), available as soon
+    # as the analysis is created
+    provisional_score = models.PositiveSmallIntegerField(
+        null=True, blank=True, help_text="0–100"
+    )
+    missing_keywords = models.JSONField(default=list, blank=True)
+    # True when the AI analysis failed and the result is the local pre-score
+    is_degraded = models.BooleanField(default=False)
+    # Earlier analysis of the same resume against a near-duplicate JD that
+    # this result was copied from
+    reused_from = models.ForeignKey(
+        "self", on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    # Per-section status ("processing" / "done" / "failed") while the analysis
+    # runs as separate section calls; empty when it ran as a single call
+    sections = models.JSONField(default=dict, blank=True)
+    provider = models.CharField(
+        max_length=20, blank=True, help_text="AI provider that served the result"
+    )
+    # Token usage of the provider call; null when served from the result cache.
+    # input_tokens excludes prompt tokens read from or written to the cache.
+    input_tokens = models.PositiveIntegerField(null=True, blank=True)
+    output_tokens = models.PositiveIntegerField(null=True, blank=True)
+    cache_read_tokens = models.PositiveIntegerField(null=True, blank=True)
+    cache_write_tokens = models.PositiveIntegerField(null=True, blank=True)
     error_message = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     completed_at = models.DateTimeField(null=True, blank=True)
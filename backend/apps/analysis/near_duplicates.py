@@ -0,0 +1,146 @@
+import hashlib
+import logging
+import zlib
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from . import metrics
+from .ai_service import ANALYSIS_FIELDS
+from .models import AnalysisResult, JobDescription, JobDescriptionBand, JobDescriptionText
+from .prescore import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Near-duplicate job descriptions: the same posting pasted again with
+# tracking text, different whitespace or a reordered benefits section.
+# Each distinct JD text gets a MinHash signature of its word shingles, split
+# into LSH bands stored in JobDescriptionBand; a new JD only compares
+# signatures with the texts sharing at least one band key, found through an
+# index, so lookups stay sublinear however large the table grows.
+
+NEAR_DUPLICATE_HIT_METRIC = "near_duplicate.hit"
+
+SHINGLE_SIZE = 3
+NUM_PERM = 128
+# 16 bands of 8 rows: JDs with Jaccard similarity 0.9 share a band with
+# probability ~1.0, at 0.5 with ~0.06
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+# Candidate band matches checked per lookup
+MAX_CANDIDATES = 50
+
+# Universal hashing (a * x + b) mod p over 32-bit shingle hashes; a < 2**32
+# keeps a * x within uint64. Fixed seed: signatures are stored.
+_PRIME = np.uint64(4294967311)
+_rng = np.random.default_rng(20240611)
+_A = _rng.integers(1, 2**32 - 1, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 2**31, size=NUM_PERM, dtype=np.uint64)
+_MAX_HASH = np.uint64(2**32 - 1)
+
+
+def shingles(text: str) -> set[int]:
+    """
+    CRC32 hashes of the JD's overlapping SHINGLE_SIZE-word sequences. They
+    never span a line break, so reordering lines (bullets, whole sections)
+    leaves the set unchanged.
+    """
+    out = set()
+    for line in text.splitlines():
+        tokens = tokenize(line)
+        if not tokens:
+            continue
+        tokens += [""] * (SHINGLE_SIZE - len(tokens))
+        out.update(
+            zlib.crc32(" ".join(tokens[i:i + SHINGLE_SIZE]).encode())
+            for i in range(len(tokens) - SHINGLE_SIZE + 1)
+        )
+    # Empty text still needs one value to take the minimum of
+    return out or {0}
+
+
+def minhash(text: str) -> np.ndarray:
+    """NUM_PERM-value MinHash signature (uint32) of ``text``."""
+    values = np.fromiter(shingles(text), dtype=np.uint64)
+    hashed = (np.outer(values, _A) + _B) % _PRIME & _MAX_HASH
+    return hashed.min(axis=0).astype(np.uint32)
+
+
+def band_keys(signature: np.ndarray) -> list[int]:
+    """One signed 64-bit key per LSH band (fits a BigIntegerField)."""
+    return [
+        int.from_bytes(
+            hashlib.blake2b(
+                band.to_bytes(1, "big") + signature[band * ROWS:(band + 1) * ROWS].tobytes(),
+                digest_size=8,
+            ).digest(),
+            "big",
+            signed=True,
+        )
+        for band in range(BANDS)
+    ]
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return float(np.mean(a == b))
+
+
+def index_texts(texts: list[JobDescriptionText]) -> None:
+    """
+    Set the MinHash signature of each (saved) text, without saving it, and
+    store its LSH band keys. Safe to repeat.
+    """
+    bands = []
+    for text in texts:
+        signature = minhash(text.text)
+        text.minhash = signature.tobytes()
+        bands += [JobDescriptionBand(text=text, key=key) for key in band_keys(signature)]
+    JobDescriptionBand.objects.bulk_create(bands, ignore_conflicts=True)
+
+
+def find_near_duplicate(resume, job_desc: JobDescription) -> AnalysisResult | None:
+    """
+    The most similar finished analysis of ``resume`` against another JD at
+    least ANALYSIS_NEAR_DUPLICATE_THRESHOLD similar to ``job_desc`` (an
+    identical text counts too), from within the result cache TTL.
+    Best-effort: a failed lookup is a miss.
+    """
+    if not settings.ANALYSIS_NEAR_DUPLICATE_ENABLED or job_desc.text.minhash is None:
+        return None
+    signature = np.frombuffer(job_desc.text.minhash, dtype=np.uint32)
+    try:
+        candidates = list(
+            AnalysisResult.objects.filter(
+                resume=resume,
+                status=AnalysisResult.Status.DONE,
+                is_degraded=False,
+                created_at__gte=timezone.now() - timedelta(seconds=settings.ANALYSIS_CACHE_TTL),
+                job_description__text__minhash_bands__key__in=band_keys(signature),
+            )
+            .select_related("job_description__text")
+            .distinct()
+            .order_by("-created_at")[:MAX_CANDIDATES]
+        )
+    except Exception:
+        logger.warning("Near-duplicate JD lookup failed", exc_info=True)
+        return None
+
+    best, best_score = None, settings.ANALYSIS_NEAR_DUPLICATE_THRESHOLD
+    for candidate in candidates:
+        stored = candidate.job_description.text.minhash
+        if stored is None:
+            continue
+        score = similarity(signature, np.frombuffer(stored, dtype=np.uint32))
+        if score >= best_score:
+            best, best_score = candidate, score
+    if best is not None:
+        metrics.incr(NEAR_DUPLICATE_HIT_METRIC)
+    return best
+
+
+def reusable_data(earlier: AnalysisResult) -> dict:
+    """The analysis fields of a finished result, shaped like a provider response."""
+    return {field: getattr(earlier, field) for field in ANALYSIS_FIELDS}
@@ -0,0 +1,161 @@
+import hashlib
+import logging
+import math
+import re
+from collections import Counter
+
+import numpy as np
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+# Local keyword scoring: a provisional match score and the JD keywords the
+# resume is missing, computed in a few milliseconds while the AI analysis
+# runs, and kept as a degraded result if every provider call fails.
+
+KEYWORD_CACHE_ALIAS = "analysis"
+KEYWORD_CACHE_TTL = 24 * 3600
+MAX_MISSING_KEYWORDS = 10
+
+# BM25 parameters: tf saturation and resume-length normalization
+_K1 = 1.2
+_B = 0.75
+_AVG_RESUME_TOKENS = 450
+# A keyword mentioned this often in an average-length resume counts as covered
+_FULL_CREDIT_TF = 2
+_FULL_CREDIT = _FULL_CREDIT_TF * (_K1 + 1) / (_FULL_CREDIT_TF + _K1)
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.\-/]*[a-z0-9+#]|[a-z0-9]")
+
+_STOPWORDS = frozenset("""
+a about above across after again against all also an and any are as at be because been
+before being below between both but by can could did do does doing down during each either
+etc every few for from further had has have having he her here hers him his how i if in
+into is it its itself just like may me more most must my no nor not of off on once only or
+other our ours out over own per plus same she should so some such than that the their them
+then there these they this those through to too under until up upon us very via was we
+were what when where which while who whom why will with within without would you your
+ability able across applicant applicants apply benefits best bonus candidate candidates
+career company competitive culture day days degree description desired environment equal
+excellent experience experienced etc field good great help ideal including job join
+knowledge looking new number one opportunity plus position preferred required requirement
+requirements responsibilities responsible role salary skill skills strong team teams two
+understanding using work working world year years want wants will
+build building built collaborate create creating deliver design designing develop
+developing drive ensure improve lead maintain manage own run running support use write
+""".split())
+
+# Terms that are almost always hard requirements when they appear in a JD
+SKILL_TERMS = frozenset("""
+python java javascript typescript go golang rust c c++ c# ruby php scala kotlin swift
+objective-c r matlab sql nosql graphql rest grpc html css sass react angular vue svelte
+next.js node.js nodejs express django flask fastapi rails spring laravel .net asp.net
+pandas numpy scipy pytorch tensorflow keras scikit-learn spark hadoop kafka airflow dbt
+snowflake bigquery redshift databricks postgresql postgres mysql sqlite mongodb redis
+elasticsearch cassandra dynamodb aws gcp azure docker kubernetes k8s terraform ansible
+helm jenkins ci/cd git linux bash celery rabbitmq nginx microservices serverless lambda
+tableau looker powerbi excel figma jira agile scrum kanban oauth saml security devops
+sre mlops llm nlp etl api apis backend frontend fullstack ios android
+""".split())
+
+_SKILL_WEIGHT = 2.0
+_BIGRAM_WEIGHT = 1.5
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _terms(tokens: list[str]) -> list[str]:
+    """Content unigrams plus bigrams of adjacent content words."""
+    terms = [t for t in tokens if t not in _STOPWORDS and not t.isdigit()]
+    for first, second in zip(tokens, tokens[1:]):
+        if (
+            first not in _STOPWORDS
+            and second not in _STOPWORDS
+            and not first.isdigit()
+            and not second.isdigit()
+        ):
+            terms.append(f"{first} {second}")
+    return terms
+
+
+def _jd_cache_key(jd_text: str) -> str:
+    return f"jd-keywords:v1:{hashlib.sha256(jd_text.encode()).hexdigest()}"
+
+
+def build_keyword_vector(jd_text: str) -> dict:
+    """
+    Weighted JD keywords: {"terms": [...], "weights": [...]}. A term's weight
+    is 1 + log(tf) in the JD, boosted for known skills and multi-word terms.
+    """
+    counts = Counter(_terms(tokenize(jd_text)))
+    # Bigrams that occur once are mostly incidental phrasing
+    terms = [t for t, c in counts.items() if " " not in t or c > 1 or t in SKILL_TERMS]
+    weights = []
+    for term in terms:
+        weight = 1.0 + math.log(counts[term])
+        if term in SKILL_TERMS:
+            weight *= _SKILL_WEIGHT
+        elif " " in term:
+            weight *= _BIGRAM_WEIGHT
+        weights.append(weight)
+    return {"terms": terms, "weights": weights}
+
+
+def jd_keyword_vector(jd_text: str) -> dict:
+    """build_keyword_vector(), cached per job description text."""
+    cache = caches[KEYWORD_CACHE_ALIAS]
+    key = _jd_cache_key(jd_text)
+    try:
+        vector = cache.get(key)
+    except Exception:
+        logger.warning("JD keyword cache lookup failed", exc_info=True)
+        vector = None
+    if vector is None:
+        vector = build_keyword_vector(jd_text)
+        try:
+            cache.set(key, vector, timeout=KEYWORD_CACHE_TTL)
+        except Exception:
+            logger.warning("JD keyword cache store failed", exc_info=True)
+    return vector
+
+
+def prescore(
+    resume_text: str, jd_text: str, vector: dict | None = None
+) -> tuple[int | None, list[str]]:
+    """
+    Return (provisional match score 0-100, missing JD keywords by importance).
+    The score is the BM25-saturated share of JD keyword weight the resume
+    covers. Returns (None, []) when the JD has no usable keywords. Pass the
+    JD's stored keyword ``vector`` (JobDescriptionText.keywords) if known.
+    """
+    vector = vector or jd_keyword_vector(jd_text)
+    if not vector["terms"]:
+        return None, []
+
+    resume_tokens = tokenize(resume_text)
+    resume_counts = Counter(_terms(resume_tokens))
+    weights = np.asarray(vector["weights"], dtype=np.float64)
+    tf = np.fromiter(
+        (resume_counts.get(term, 0) for term in vector["terms"]),
+        dtype=np.float64,
+        count=len(vector["terms"]),
+    )
+
+    length_norm = 1 - _B + _B * len(resume_tokens) / _AVG_RESUME_TOKENS
+    saturated = tf * (_K1 + 1) / (tf + _K1 * length_norm)
+    coverage = np.minimum(saturated / _FULL_CREDIT, 1.0)
+    score = int(round(100 * float(weights @ coverage) / float(weights.sum())))
+
+    missing = np.flatnonzero(tf == 0)
+    order = missing[np.argsort(-weights[missing], kind="stable")]
+    missing_keywords = []
+    for i in order:
+        term = vector["terms"][i]
+        # "machine" and "learning" add nothing once "machine learning" is listed
+        if not any(term in phrase.split() for phrase in missing_keywords if " " in phrase):
+            missing_keywords.append(term)
+        if len(missing_keywords) == MAX_MISSING_KEYWORDS:
+            break
+    return score, missing_keywords
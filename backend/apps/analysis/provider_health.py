@@ -0,0 +1,65 @@
+import math
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+# Per-process view of each provider's recent latency and error streak. Each
+# worker learns independently; a provider that is failing will trip every
+# worker's breaker within a few calls.
+_lock = threading.Lock()
+_latencies = {}
+_failures = {}
+_opened_at = {}
+
+
+def record_success(provider: str, latency: float) -> None:
+    """Record a successful call and close the provider's circuit."""
+    with _lock:
+        window = _latencies.setdefault(
+            provider, deque(maxlen=settings.AI_HEDGE_LATENCY_WINDOW)
+        )
+        window.append(latency)
+        _failures[provider] = 0
+        _opened_at.pop(provider, None)
+
+
+def record_failure(provider: str) -> None:
+    """Record a failed call; open the circuit after too many in a row."""
+    with _lock:
+        _failures[provider] = _failures.get(provider, 0) + 1
+        if _failures[provider] >= settings.AI_CIRCUIT_FAILURE_THRESHOLD:
+            _opened_at[provider] = time.monotonic()
+
+
+def is_available(provider: str) -> bool:
+    """
+    False while the provider's circuit is open. Once AI_CIRCUIT_RESET_TIMEOUT
+    has passed the circuit is half-open: calls are let through again and the
+    next result decides whether it closes or re-opens.
+    """
+    opened_at = _opened_at.get(provider)
+    if opened_at is None:
+        return True
+    return time.monotonic() - opened_at >= settings.AI_CIRCUIT_RESET_TIMEOUT
+
+
+def hedge_delay(provider: str) -> float:
+    """
+    Seconds to wait on ``provider`` before hedging to the secondary: the
+    AI_HEDGE_PERCENTILE of its recent latencies, once enough samples exist.
+    """
+    with _lock:
+        samples = sorted(_latencies.get(provider, ()))
+    if len(samples) < settings.AI_HEDGE_MIN_SAMPLES:
+        return settings.AI_HEDGE_DEFAULT_DELAY
+    index = min(len(samples) - 1, math.ceil(len(samples) * settings.AI_HEDGE_PERCENTILE / 100) - 1)
+    return max(settings.AI_HEDGE_MIN_DELAY, samples[index])
+
+
+def reset() -> None:
+    with _lock:
+        _latencies.clear()
+        _failures.clear()
+        _opened_at.clear()
@@ -0,0 +1,215 @@
+import asyncio
+import os
+from collections import deque
+import threading
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+
+import anthropic
+import httpx
+import openai
+from django.conf import settings
+
+# One long-lived client per provider per worker process, so calls reuse
+# keep-alive connections instead of paying connection setup every time.
+_lock = threading.Lock()
+_clients = {}
+_slots = {}
+_background_loop = None
+# Async clients are bound to the event loop that created them
+_async_state = weakref.WeakKeyDictionary()
+
+
+def _reset_after_fork():
+    """Forked children (Celery prefork) must not share the parent's sockets."""
+    global _lock, _background_loop
+    _lock = threading.Lock()
+    _background_loop = None
+    _clients.clear()
+    _slots.clear()
+    _async_state.clear()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def provider_config(provider: str) -> dict:
+    """Connection settings for one provider."""
+    if provider == "openai":
+        return {
+            "api_key": settings.OPENAI_API_KEY,
+            "base_url": settings.OPENAI_BASE_URL or None,
+            "connect_timeout": settings.OPENAI_CONNECT_TIMEOUT,
+            "read_timeout": settings.OPENAI_READ_TIMEOUT,
+            "max_concurrency": settings.OPENAI_MAX_CONCURRENCY,
+        }
+    return {
+        "api_key": settings.ANTHROPIC_API_KEY,
+        "base_url": settings.ANTHROPIC_BASE_URL or None,
+        "connect_timeout": settings.ANTHROPIC_CONNECT_TIMEOUT,
+        "read_timeout": settings.ANTHROPIC_READ_TIMEOUT,
+        "max_concurrency": settings.ANTHROPIC_MAX_CONCURRENCY,
+    }
+
+
+def _http_options(cfg: dict) -> dict:
+    timeout = httpx.Timeout(cfg["read_timeout"], connect=cfg["connect_timeout"])
+    limits = httpx.Limits(
+        max_connections=cfg["max_concurrency"],
+        max_keepalive_connections=cfg["max_concurrency"],
+        keepalive_expiry=settings.AI_HTTP_KEEPALIVE_EXPIRY,
+    )
+    return {"timeout": timeout, "limits": limits}
+
+
+def _build_client(provider: str, is_async: bool):
+    cfg = provider_config(provider)
+    http_options = _http_options(cfg)
+    http_client = (httpx.AsyncClient if is_async else httpx.Client)(**http_options)
+    if provider == "openai":
+        client_cls = openai.AsyncOpenAI if is_async else openai.OpenAI
+    else:
+        client_cls = anthropic.AsyncAnthropic if is_async else anthropic.Anthropic
+    return client_cls(
+        api_key=cfg["api_key"],
+        base_url=cfg["base_url"],
+        timeout=http_options["timeout"],
+        http_client=http_client,
+    )
+
+
+def get_client(provider: str):
+    """Return this process's pooled synchronous client for ``provider``."""
+    client = _clients.get(provider)
+    if client is None:
+        with _lock:
+            client = _clients.get(provider)
+            if client is None:
+                client = _clients[provider] = _build_client(provider, is_async=False)
+    return client
+
+
+def get_async_client(provider: str):
+    """Return the pooled async client for ``provider`` on the running loop."""
+    loop = asyncio.get_running_loop()
+    clients = _async_state.get(loop)
+    if clients is None:
+        clients = _async_state[loop] = {}
+    if provider not in clients:
+        clients[provider] = _build_client(provider, is_async=True)
+    return clients[provider]
+
+
+class _ProcessSlots:
+    """
+    A counting semaphore shared by threads and event loops, so sync calls
+    and async calls on any loop in the process draw on one limit. A freed
+    slot is handed to the longest waiter of either kind.
+    """
+
+    def __init__(self, limit: int):
+        self._lock = threading.Lock()
+        self._free = limit
+        # threading.Event for a blocked thread, (loop, future) for a coroutine
+        self._waiters = deque()
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._free and not self._waiters:
+                self._free -= 1
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        event.wait()
+
+    async def aacquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._free and not self._waiters:
+                self._free -= 1
+                return
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            # Already handed a slot: give it back (_hand_off does this
+            # itself if it runs after the cancellation)
+            if waiter[1].done() and not waiter[1].cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            if not self._waiters:
+                self._free += 1
+                return
+            waiter = self._waiters.popleft()
+        if isinstance(waiter, threading.Event):
+            waiter.set()
+        else:
+            loop, future = waiter
+            loop.call_soon_threadsafe(self._hand_off, future)
+
+    def _hand_off(self, future) -> None:
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+
+def _provider_slots(provider: str) -> _ProcessSlots:
+    slots = _slots.get(provider)
+    if slots is None:
+        with _lock:
+            slots = _slots.setdefault(
+                provider, _ProcessSlots(provider_config(provider)["max_concurrency"])
+            )
+    return slots
+
+
+@contextmanager
+def provider_slot(provider: str):
+    """Hold one of the provider's in-flight request slots for a sync call."""
+    slots = _provider_slots(provider)
+    slots.acquire()
+    try:
+        yield
+    finally:
+        slots.release()
+
+
+@asynccontextmanager
+async def async_provider_slot(provider: str):
+    """
+    Hold one of the provider's in-flight request slots from a coroutine. The
+    slots are the same ones provider_slot() takes, whichever loop this runs on.
+    """
+    slots = _provider_slots(provider)
+    await slots.aacquire()
+    try:
+        yield
+    finally:
+        slots.release()
+
+
+def run_sync(coro):
+    """
+    Run a coroutine on this process's background event loop and block until
+    it finishes. Lets synchronous callers (Celery tasks) use the pooled async
+    clients without creating a fresh loop — and fresh clients — per call.
+    """
+    global _background_loop
+    if _background_loop is None:
+        with _lock:
+            if _background_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="ai-provider-loop", daemon=True
+                ).start()
+                _background_loop = loop
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop).result()
@@ -0,0 +1,80 @@
+import random
+import time
+
+from django.conf import settings
+from kombu.utils.scheduling import round_robin_cycle
+
+from . import metrics
+
+# Analyses are routed to a queue by how they were created
+# (AnalysisResult.origin, mapped by ANALYSIS_QUEUES), so a 50-JD batch or a
+# backfill never sits in front of a paying user's single analysis. Workers
+# can serve one queue each, or several with ANALYSIS_QUEUE_WEIGHTS deciding
+# how often each is polled first.
+
+# Upper bounds (seconds) of the queue-wait histogram buckets
+WAIT_BUCKETS = (1, 5, 30, 120, 600)
+
+
+def queue_for(origin: str) -> str:
+    """The queue analyses of this origin are sent to."""
+    return settings.ANALYSIS_QUEUES[origin]
+
+
+def analysis_queues() -> list[str]:
+    """Every analysis queue, in ANALYSIS_QUEUES order."""
+    return list(dict.fromkeys(settings.ANALYSIS_QUEUES.values()))
+
+
+def weighted_order(queues: list[str]) -> list[str]:
+    """
+    ``queues`` in a random order where each queue comes first with
+    probability proportional to its ANALYSIS_QUEUE_WEIGHTS weight (default 1).
+    A worker that polls in this order serves a busy queue of weight 3 three
+    times as often as one of weight 1, without starving either.
+    """
+    weights = settings.ANALYSIS_QUEUE_WEIGHTS
+    # Weighted sampling without replacement (Efraimidis-Spirakis)
+    return sorted(queues, key=lambda queue: -random.random() ** (1 / weights.get(queue, 1)))
+
+
+class weighted_cycle(round_robin_cycle):
+    """
+    queue_order_strategy for kombu's Redis transport: each BRPOP lists the
+    worker's queues in weighted_order(), and Redis pops from the first
+    non-empty one.
+    """
+
+    def consume(self, n):
+        return weighted_order(self.items[:n])
+
+    def rotate(self, last_used):
+        """Order is redrawn on every poll."""
+
+
+def _bucket(wait: float) -> str:
+    for bound in WAIT_BUCKETS:
+        if wait <= bound:
+            return f"le_{bound}s"
+    return f"gt_{WAIT_BUCKETS[-1]}s"
+
+
+def wait_metric_names(queue: str) -> list[str]:
+    """Counter names record_queue_wait() keeps for ``queue``."""
+    prefix = f"queue.{queue}"
+    buckets = [f"le_{bound}s" for bound in WAIT_BUCKETS] + [f"gt_{WAIT_BUCKETS[-1]}s"]
+    return [f"{prefix}.jobs", f"{prefix}.wait_ms", *(f"{prefix}.wait_{b}" for b in buckets)]
+
+
+def record_queue_wait(queue: str | None, enqueued_at: float | None) -> None:
+    """
+    Count how long an analysis waited in ``queue`` before a worker started
+    it: a job count, the total wait and a histogram bucket, per queue.
+    """
+    if not queue or enqueued_at is None:
+        return
+    wait = max(0.0, time.time() - enqueued_at)
+    prefix = f"queue.{queue}"
+    metrics.incr(f"{prefix}.jobs")
+    metrics.incr(f"{prefix}.wait_ms", int(wait * 1000))
+    metrics.incr(f"{prefix}.wait_{_bucket(wait)}")
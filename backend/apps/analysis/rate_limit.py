@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Cluster-wide provider rate limiting. Every worker draws from the same two
+# Redis token buckets per provider — requests per minute and (estimated)
+# tokens per minute — so together they stay under the account's limits and
+# queue for capacity instead of collecting 429s. Like metrics, the limiter
+# fails open: if Redis is unreachable, calls go ahead unthrottled.
+
+# KEYS: request bucket, token bucket. ARGV: RPM, TPM, tokens wanted.
+# Returns "0" once both buckets had room (and were charged), otherwise the
+# seconds until they will.
+_ACQUIRE_LUA = """
+local now = redis.call('TIME')
+local t = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local function level(key, capacity)
+  local state = redis.call('HMGET', key, 'level', 'ts')
+  local value = tonumber(state[1]) or capacity
+  local ts = tonumber(state[2]) or t
+  return math.min(capacity, value + (t - ts) * capacity / 60)
+end
+local rpm, tpm = tonumber(ARGV[1]), tonumber(ARGV[2])
+local cost = math.min(tonumber(ARGV[3]), tpm)
+local requests, tokens = level(KEYS[1], rpm), level(KEYS[2], tpm)
+local wait = 0
+if requests < 1 then wait = (1 - requests) * 60 / rpm end
+if tokens < cost then wait = math.max(wait, (cost - tokens) * 60 / tpm) end
+if wait == 0 then
+  requests = requests - 1
+  tokens = tokens - cost
+end
+redis.call('HSET', KEYS[1], 'level', requests, 'ts', t)
+redis.call('HSET', KEYS[2], 'level', tokens, 'ts', t)
+redis.call('EXPIRE', KEYS[1], 120)
+redis.call('EXPIRE', KEYS[2], 120)
+return tostring(wait)
+"""
+
+# KEYS: token bucket. ARGV: tokens to give back (estimate minus actual usage)
+_REFUND_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+  redis.call('HINCRBYFLOAT', KEYS[1], 'level', ARGV[1])
+end
+return 0
+"""
+
+# No limit configured for one of the dimensions
+_UNLIMITED = 10**12
+
+_lock = threading.Lock()
+_client = None
+_scripts = {}
+
+
+def _reset_after_fork():
+    global _lock, _client
+    _lock = threading.Lock()
+    _client = None
+    _scripts.clear()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class RateLimitTimeout(Exception):
+    """No provider capacity became free within AI_RATE_LIMIT_MAX_WAIT."""
+
+
+def provider_limits(provider: str) -> tuple[int, int]:
+    """(requests per minute, tokens per minute) for ``provider``; 0 means unlimited."""
+    if provider == "openai":
+        return settings.OPENAI_RPM_LIMIT, settings.OPENAI_TPM_LIMIT
+    return settings.ANTHROPIC_RPM_LIMIT, settings.ANTHROPIC_TPM_LIMIT
+
+
+def _script(name: str, source: str):
+    global _client
+    if name not in _scripts:
+        with _lock:
+            if _client is None:
+                _client = redis.Redis.from_url(
+                    settings.REDIS_URL, socket_timeout=1, socket_connect_timeout=1
+                )
+            _scripts.setdefault(name, _client.register_script(source))
+    return _scripts[name]
+
+
+def try_acquire(provider: str, tokens: int) -> float:
+    """
+    Take one request and ``tokens`` tokens from the provider's buckets.
+    Returns 0.0 on success, or the seconds to wait before capacity frees up.
+    """
+    rpm, tpm = provider_limits(provider)
+    if not settings.AI_RATE_LIMIT_ENABLED or not (rpm or tpm):
+        return 0.0
+    keys = [f"ratelimit:{provider}:requests", f"ratelimit:{provider}:tokens"]
+    try:
+        wait = _script("acquire", _ACQUIRE_LUA)(
+            keys=keys, args=[rpm or _UNLIMITED, tpm or _UNLIMITED, tokens]
+        )
+    except redis.RedisError:
+        logger.warning("Rate limiter unavailable; calling %s unthrottled", provider, exc_info=True)
+        return 0.0
+    return float(wait)
+
+
+def _next_sleep(wait: float, deadline: float) -> float:
+    # Jitter so workers queued on the same bucket do not all retry at once
+    sleep = wait * random.uniform(1.0, 1.2)
+    remaining = deadline - time.monotonic()
+    if sleep > remaining:
+        raise RateLimitTimeout(f"No capacity within {settings.AI_RATE_LIMIT_MAX_WAIT}s")
+    return sleep
+
+
+def acquire(provider: str, tokens: int) -> None:
+    """Block until the provider's buckets have room, or raise RateLimitTimeout."""
+    deadline = time.monotonic() + settings.AI_RATE_LIMIT_MAX_WAIT
+    while wait := try_acquire(provider, tokens):
+        time.sleep(_next_sleep(wait, deadline))
+
+
+async def aacquire(provider: str, tokens: int) -> None:
+    """acquire() for the event loop: waits without blocking other calls."""
+    deadline = time.monotonic() + settings.AI_RATE_LIMIT_MAX_WAIT
+    while wait := await asyncio.to_thread(try_acquire, provider, tokens):
+        await asyncio.sleep(_next_sleep(wait, deadline))
+
+
+def refund(provider: str, tokens: int) -> None:
+    """Return tokens that were reserved but not used by the call."""
+    if tokens <= 0 or not settings.AI_RATE_LIMIT_ENABLED or not provider_limits(provider)[1]:
+        return
+    try:
+        _script("refund", _REFUND_LUA)(keys=[f"ratelimit:{provider}:tokens"], args=[tokens])
+    except redis.RedisError:
+        logger.warning("Rate limiter refund failed", exc_info=True)
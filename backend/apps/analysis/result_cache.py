@@ -0,0 +1,83 @@
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import metrics
+from .ai_service import (
+    MAX_JD_CHARS,
+    PROMPT_VERSION,
+    get_provider_and_model,
+    resume_excerpts_for,
+    resume_prompt_for,
+    sanitize_text,
+)
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_ALIAS = "analysis"
+
+HIT_METRIC = "result_cache.hit"
+MISS_METRIC = "result_cache.miss"
+
+
+def analysis_cache_key(resume_text: str, jd_text: str) -> str:
+    """
+    Content-addressed key for an analysis.
+
+    Hashes exactly what the model would see (fitted resume, resume excerpts and JD) together
+    with the provider, model and prompt version, so changing ANTHROPIC_MODEL /
+    OPENAI_MODEL or editing the prompt template yields new keys and old entries
+    simply age out.
+    """
+    provider, model = get_provider_and_model()
+    digest = hashlib.sha256()
+    for part in (
+        PROMPT_VERSION,
+        provider,
+        model,
+        resume_prompt_for(resume_text),
+        resume_excerpts_for(resume_text, jd_text),
+        sanitize_text(jd_text, MAX_JD_CHARS),
+    ):
+        digest.update(part.encode())
+        digest.update(b"\x1f")
+    return f"analysis-result:v4:{digest.hexdigest()}"
+
+
+def get_cached_analysis(
+    resume_text: str, jd_text: str, record_metrics: bool = True
+) -> dict | None:
+    """
+    Return a previously stored entry — {"data": <analysis dict>, "provider":
+    <provider that produced it>} — or None on a miss.
+
+    Workers re-check the cache after AnalysisCreateView already has, so they
+    pass record_metrics=False to keep each analysis counted once.
+    """
+    if not settings.ANALYSIS_CACHE_ENABLED:
+        return None
+    try:
+        entry = caches[RESULT_CACHE_ALIAS].get(analysis_cache_key(resume_text, jd_text))
+    except Exception:
+        logger.warning("Analysis result cache lookup failed", exc_info=True)
+        return None
+
+    if record_metrics:
+        metrics.incr(HIT_METRIC if entry is not None else MISS_METRIC)
+    return entry
+
+
+def store_analysis(resume_text: str, jd_text: str, data: dict, provider: str) -> None:
+    """Store an analysis dict for ANALYSIS_CACHE_TTL seconds."""
+    if not settings.ANALYSIS_CACHE_ENABLED:
+        return
+    try:
+        caches[RESULT_CACHE_ALIAS].set(
+            analysis_cache_key(resume_text, jd_text),
+            {"data": data, "provider": provider},
+            timeout=settings.ANALYSIS_CACHE_TTL,
+        )
+    except Exception:
+        logger.warning("Analysis result cache store failed", exc_info=True)
@@ -1,5 +1,7 @@
+from django.conf import settings
 from rest_framework import serializers
 
+from .ai_service import ANALYSIS_SECTIONS
 from .models import AnalysisResult
 
 
@@ -8,9 +10,40 @@ class AnalysisCreateSerializer(serializers.Serializer):
     job_description = serializers.CharField(min_length=100)
     job_title = serializers.CharField(max_length=255, required=False, allow_blank=True, default="")
     company = serializers.CharField(max_length=255, required=False, allow_blank=True, default="")
+    # When true the client runs the analysis through the SSE stream endpoint
+    stream = serializers.BooleanField(required=False, default=False)
+
+
+class BatchJobSerializer(serializers.Serializer):
+    job_description = serializers.CharField(min_length=100)
+    job_title = serializers.CharField(max_length=255, required=False, allow_blank=True, default="")
+    company = serializers.CharField(max_length=255, required=False, allow_blank=True, default="")
+
+
+class AnalysisBatchCreateSerializer(serializers.Serializer):
+    resume_id = serializers.IntegerField()
+    jobs = BatchJobSerializer(many=True, allow_empty=False)
+    # "bulk" defers the batch to run_bulk_analyses and the provider batch APIs:
+    # cheaper, but results can take hours
+    mode = serializers.ChoiceField(
+        choices=AnalysisResult.ExecutionMode.choices,
+        required=False,
+        default=AnalysisResult.ExecutionMode.INTERACTIVE,
+    )
+
+    def validate_jobs(self, jobs):
+        if len(jobs) > settings.ANALYSIS_BATCH_MAX_JOBS:
+            raise serializers.ValidationError(
+                f"At most {settings.ANALYSIS_BATCH_MAX_JOBS} job descriptions per batch."
+            )
+        return jobs
 
 
 class AnalysisResultSerializer(serializers.ModelSerializer):
+    # {"score": ..., "bullets": ..., "cover_letter": ...}, each one of
+    # "pending", "processing", "done" or "failed"
+    sections = serializers.SerializerMethodField()
+
     class Meta:
         model = AnalysisResult
         fields = [
@@ -21,7 +54,19 @@ class AnalysisResultSerializer(serializers.ModelSerializer):
             "ats_flags",
             "rewritten_bullets",
             "cover_letter",
+            "provisional_score",
+            "missing_keywords",
+            "is_degraded",
+            "sections",
             "created_at",
             "completed_at",
         ]
         read_only_fields = fields
+
+    def get_sections(self, obj):
+        # Single-call analyses have no per-section record; every section
+        # follows the overall status
+        return {
+            section: obj.sections.get(section, obj.status)
+            for section in ANALYSIS_SECTIONS
+        }
@@ -0,0 +1,10 @@
+from django.dispatch import receiver
+
+from apps.resumes.signals import resume_parsed
+
+from .dispatch import release_awaiting_analyses
+
+
+@receiver(resume_parsed)
+def start_awaiting_analyses(sender, resume, **kwargs):
+    release_awaiting_analyses(resume.id)
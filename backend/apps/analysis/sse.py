@@ -0,0 +1,38 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+
+def format_event(event: str, data) -> str:
+    """Serialize one Server-Sent Event frame."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def authenticate(request):
+    """
+    Resolve the JWT bearer token on a plain (async) Django view.
+    Returns the user, or None if the request is unauthenticated.
+    """
+    try:
+        auth = await sync_to_async(JWTAuthentication().authenticate)(request)
+    except AuthenticationFailed:
+        return None
+    return auth[0] if auth else None
+
+
+def unauthorized() -> JsonResponse:
+    return JsonResponse(
+        {"detail": "Authentication credentials were not provided."}, status=401
+    )
+
+
+def event_stream_response(events) -> StreamingHttpResponse:
+    """Wrap an async iterator of formatted events in an SSE response."""
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Disable proxy buffering so events reach the browser as they are written
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,143 @@
+import json
+import re
+
+_PARTIAL_UNICODE_RE = re.compile(r"(\\+)u[0-9a-fA-F]{0,3}$")
+
+
+def _trim_partial_escape(raw: str) -> str:
+    """
+    Drop a trailing escape sequence that is not complete yet (a lone backslash
+    or a short \\uXXXX) so the rest of the string can be decoded.
+    """
+    match = _PARTIAL_UNICODE_RE.search(raw)
+    if match and len(match.group(1)) % 2 == 1:
+        return raw[:match.start()] + match.group(1)[:-1]
+    trailing = len(raw) - len(raw.rstrip("\\"))
+    if trailing % 2 == 1:
+        return raw[:-1]
+    return raw
+
+
+def recover_fields(raw: str) -> dict:
+    """
+    The completed top-level fields of a JSON object that may be cut off or
+    malformed further on, e.g. a response that hit max_tokens mid-string.
+    """
+    parser = IncrementalJSONParser()
+    fields = {}
+    # Feed in slices so a bad value only loses the fields after it
+    for start in range(0, len(raw), 512):
+        try:
+            events = parser.feed(raw[start:start + 512])
+        except ValueError:
+            break
+        fields.update((key, value) for kind, key, value in events if kind == "field")
+    return fields
+
+
+class IncrementalJSONParser:
+    """
+    Pull completed top-level fields out of a JSON object while it streams in.
+
+    feed() returns a list of (kind, key, value) events:
+      - ("field", key, value) once a top-level value is complete
+      - ("delta", key, text) for newly written characters of a string value
+        whose key is in ``stream_fields`` (e.g. the cover letter)
+
+    Anything before the opening brace (such as a markdown fence) is ignored.
+    The accumulated raw text is available as ``text`` for the final parse.
+    """
+
+    def __init__(self, stream_fields=()):
+        self.stream_fields = set(stream_fields)
+        self.text = ""
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._state = None  # "key" | "colon" | "value" | "in_value" | "end"
+        self._key = None
+        self._token_start = 0
+        self._streamed = ""
+
+    def feed(self, chunk: str) -> list:
+        events = []
+        start = len(self.text)
+        self.text += chunk
+        text = self.text
+
+        for i in range(start, len(text)):
+            ch = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._state == "key":
+                        self._key = json.loads(text[self._token_start:i + 1])
+                        self._state = "colon"
+                    elif self._depth == 1 and self._key in self.stream_fields:
+                        # Flush whatever the string gained in this chunk
+                        delta = self._string_delta(text[self._token_start + 1:i])
+                        if delta:
+                            events.append(("delta", self._key, delta))
+                continue
+
+            if self._state == "end":
+                break
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._state in ("key", "value"):
+                    if self._state == "value":
+                        self._state = "in_value"
+                        self._streamed = ""
+                    self._token_start = i
+            elif ch in "{[":
+                if self._depth == 0:
+                    self._state = "key"
+                elif self._depth == 1 and self._state == "value":
+                    self._state = "in_value"
+                    self._token_start = i
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    if self._state == "in_value":
+                        events.append(self._complete(text[self._token_start:i]))
+                    self._state = "end"
+            elif self._depth == 1:
+                if ch == ":" and self._state == "colon":
+                    self._state = "value"
+                elif ch == "," and self._state == "in_value":
+                    events.append(self._complete(text[self._token_start:i]))
+                    self._state = "key"
+                elif self._state == "value" and not ch.isspace():
+                    # Bare scalar: number, true, false or null
+                    self._state = "in_value"
+                    self._token_start = i
+
+        if (
+            self._in_string
+            and self._depth == 1
+            and self._state == "in_value"
+            and self._key in self.stream_fields
+        ):
+            delta = self._string_delta(text[self._token_start + 1:])
+            if delta:
+                events.append(("delta", self._key, delta))
+
+        return events
+
+    def _complete(self, raw_value: str):
+        value = json.loads(raw_value.strip(), strict=False)
+        return ("field", self._key, value)
+
+    def _string_delta(self, raw: str) -> str:
+        raw = _trim_partial_escape(raw)
+        decoded = json.loads(f'"{raw}"', strict=False)
+        delta = decoded[len(self._streamed):]
+        self._streamed = decoded
+        return delta
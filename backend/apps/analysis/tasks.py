@@ -1,42 +1,253 @@
 import logging
+import random
+import time
 
-from celery import shared_task
+from asgiref.sync import sync_to_async
+from celery import group, shared_task
+from django.conf import settings
 from django.utils import timezone
 
-from .ai_service import run_analysis
+from . import metrics
+from .ai_service import (
+    ANALYSIS_FIELDS,
+    ANALYSIS_SECTIONS,
+    is_transient_error,
+    retry_after,
+    run_analysis,
+    run_analysis_sections,
+)
+from .events import publish_status
 from .models import AnalysisResult
+from .providers import run_sync
+from .queues import record_queue_wait
+from .result_cache import get_cached_analysis, store_analysis
 
 logger = logging.getLogger(__name__)
 
 
+USAGE_FIELDS = ("input_tokens", "output_tokens", "cache_read_tokens", "cache_write_tokens")
+
+
+def record_usage(usage: dict) -> None:
+    """Add one provider call's token counts to the prompt-cache counters."""
+    for field in USAGE_FIELDS:
+        if usage.get(field):
+            metrics.incr(f"tokens.{field}", usage[field])
+
+
+def _clean_fields(data: dict, fields) -> dict:
+    """Clamp and default the analysis ``fields`` read from a provider dict."""
+    cleaners = {
+        "match_score": lambda v: max(0, min(100, int(v or 0))),
+        "hire_probability": lambda v: max(0.0, min(1.0, float(v or 0.0))),
+        "rewritten_bullets": lambda v: v or [],
+        "cover_letter": lambda v: v or "",
+    }
+    return {field: cleaners[field](data.get(field)) for field in fields}
+
+
+def fill_analysis_data(
+    result: AnalysisResult, data: dict, provider: str, usage: dict | None = None
+) -> None:
+    """
+    Copy a provider (or cached) analysis dict onto the result and mark it done,
+    without saving. ``usage`` is the provider call's token usage; omit it for
+    cache hits.
+    """
+    for field, value in _clean_fields(data, ANALYSIS_FIELDS).items():
+        setattr(result, field, value)
+    result.provider = provider
+    if usage:
+        for field in USAGE_FIELDS:
+            setattr(result, field, usage.get(field, 0))
+        record_usage(usage)
+    result.status = AnalysisResult.Status.DONE
+    result.completed_at = timezone.now()
+
+
+def apply_analysis_data(
+    result: AnalysisResult, data: dict, provider: str, usage: dict | None = None
+) -> None:
+    """fill_analysis_data(), then save the result and publish its new status."""
+    fill_analysis_data(result, data, provider, usage)
+    result.save()
+    publish_status(result.id, result.status)
+
+
+def mark_analysis_failed(result: AnalysisResult, exc: Exception) -> None:
+    """
+    Record a failed analysis. With ANALYSIS_DEGRADED_FALLBACK on and a local
+    pre-score available, finish it as a degraded result instead: the
+    pre-score stands in for the match score, keeping any section the provider
+    did deliver.
+    """
+    result.error_message = str(exc)
+    if settings.ANALYSIS_DEGRADED_FALLBACK and result.provisional_score is not None:
+        if result.match_score is None:
+            result.match_score = result.provisional_score
+        result.is_degraded = True
+        result.status = AnalysisResult.Status.DONE
+        result.completed_at = timezone.now()
+        result.save(update_fields=[
+            "match_score",
+            "is_degraded",
+            "status",
+            "completed_at",
+            "error_message",
+            "sections",
+        ])
+    else:
+        result.status = AnalysisResult.Status.FAILED
+        result.save(update_fields=["status", "error_message", "sections"])
+    publish_status(result.id, result.status)
+
+
+def apply_section_data(
+    result: AnalysisResult, section: str, data: dict, provider: str, usage: dict
+) -> None:
+    """
+    Persist one finished section's fields right away and push them to
+    listeners, while the other sections are still running.
+    """
+    fields = _clean_fields(data, ANALYSIS_SECTIONS[section]["fields"])
+    for field, value in fields.items():
+        setattr(result, field, value)
+    result.provider = provider
+    for field in USAGE_FIELDS:
+        setattr(result, field, (getattr(result, field) or 0) + usage.get(field, 0))
+    record_usage(usage)
+    result.sections[section] = "done"
+    result.save(update_fields=[*fields, "provider", *USAGE_FIELDS, "sections"])
+    publish_status(
+        result.id, result.status, section=section, fields={**fields, "sections": result.sections}
+    )
+
+
+async def run_sectioned_analysis(result: AnalysisResult, resume_text: str, jd_text: str) -> dict:
+    """
+    Run the analysis as concurrent section calls, saving each section as it
+    finishes. Returns the combined analysis dict; raises the first section
+    error once every section has settled (finished sections stay saved).
+    Sections already done by an earlier attempt are not run again.
+    """
+    done = {section for section, state in (result.sections or {}).items() if state == "done"}
+    pending = [section for section in ANALYSIS_SECTIONS if section not in done]
+    result.sections = {
+        section: "done" if section in done else "processing" for section in ANALYSIS_SECTIONS
+    }
+    await sync_to_async(result.save)(update_fields=["sections"])
+    combined = {
+        field: getattr(result, field)
+        for section in done
+        for field in ANALYSIS_SECTIONS[section]["fields"]
+    }
+
+    async def on_section(section, data, provider, usage):
+        combined.update(data)
+        await sync_to_async(apply_section_data)(result, section, data, provider, usage)
+
+    failures = await run_analysis_sections(resume_text, jd_text, on_section, pending)
+    for section, exc in failures:
+        logger.warning("Section %s of analysis %s failed: %s", section, result.id, exc)
+        result.sections[section] = "failed"
+    if failures:
+        raise failures[0][1]
+
+    result.status = AnalysisResult.Status.DONE
+    result.completed_at = timezone.now()
+    await sync_to_async(result.save)(update_fields=["status", "completed_at"])
+    await sync_to_async(publish_status)(result.id, result.status)
+    return combined
+
+
+def retry_countdown(retries: int, exc: Exception) -> float:
+    """
+    Seconds before retry number ``retries + 1``: exponential backoff with
+    full jitter, capped at ANALYSIS_RETRY_BACKOFF_MAX, but never sooner than
+    the provider's Retry-After.
+    """
+    ceiling = min(
+        settings.ANALYSIS_RETRY_BACKOFF_MAX, settings.ANALYSIS_RETRY_BACKOFF_BASE * 2**retries
+    )
+    return max(random.uniform(0, ceiling), retry_after(exc) or 0)
+
+
+def release_for_retry(result: AnalysisResult) -> None:
+    """Put a claimed analysis back to PENDING so the retried task can claim it."""
+    AnalysisResult.objects.filter(
+        id=result.id, status=AnalysisResult.Status.PROCESSING
+    ).update(status=AnalysisResult.Status.PENDING)
+    result.status = AnalysisResult.Status.PENDING
+    publish_status(result.id, result.status)
+
+
 @shared_task(bind=True, max_retries=2, default_retry_delay=30)
-def run_analysis_task(self, analysis_id: str):
+def run_analysis_task(
+    self, analysis_id: str, queue: str | None = None, enqueued_at: float | None = None
+):
+    """
+    Run one analysis. ``queue`` and ``enqueued_at`` (epoch seconds the task
+    became due) are set by apps.analysis.dispatch for the queue-wait metric.
+    """
+    record_queue_wait(queue, enqueued_at)
     try:
         result = AnalysisResult.objects.select_related(
-            "resume", "job_description"
+            "resume", "job_description__text"
         ).get(id=analysis_id)
     except AnalysisResult.DoesNotExist:
         logger.error("AnalysisResult %s not found — task aborted", analysis_id)
         return
 
+    # Claim the row atomically — a streaming request may already own it
+    claimed = AnalysisResult.objects.filter(
+        id=analysis_id, status=AnalysisResult.Status.PENDING, awaiting_resume=False
+    ).update(status=AnalysisResult.Status.PROCESSING)
+    if not claimed:
+        logger.info("AnalysisResult %s already claimed — task skipped", analysis_id)
+        return
     result.status = AnalysisResult.Status.PROCESSING
-    result.save(update_fields=["status"])
+    publish_status(result.id, result.status)
+
+    resume_text = result.resume.parsed_text
+    jd_text = result.job_description.raw_text
 
     try:
-        data = run_analysis(
-            result.resume.parsed_text,
-            result.job_description.raw_text,
-        )
-        result.match_score = max(0, min(100, int(data.get("match_score", 0))))
-        result.hire_probability = max(0.0, min(1.0, float(data.get("hire_probability", 0.0))))
-        result.ats_flags = data.get("ats_flags", [])
-        result.rewritten_bullets = data.get("rewritten_bullets", [])
-        result.cover_letter = data.get("cover_letter", "")
-        result.status = AnalysisResult.Status.DONE
-        result.completed_at = timezone.now()
-        result.save()
+        cached = get_cached_analysis(resume_text, jd_text, record_metrics=False)
+        if cached is not None:
+            apply_analysis_data(result, cached["data"], cached["provider"])
+        elif settings.ANALYSIS_SPLIT_SECTIONS:
+            data = run_sync(run_sectioned_analysis(result, resume_text, jd_text))
+            store_analysis(resume_text, jd_text, data, result.provider)
+        else:
+            data, provider, usage = run_analysis(resume_text, jd_text)
+            apply_analysis_data(result, data, provider, usage)
+            store_analysis(resume_text, jd_text, data, provider)
     except Exception as exc:
+        if is_transient_error(exc) and self.request.retries < self.max_retries:
+            countdown = retry_countdown(self.request.retries, exc)
+            logger.warning(
+                "Analysis %s hit a transient provider error (%s); retrying in %.0fs",
+                analysis_id, exc, countdown,
+            )
+            release_for_retry(result)
+            raise self.retry(
+                exc=exc,
+                countdown=countdown,
+                kwargs={"queue": queue, "enqueued_at": time.time() + countdown},
+            )
         logger.exception("Analysis task failed for %s", analysis_id)
-        result.status = AnalysisResult.Status.FAILED
-        result.error_message = str(exc)
-        result.save(update_fields=["status", "error_message"])
\ No newline at end of file
+        mark_analysis_failed(result, exc)
+
+
+@shared_task
+def start_analysis_group(analysis_ids: list[str], queue: str) -> None:
+    """
+    Send run_analysis_task for each of ``analysis_ids`` as one group, stamped
+    with the time they are sent. apps.analysis.dispatch chains this after a
+    batch's first analysis, so the rest wait from when they join the queue.
+    """
+    enqueued_at = time.time()
+    group(
+        run_analysis_task.si(analysis_id, queue=queue, enqueued_at=enqueued_at).set(queue=queue)
+        for analysis_id in analysis_ids
+    ).apply_async()
@@ -0,0 +1,36 @@
+import pytest
+from django.core.cache import caches
+
+from apps.accounts.models import User
+from apps.analysis.jd_texts import text_for
+from apps.analysis.models import AnalysisResult, JobDescription
+from apps.resumes.models import Resume
+
+
+@pytest.fixture(autouse=True)
+def clear_analysis_cache():
+    # "default" holds the API throttle history, keyed on user ids that the
+    # test database reuses
+    for alias in ("analysis", "default"):
+        caches[alias].clear()
+    yield
+    for alias in ("analysis", "default"):
+        caches[alias].clear()
+
+
+@pytest.fixture
+def analysis(db):
+    user = User.objects.create_user(email="candidate@example.com", password="pw")
+    resume = Resume.objects.create(
+        user=user,
+        file="resumes/test.pdf",
+        original_filename="test.pdf",
+        file_size=1024,
+        mime_type="application/pdf",
+        parsed_text="Python engineer with Django and Celery experience.",
+        parse_status=Resume.ParseStatus.DONE,
+    )
+    jd = JobDescription.objects.create(
+        user=user, title="Backend Engineer", text=text_for("Looking for Python and Kubernetes.")
+    )
+    return AnalysisResult.objects.create(resume=resume, job_description=jd)
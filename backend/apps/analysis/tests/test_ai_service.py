@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+from django.test import override_settings
+
+from apps.analysis import ai_service, provider_health
+from apps.analysis.fake_provider import SAMPLE_ANALYSIS
+
+
+@pytest.fixture(autouse=True)
+def fresh_health():
+    provider_health.reset()
+    yield
+    provider_health.reset()
+
+
+@pytest.fixture
+def fake_calls(monkeypatch):
+    """
+    Replace the provider call with one whose latency and outcome are set per
+    provider. Records which providers started, finished and were cancelled.
+    """
+    behaviour = {}
+    log = {"started": [], "finished": [], "cancelled": []}
+
+    async def fake_acall(provider, prompt):
+        log["started"].append(provider)
+        delay, error = behaviour[provider]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            log["cancelled"].append(provider)
+            raise
+        if error is not None:
+            raise error
+        log["finished"].append(provider)
+        return dict(SAMPLE_ANALYSIS, served_by=provider), {"input_tokens": 10}
+
+    monkeypatch.setattr(ai_service, "_acall_provider", fake_acall)
+    return behaviour, log
+
+
+@override_settings(AI_PROVIDER="claude", AI_FAILOVER_ENABLED=False, AI_HEDGING_ENABLED=True)
+def test_hedging_alone_includes_the_secondary():
+    assert ai_service.provider_order() == ["claude", "openai"]
+
+
+@override_settings(AI_PROVIDER="claude", AI_FAILOVER_ENABLED=False, AI_HEDGING_ENABLED=False)
+def test_no_secondary_without_failover_or_hedging():
+    assert ai_service.provider_order() == ["claude"]
+
+
+@override_settings(
+    AI_PROVIDER="claude",
+    AI_HEDGING_ENABLED=True,
+    AI_HEDGE_DEFAULT_DELAY=0.05,
+)
+def test_slow_primary_is_hedged_and_the_loser_cancelled(fake_calls):
+    behaviour, log = fake_calls
+    behaviour["claude"] = (1.0, None)
+    behaviour["openai"] = (0.01, None)
+
+    data, provider, _ = asyncio.run(ai_service.run_analysis_async("resume", "jd"))
+
+    assert provider == "openai"
+    assert data["served_by"] == "openai"
+    assert log["started"] == ["claude", "openai"]
+    assert log["cancelled"] == ["claude"]
+
+
+@override_settings(
+    AI_PROVIDER="claude",
+    AI_HEDGING_ENABLED=True,
+    AI_HEDGE_DEFAULT_DELAY=1.0,
+)
+def test_fast_primary_is_not_hedged(fake_calls):
+    behaviour, log = fake_calls
+    behaviour["claude"] = (0.01, None)
+    behaviour["openai"] = (0.01, None)
+
+    _, provider, _ = asyncio.run(ai_service.run_analysis_async("resume", "jd"))
+
+    assert provider == "claude"
+    assert log["started"] == ["claude"]
+
+
+@override_settings(
+    AI_PROVIDER="claude",
+    AI_HEDGING_ENABLED=True,
+    AI_HEDGE_DEFAULT_DELAY=1.0,
+)
+def test_primary_error_starts_the_secondary_immediately(fake_calls):
+    behaviour, log = fake_calls
+    behaviour["claude"] = (0.0, RuntimeError("boom"))
+    behaviour["openai"] = (0.01, None)
+
+    _, provider, _ = asyncio.run(ai_service.run_analysis_async("resume", "jd"))
+
+    assert provider == "openai"
+    assert log["cancelled"] == []
+
+
+@override_settings(AI_PROVIDER="claude", AI_FAILOVER_ENABLED=True)
+def test_all_providers_failing_raises_the_last_error(fake_calls):
+    behaviour, _ = fake_calls
+    behaviour["claude"] = (0.0, RuntimeError("claude down"))
+    behaviour["openai"] = (0.0, RuntimeError("openai down"))
+
+    with pytest.raises(RuntimeError, match="openai down"):
+        asyncio.run(ai_service.run_analysis_async("resume", "jd"))
+
+
+@override_settings(AI_CIRCUIT_FAILURE_THRESHOLD=3, AI_CIRCUIT_RESET_TIMEOUT=60)
+def test_circuit_opens_after_consecutive_failures():
+    for _ in range(2):
+        provider_health.record_failure("claude")
+    assert provider_health.is_available("claude")
+
+    provider_health.record_failure("claude")
+    assert not provider_health.is_available("claude")
+
+    with override_settings(AI_PROVIDER="claude", AI_FAILOVER_ENABLED=True):
+        assert ai_service.provider_order() == ["openai"]
+
+
+@override_settings(AI_CIRCUIT_FAILURE_THRESHOLD=1, AI_CIRCUIT_RESET_TIMEOUT=60)
+def test_circuit_half_opens_after_timeout_and_closes_on_success(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(provider_health.time, "monotonic", lambda: now[0])
+
+    provider_health.record_failure("claude")
+    assert not provider_health.is_available("claude")
+
+    now[0] += 61
+    assert provider_health.is_available("claude")
+
+    provider_health.record_success("claude", 0.5)
+    now[0] += 1000
+    assert provider_health.is_available("claude")
+
+
+@override_settings(AI_PROVIDER="claude", AI_FAILOVER_ENABLED=False)
+def test_open_circuit_on_every_provider_falls_back_to_primary():
+    with override_settings(AI_CIRCUIT_FAILURE_THRESHOLD=1):
+        provider_health.record_failure("claude")
+    assert ai_service.provider_order() == ["claude"]
+
+
+@override_settings(
+    AI_HEDGE_MIN_SAMPLES=10,
+    AI_HEDGE_PERCENTILE=90,
+    AI_HEDGE_MIN_DELAY=0.0,
+    AI_HEDGE_DEFAULT_DELAY=30.0,
+)
+def test_hedge_delay_tracks_the_latency_percentile():
+    assert provider_health.hedge_delay("claude") == 30.0
+    for latency in range(1, 11):
+        provider_health.record_success("claude", float(latency))
+    assert provider_health.hedge_delay("claude") == 9.0
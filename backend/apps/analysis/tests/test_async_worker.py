@@ -0,0 +1,255 @@
+import asyncio
+import time
+
+import anthropic
+import fakeredis
+import httpx
+import pytest
+
+from apps.analysis import async_worker, tasks
+from apps.analysis.fake_provider import SAMPLE_ANALYSIS
+from apps.analysis.models import AnalysisResult
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+QUEUE = "analysis.interactive"
+
+
+@pytest.fixture(autouse=True)
+def single_call(settings):
+    settings.ANALYSIS_SPLIT_SECTIONS = False
+
+
+@pytest.fixture
+def redis_server(monkeypatch):
+    # push_async_job uses the sync client, the worker an asyncio one; both
+    # see the same fake server
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        async_worker, "get_redis_client", lambda: fakeredis.FakeRedis(server=server)
+    )
+    monkeypatch.setattr(async_worker, "publish_status", lambda *args, **kwargs: None)
+    monkeypatch.setattr(tasks, "publish_status", lambda *args, **kwargs: None)
+    return server
+
+
+@pytest.fixture
+def sync_redis(redis_server):
+    return fakeredis.FakeRedis(server=redis_server, decode_responses=True)
+
+
+def _async_client(server):
+    return fakeredis.aioredis.FakeRedis(server=server)
+
+
+def _provider(monkeypatch, outcome):
+    calls = []
+
+    async def fake_run_analysis_async(resume_text, jd_text):
+        calls.append(resume_text)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return SAMPLE_ANALYSIS, "claude", {"input_tokens": 100, "output_tokens": 500}
+
+    monkeypatch.setattr(async_worker, "run_analysis_async", fake_run_analysis_async)
+    return calls
+
+
+def _rate_limited():
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    response = httpx.Response(429, headers={"retry-after": "20"}, request=request)
+    return anthropic.RateLimitError("rate limited", response=response, body=None)
+
+
+def test_process_completes_a_pending_analysis(analysis, redis_server, monkeypatch):
+    calls = _provider(monkeypatch, None)
+
+    asyncio.run(async_worker.process_analysis_async(str(analysis.id), QUEUE))
+
+    analysis.refresh_from_db()
+    assert analysis.status == AnalysisResult.Status.DONE
+    assert analysis.match_score == SAMPLE_ANALYSIS["match_score"]
+    assert len(calls) == 1
+
+
+def test_transient_error_requeues_with_backoff(analysis, redis_server, sync_redis, monkeypatch):
+    _provider(monkeypatch, _rate_limited())
+
+    asyncio.run(async_worker.process_analysis_async(str(analysis.id), QUEUE))
+
+    analysis.refresh_from_db()
+    assert analysis.status == AnalysisResult.Status.PENDING
+    [(member, due_at)] = sync_redis.zrange(async_worker.ASYNC_DELAYED_KEY, 0, -1, withscores=True)
+    assert member == f"{QUEUE} {analysis.id} 1"
+    # Backoff is capped well below it, but the provider asked for 20s
+    assert due_at >= time.time() + 19
+
+
+def test_transient_error_fails_once_retries_are_exhausted(
+    analysis, redis_server, sync_redis, monkeypatch
+):
+    _provider(monkeypatch, _rate_limited())
+
+    asyncio.run(async_worker.process_analysis_async(
+        str(analysis.id), QUEUE, tasks.run_analysis_task.max_retries
+    ))
+
+    analysis.refresh_from_db()
+    assert analysis.status == AnalysisResult.Status.FAILED
+    assert sync_redis.zcard(async_worker.ASYNC_DELAYED_KEY) == 0
+
+
+def test_permanent_error_fails_without_retry(analysis, redis_server, sync_redis, monkeypatch):
+    _provider(monkeypatch, ValueError("bad response"))
+
+    asyncio.run(async_worker.process_analysis_async(str(analysis.id), QUEUE))
+
+    analysis.refresh_from_db()
+    assert analysis.status == AnalysisResult.Status.FAILED
+    assert analysis.error_message == "bad response"
+    assert sync_redis.zcard(async_worker.ASYNC_DELAYED_KEY) == 0
+
+
+def test_permanent_error_falls_back_to_the_prescore(analysis, redis_server, monkeypatch, settings):
+    settings.ANALYSIS_DEGRADED_FALLBACK = True
+    AnalysisResult.objects.filter(id=analysis.id).update(provisional_score=55)
+    _provider(monkeypatch, ValueError("bad response"))
+
+    asyncio.run(async_worker.process_analysis_async(str(analysis.id), QUEUE))
+
+    analysis.refresh_from_db()
+    assert analysis.status == AnalysisResult.Status.DONE
+    assert analysis.is_degraded
+    assert analysis.match_score == 55
+
+
+def _run_until(server, processed, count, queues=None):
+    # Run a worker until ``count`` jobs have gone through process_analysis_async
+    async def main():
+        stop = asyncio.Event()
+        real = async_worker.process_analysis_async
+
+        async def process(analysis_id, queue, retries=0):
+            processed.append((analysis_id, queue, retries))
+            await real(analysis_id, queue, retries)
+            if len(processed) >= count:
+                stop.set()
+
+        async_worker.process_analysis_async = process
+        try:
+            await asyncio.wait_for(
+                async_worker.run_worker(4, stop, queues, client=_async_client(server)), 10
+            )
+        finally:
+            async_worker.process_analysis_async = real
+
+    asyncio.run(main())
+
+
+def test_worker_claims_queued_jobs_and_clears_its_state(
+    analysis, redis_server, sync_redis, monkeypatch
+):
+    _provider(monkeypatch, None)
+    async_worker.push_async_jobs([str(analysis.id)], queue=QUEUE)
+    processed = []
+
+    _run_until(redis_server, processed, 1)
+
+    assert processed == [(str(analysis.id), QUEUE, 0)]
+    analysis.refresh_from_db()
+    assert analysis.status == AnalysisResult.Status.DONE
+    assert sync_redis.llen(async_worker._queue_key(QUEUE)) == 0
+    # Nothing left for another worker to reclaim
+    assert sync_redis.keys("analysis-async:processing:*") == []
+    assert sync_redis.smembers(async_worker.ASYNC_WORKERS_KEY) == set()
+
+
+def test_worker_runs_delayed_jobs_once_due(analysis, redis_server, sync_redis, monkeypatch):
+    _provider(monkeypatch, None)
+    sync_redis.zadd(async_worker.ASYNC_DELAYED_KEY, {
+        f"{QUEUE} {analysis.id} 1": time.time() - 1,
+        f"{QUEUE} later 0": time.time() + 3600,
+    })
+    processed = []
+
+    _run_until(redis_server, processed, 1)
+
+    # The retry count travels with the job
+    assert processed == [(str(analysis.id), QUEUE, 1)]
+    assert sync_redis.zrange(async_worker.ASYNC_DELAYED_KEY, 0, -1) == [f"{QUEUE} later 0"]
+
+
+def test_worker_retries_a_transient_error_through_the_delayed_set(
+    analysis, redis_server, monkeypatch, settings
+):
+    settings.ANALYSIS_RETRY_BACKOFF_BASE = 0
+    attempts = []
+
+    async def flaky_run_analysis_async(resume_text, jd_text):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise httpx.ConnectError("connection reset")
+        return SAMPLE_ANALYSIS, "claude", {}
+
+    monkeypatch.setattr(async_worker, "run_analysis_async", flaky_run_analysis_async)
+    monkeypatch.setattr(async_worker, "HOUSEKEEPING_INTERVAL", 0.05)
+    async_worker.push_async_job(str(analysis.id), queue=QUEUE)
+    processed = []
+
+    _run_until(redis_server, processed, 2)
+
+    assert [retries for _, _, retries in processed] == [0, 1]
+    analysis.refresh_from_db()
+    assert analysis.status == AnalysisResult.Status.DONE
+
+
+def _lose_job(sync_redis, analysis_id, retries):
+    # A worker took the job and died: its processing list still holds it
+    sync_redis.sadd(async_worker.ASYNC_WORKERS_KEY, "dead")
+    sync_redis.rpush(
+        async_worker._processing_key("dead", QUEUE),
+        async_worker._job(analysis_id, time.time(), retries),
+    )
+
+
+def test_jobs_of_a_dead_worker_are_requeued(analysis, redis_server, sync_redis):
+    AnalysisResult.objects.filter(id=analysis.id).update(status=AnalysisResult.Status.PROCESSING)
+    _lose_job(sync_redis, analysis.id, 0)
+    # A live worker's jobs are left alone
+    sync_redis.sadd(async_worker.ASYNC_WORKERS_KEY, "alive")
+    sync_redis.set(async_worker._heartbeat_key("alive"), 1)
+    sync_redis.rpush(async_worker._processing_key("alive", QUEUE), "other 0 0")
+
+    asyncio.run(async_worker._reclaim_lost_jobs(_async_client(redis_server), "me"))
+
+    analysis.refresh_from_db()
+    assert analysis.status == AnalysisResult.Status.PENDING
+    [job] = sync_redis.lrange(async_worker._queue_key(QUEUE), 0, -1)
+    assert async_worker._parse_job(job)[::2] == (str(analysis.id), 1)
+    assert sync_redis.smembers(async_worker.ASYNC_WORKERS_KEY) == {"alive"}
+    assert sync_redis.keys("analysis-async:processing:*") == [
+        async_worker._processing_key("alive", QUEUE)
+    ]
+
+
+def test_unclaimed_job_of_a_dead_worker_is_requeued_without_a_retry(
+    analysis, redis_server, sync_redis
+):
+    _lose_job(sync_redis, analysis.id, 0)
+
+    asyncio.run(async_worker._reclaim_lost_jobs(_async_client(redis_server), "me"))
+
+    [job] = sync_redis.lrange(async_worker._queue_key(QUEUE), 0, -1)
+    assert async_worker._parse_job(job)[::2] == (str(analysis.id), 0)
+
+
+def test_lost_job_fails_once_retries_are_exhausted(analysis, redis_server, sync_redis):
+    AnalysisResult.objects.filter(id=analysis.id).update(status=AnalysisResult.Status.PROCESSING)
+    _lose_job(sync_redis, analysis.id, tasks.run_analysis_task.max_retries)
+
+    asyncio.run(async_worker._reclaim_lost_jobs(_async_client(redis_server), "me"))
+
+    analysis.refresh_from_db()
+    assert analysis.status == AnalysisResult.Status.FAILED
+    assert sync_redis.llen(async_worker._queue_key(QUEUE)) == 0
+    assert sync_redis.keys("analysis-async:processing:*") == []
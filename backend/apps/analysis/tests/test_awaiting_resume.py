@@ -0,0 +1,111 @@
+import pytest
+from rest_framework.test import APIClient
+
+from apps.analysis import dispatch
+from apps.analysis.models import AnalysisResult
+from apps.resumes import tasks as resume_tasks
+from apps.resumes.models import Resume
+
+JD_TEXT = "We are hiring a backend engineer to build Python and Django services. " * 2
+PARSED = {
+    "text": "Python engineer with Django and Celery experience.",
+    "layout": {},
+    "stats": {},
+}
+
+
+@pytest.fixture
+def resume(analysis, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    (tmp_path / "resumes").mkdir()
+    (tmp_path / "resumes" / "test.pdf").write_bytes(b"%PDF-1.4")
+    resume = analysis.resume
+    resume.is_paid = True
+    resume.parse_status = Resume.ParseStatus.PENDING
+    resume.parsed_text = ""
+    resume.save()
+    return resume
+
+
+@pytest.fixture
+def client(resume):
+    api = APIClient()
+    api.force_authenticate(resume.user)
+    return api
+
+
+@pytest.fixture
+def enqueued(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        dispatch, "enqueue_analysis", lambda analysis_id, **kwargs: calls.append([analysis_id])
+    )
+    monkeypatch.setattr(
+        dispatch, "enqueue_analyses", lambda analysis_ids, **kwargs: calls.append(analysis_ids)
+    )
+    monkeypatch.setattr(
+        "apps.analysis.views.enqueue_analysis", lambda *args, **kwargs: pytest.fail("enqueued early")
+    )
+    return calls
+
+
+def parse(monkeypatch, resume, document=PARSED):
+    monkeypatch.setattr(resume_tasks, "extract_isolated", lambda *args: document)
+    resume_tasks.parse_resume_task(resume.id)
+
+
+def test_analysis_waits_for_the_parse_and_starts_after_it(client, resume, enqueued, monkeypatch):
+    response = client.post(
+        "/api/v1/analysis/", {"resume_id": resume.id, "job_description": JD_TEXT}, format="json"
+    )
+
+    assert response.status_code == 202
+    result = AnalysisResult.objects.get(id=response.data["id"])
+    assert result.awaiting_resume and result.provisional_score is None
+    assert enqueued == []
+
+    parse(monkeypatch, resume)
+
+    result.refresh_from_db()
+    assert not result.awaiting_resume
+    assert result.provisional_score is not None
+    assert enqueued == [[str(result.id)]]
+
+    # Releasing again (the signal racing the view) starts nothing new
+    dispatch.release_awaiting_analyses(resume.id)
+    assert enqueued == [[str(result.id)]]
+
+
+def test_batch_waits_and_fans_out_once(
+    client, resume, enqueued, monkeypatch, django_capture_on_commit_callbacks
+):
+    jobs = [{"job_description": f"{JD_TEXT} Role {i}."} for i in range(3)]
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post(
+            "/api/v1/analysis/batch/", {"resume_id": resume.id, "jobs": jobs}, format="json"
+        )
+    assert response.status_code == 202
+    assert enqueued == []
+
+    parse(monkeypatch, resume)
+
+    assert len(enqueued) == 1
+    assert sorted(enqueued[0]) == sorted(str(r["id"]) for r in response.data["results"])
+
+
+def test_failed_parse_fails_waiting_analyses(client, resume, enqueued, monkeypatch):
+    response = client.post(
+        "/api/v1/analysis/", {"resume_id": resume.id, "job_description": JD_TEXT}, format="json"
+    )
+
+    parse(monkeypatch, resume, {"text": "", "layout": {}, "stats": {}})
+
+    result = AnalysisResult.objects.get(id=response.data["id"])
+    assert result.status == AnalysisResult.Status.FAILED
+    assert result.error_message == resume_tasks.NO_TEXT_ERROR
+    assert enqueued == []
+
+    response = client.post(
+        "/api/v1/analysis/", {"resume_id": resume.id, "job_description": JD_TEXT}, format="json"
+    )
+    assert response.status_code == 422
@@ -0,0 +1,149 @@
+import pytest
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.analysis import ai_service, dispatch, views
+from apps.analysis.fake_provider import SAMPLE_ANALYSIS
+from apps.analysis.models import AnalysisBatch, AnalysisResult
+from apps.analysis.result_cache import store_analysis
+
+JD_TEXT = "We are hiring a backend engineer to build Python and Django services. " * 3
+
+
+@pytest.fixture
+def client(analysis):
+    user = analysis.resume.user
+    analysis.resume.is_paid = True
+    analysis.resume.save()
+    api = APIClient()
+    api.force_authenticate(user)
+    return api
+
+
+@pytest.fixture
+def enqueued(monkeypatch):
+    calls = []
+    monkeypatch.setattr(views, "enqueue_analyses", calls.append)
+    return calls
+
+
+def post_batch(client, resume, jobs):
+    return client.post(
+        "/api/v1/analysis/batch/",
+        {"resume_id": resume.id, "jobs": jobs},
+        format="json",
+    )
+
+
+def test_batch_creates_rows_and_fans_out_once(
+    client, analysis, enqueued, django_capture_on_commit_callbacks
+):
+    jobs = [{"job_description": f"{JD_TEXT} Role {i}.", "job_title": f"Role {i}"} for i in range(3)]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = post_batch(client, analysis.resume, jobs)
+
+    assert response.status_code == 202
+    batch = AnalysisBatch.objects.get(id=response.data["id"])
+    assert batch.results.count() == 3
+    assert len(enqueued) == 1
+    assert sorted(enqueued[0]) == sorted(str(r["id"]) for r in response.data["results"])
+
+
+def test_cached_pairs_are_answered_without_enqueueing(
+    client, analysis, enqueued, django_capture_on_commit_callbacks
+):
+    cached_jd = f"{JD_TEXT} Cached role."
+    store_analysis(analysis.resume.parsed_text, cached_jd, SAMPLE_ANALYSIS, "claude")
+    jobs = [{"job_description": cached_jd}, {"job_description": f"{JD_TEXT} New role."}]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = post_batch(client, analysis.resume, jobs)
+
+    statuses = [r["status"] for r in response.data["results"]]
+    assert statuses == ["done", "pending"]
+    assert len(enqueued[0]) == 1
+
+
+def test_progress_is_aggregated_in_one_query(
+    client, analysis, enqueued, django_assert_num_queries
+):
+    jobs = [{"job_description": f"{JD_TEXT} Role {i}."} for i in range(4)]
+    batch_id = post_batch(client, analysis.resume, jobs).data["id"]
+    results = AnalysisResult.objects.filter(batch_id=batch_id)
+    AnalysisResult.objects.filter(id=results[0].id).update(status="done")
+    AnalysisResult.objects.filter(id=results[1].id).update(status="failed")
+
+    with django_assert_num_queries(1):
+        response = client.get(f"/api/v1/analysis/batch/{batch_id}/")
+
+    assert response.data["total"] == 4
+    assert response.data["done"] == 1
+    assert response.data["failed"] == 1
+    assert response.data["pending"] == 2
+    assert response.data["complete"] is False
+
+
+def test_other_users_cannot_read_a_batch(client, analysis, enqueued):
+    batch_id = post_batch(client, analysis.resume, [{"job_description": JD_TEXT}]).data["id"]
+
+    other = APIClient()
+    other.force_authenticate(User.objects.create_user(email="other@example.com", password="pw"))
+    assert other.get(f"/api/v1/analysis/batch/{batch_id}/").status_code == 404
+
+
+def test_batch_size_is_capped(client, analysis, enqueued, settings):
+    settings.ANALYSIS_BATCH_MAX_JOBS = 2
+    jobs = [{"job_description": JD_TEXT}] * 3
+    assert post_batch(client, analysis.resume, jobs).status_code == 400
+
+
+def test_celery_fan_out_warms_the_prompt_cache_first(monkeypatch, settings):
+    settings.ANALYSIS_EXECUTION_MODE = "celery"
+    order = []
+    monkeypatch.setattr(
+        dispatch.run_analysis_task,
+        "run",
+        lambda analysis_id, **kwargs: order.append(analysis_id),
+    )
+
+    dispatch.enqueue_analyses(["a", "b", "c"])
+
+    assert order[0] == "a"
+    assert sorted(order[1:]) == ["b", "c"]
+
+
+def test_bulk_mode_batches_are_left_for_the_bulk_runner(
+    client, analysis, enqueued, django_capture_on_commit_callbacks
+):
+    jobs = [{"job_description": f"{JD_TEXT} Role {i}."} for i in range(2)]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post(
+            "/api/v1/analysis/batch/",
+            {"resume_id": analysis.resume.id, "jobs": jobs, "mode": "bulk"},
+            format="json",
+        )
+
+    assert response.status_code == 202
+    assert enqueued == []
+    modes = set(AnalysisResult.objects.filter(batch_id=response.data["id"]).values_list(
+        "execution_mode", flat=True
+    ))
+    assert modes == {"bulk"}
+
+
+def test_ats_flags_come_from_the_resume_and_keyword_checks(
+    client, analysis, enqueued, django_capture_on_commit_callbacks
+):
+    analysis.resume.ats_flags = ["Contains 1 image(s); any text inside them is invisible to ATS"]
+    analysis.resume.save()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = post_batch(client, analysis.resume, [{"job_description": JD_TEXT}])
+
+    flags = response.data["results"][0]["ats_flags"]
+    assert flags[0] == analysis.resume.ats_flags[0]
+    assert "Missing keyword: backend" in flags
+    # ...so the model is no longer asked for them
+    assert "ats_flags" not in str(ai_service.build_analysis_prompt("resume", JD_TEXT))
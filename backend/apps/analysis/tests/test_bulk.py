@@ -0,0 +1,154 @@
+import json
+
+import pytest
+from django.test import override_settings
+
+from apps.analysis import bulk, providers, tasks
+from apps.analysis.ai_service import ANALYSIS_FIELDS
+from apps.analysis.fake_provider import SAMPLE_ANALYSIS, _approx_tokens, start_fake_provider
+from apps.analysis.jd_texts import text_for
+from apps.analysis.models import AnalysisResult, BulkJob, JobDescription
+
+
+@pytest.fixture
+def fake_batches(monkeypatch):
+    server = start_fake_provider(batch_latency=0.0)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    monkeypatch.setattr(bulk, "publish_status", lambda *args: None)
+    monkeypatch.setattr(tasks, "publish_status", lambda *args: None)
+    providers._reset_after_fork()
+    with override_settings(
+        AI_PROVIDER="claude",
+        ANTHROPIC_BASE_URL=base_url,
+        OPENAI_BASE_URL=f"{base_url}/v1",
+        ANTHROPIC_API_KEY="test",
+        OPENAI_API_KEY="test",
+    ):
+        yield server
+    providers._reset_after_fork()
+    server.shutdown()
+
+
+@pytest.fixture
+def bulk_analyses(analysis):
+    rows = [analysis]
+    for i in range(2):
+        jd = JobDescription.objects.create(
+            user=analysis.resume.user, text=text_for(f"Role {i} needs Python and Kubernetes.")
+        )
+        rows.append(AnalysisResult.objects.create(resume=analysis.resume, job_description=jd))
+    AnalysisResult.objects.update(execution_mode=AnalysisResult.ExecutionMode.BULK)
+    return rows
+
+
+@pytest.mark.parametrize("provider", ["claude", "openai"])
+def test_bulk_round_trip(fake_batches, bulk_analyses, provider, settings):
+    settings.AI_PROVIDER = provider
+
+    job = bulk.submit_bulk_analyses()
+
+    assert job.request_count == 3
+    assert job.provider_batch_id
+    assert set(AnalysisResult.objects.values_list("status", flat=True)) == {"processing"}
+
+    assert bulk.poll_bulk_jobs() == 1
+
+    job.refresh_from_db()
+    assert job.status == BulkJob.Status.ENDED
+    for row in AnalysisResult.objects.all():
+        assert row.status == AnalysisResult.Status.DONE
+        assert row.match_score == SAMPLE_ANALYSIS["match_score"]
+        assert row.provider == provider
+        # The model is no longer asked for the locally computed ATS flags
+        assert row.output_tokens == _approx_tokens(
+            json.dumps({f: SAMPLE_ANALYSIS[f] for f in ANALYSIS_FIELDS})
+        )
+
+
+def test_running_batches_are_left_alone(fake_batches, bulk_analyses):
+    fake_batches.batch_latency = 60
+    bulk.submit_bulk_analyses()
+
+    assert bulk.poll_bulk_jobs() == 0
+    assert set(AnalysisResult.objects.values_list("status", flat=True)) == {"processing"}
+
+
+def test_submission_respects_the_limit(fake_batches, bulk_analyses):
+    first = bulk.submit_bulk_analyses(limit=2)
+    second = bulk.submit_bulk_analyses(limit=2)
+
+    assert (first.request_count, second.request_count) == (2, 1)
+    assert bulk.submit_bulk_analyses() is None
+
+
+def test_interactive_rows_are_not_submitted(fake_batches, analysis):
+    assert bulk.submit_bulk_analyses() is None
+
+
+def test_failed_submission_releases_the_rows(fake_batches, bulk_analyses, monkeypatch):
+    def broken(results):
+        raise ConnectionError("provider unreachable")
+
+    monkeypatch.setattr(bulk, "_submit_claude", broken)
+
+    with pytest.raises(ConnectionError):
+        bulk.submit_bulk_analyses()
+
+    assert set(AnalysisResult.objects.values_list("status", flat=True)) == {"pending"}
+    assert BulkJob.objects.get().status == BulkJob.Status.FAILED
+
+
+def test_rows_missing_from_the_output_fail(fake_batches, bulk_analyses, monkeypatch):
+    job = bulk.submit_bulk_analyses()
+    monkeypatch.setattr(bulk, "_fetch_claude", lambda job: {})
+
+    bulk.collect_bulk_job(job)
+
+    assert set(AnalysisResult.objects.values_list("status", flat=True)) == {"failed"}
+
+
+def test_incomplete_results_degrade_to_the_prescore(
+    fake_batches, bulk_analyses, monkeypatch, settings
+):
+    settings.ANALYSIS_DEGRADED_FALLBACK = True
+    first, second, third = bulk_analyses
+    AnalysisResult.objects.filter(id=first.id).update(provisional_score=55)
+    job = bulk.submit_bulk_analyses()
+    # Cut off by max_tokens after the bullets
+    partial = json.dumps(SAMPLE_ANALYSIS)[:json.dumps(SAMPLE_ANALYSIS).index('"cover_letter"')]
+    usage = {"input_tokens": 100, "output_tokens": 4096}
+    monkeypatch.setattr(bulk, "_fetch_claude", lambda job: {
+        str(first.id): (partial, usage, True),
+        str(second.id): (partial, usage, True),
+        str(third.id): "Batch request errored: {'type': 'overloaded_error'}",
+    })
+
+    bulk.collect_bulk_job(job)
+
+    first.refresh_from_db()
+    assert first.status == AnalysisResult.Status.DONE
+    assert first.is_degraded
+    assert first.match_score == SAMPLE_ANALYSIS["match_score"]
+    assert first.rewritten_bullets == SAMPLE_ANALYSIS["rewritten_bullets"]
+    assert first.output_tokens == 4096
+    assert "cover_letter" in first.error_message
+    second.refresh_from_db()
+    assert second.status == AnalysisResult.Status.FAILED
+    assert second.match_score == SAMPLE_ANALYSIS["match_score"]
+    third.refresh_from_db()
+    assert third.status == AnalysisResult.Status.FAILED
+    assert third.error_message == "Batch request errored: {'type': 'overloaded_error'}"
+    assert BulkJob.objects.get().status == BulkJob.Status.ENDED
+
+
+def test_errored_item_degrades_to_the_prescore(fake_batches, bulk_analyses, monkeypatch, settings):
+    settings.ANALYSIS_DEGRADED_FALLBACK = True
+    AnalysisResult.objects.update(provisional_score=40)
+    job = bulk.submit_bulk_analyses()
+    monkeypatch.setattr(bulk, "_fetch_claude", lambda job: {})
+
+    bulk.collect_bulk_job(job)
+
+    assert set(AnalysisResult.objects.values_list("status", "is_degraded", "match_score")) == {
+        ("done", True, 40)
+    }
@@ -0,0 +1,110 @@
+from apps.analysis.ai_service import build_analysis_prompt
+from apps.analysis.compression import (
+    OMITTED_MARKER,
+    compress_resume,
+    estimate_tokens,
+    resume_excerpts,
+    split_sections,
+)
+
+JD = "Backend engineer: Python, Django, PostgreSQL and Kubernetes on AWS."
+
+SHORT_RESUME = """Jane Doe
+jane@example.com
+Page 1 of 2
+
+EXPERIENCE
+Senior Engineer, Acme (2020 - now)
+- Built Django services on PostgreSQL
+Page 2 of 2
+
+References available upon request
+"""
+
+
+def _long_resume(filler_lines: int) -> str:
+    filler = "\n".join(
+        f"- Organised team offsite number {i} and ordered catering for everyone"
+        for i in range(filler_lines)
+    )
+    return (
+        "Jane Doe\njane@example.com\n\n"
+        "EXPERIENCE\n"
+        "Senior Engineer, Acme (2020 - now)\n"
+        f"{filler}\n"
+        "- Ran Kubernetes clusters on AWS for Django and PostgreSQL services\n"
+        "EDUCATION\nBSc Computer Science\n"
+        "HOBBIES\nChess, climbing, baking sourdough bread\n"
+    )
+
+
+def test_short_resumes_only_lose_boilerplate():
+    compressed = compress_resume(SHORT_RESUME, 2000)
+    assert "Page 1" not in compressed and "References" not in compressed
+    assert compressed.splitlines() == [
+        "Jane Doe",
+        "jane@example.com",
+        "EXPERIENCE",
+        "Senior Engineer, Acme (2020 - now)",
+        "- Built Django services on PostgreSQL",
+    ]
+
+
+def test_under_budget_prompts_share_the_resume_block_across_jds():
+    first = build_analysis_prompt(SHORT_RESUME, JD)
+    second = build_analysis_prompt(SHORT_RESUME, "Data analyst, SQL and Tableau.")
+    assert first["resume"] == second["resume"]
+
+
+KUBERNETES_LINE = "- Ran Kubernetes clusters on AWS for Django and PostgreSQL services"
+
+
+def test_long_resumes_fit_the_budget_and_keep_key_sections():
+    resume = _long_resume(200)
+    compressed = compress_resume(resume, 300)
+
+    assert estimate_tokens(compressed) <= 300 < estimate_tokens(resume)
+    # Header block, section headers and order are kept; hobbies are dropped first
+    lines = compressed.splitlines()
+    assert lines[:3] == ["Jane Doe", "jane@example.com", "EXPERIENCE"]
+    assert lines.index("EXPERIENCE") < lines.index("EDUCATION")
+    assert "HOBBIES" not in lines
+    assert OMITTED_MARKER in lines
+
+
+def test_over_budget_prompts_still_share_the_resume_block_across_jds(settings):
+    settings.ANALYSIS_RESUME_TOKEN_BUDGET = 300
+    first = build_analysis_prompt(_long_resume(200), JD)
+    second = build_analysis_prompt(_long_resume(200), "Data analyst, SQL and Tableau.")
+    assert first["resume"] == second["resume"]
+    # The JD-relevant line the prefix left out follows it, with the JD
+    assert KUBERNETES_LINE not in first["resume"]
+    assert KUBERNETES_LINE in first["job_description"]
+    assert "<resume_excerpts>" not in second["job_description"]
+
+
+def test_excerpts_are_the_left_out_lines_matching_the_jd():
+    resume = _long_resume(200)
+    assert resume_excerpts(resume, JD, 300, 100) == KUBERNETES_LINE
+    assert resume_excerpts(resume, JD, 300, 0) == ""
+    assert resume_excerpts(SHORT_RESUME, JD, 2000, 100) == ""
+
+
+def test_recent_lines_win_ties():
+    compressed = compress_resume(_long_resume(200), 300)
+    assert "number 0 " in compressed
+    assert "number 199 " not in compressed
+
+
+def test_sections_are_split_on_known_and_uppercase_headers():
+    sections = split_sections("Jane\nWork Experience\nAcme\nTECHNICAL STACK\nPython")
+    assert [(s["header"], s["lines"]) for s in sections] == [
+        (None, ["Jane"]),
+        ("Work Experience", ["Acme"]),
+        ("TECHNICAL STACK", ["Python"]),
+    ]
+
+
+def test_token_estimate_is_close_to_four_chars_per_token():
+    text = "Led a team of five engineers building payment services in Python and Go."
+    assert 0.8 <= estimate_tokens(text) / (len(text) / 4) <= 1.2
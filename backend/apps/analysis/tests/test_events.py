@@ -0,0 +1,139 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import fakeredis
+import pytest
+
+from apps.analysis import events, views
+from apps.analysis.models import AnalysisResult
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture
+def redis_server(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        events.aioredis.Redis, "from_url", lambda url: fakeredis.aioredis.FakeRedis(server=server)
+    )
+    return server
+
+
+def publish(server, analysis_id, **message):
+    fakeredis.FakeRedis(server=server).publish(
+        events.status_channel(analysis_id), json.dumps(message)
+    )
+
+
+def run_events(result_id, timeout=5) -> list[tuple[str, dict | None]]:
+    """
+    Collect the frames of _status_events as (event, data) pairs, keep-alives
+    as ("keep-alive", None).
+    """
+    async def collect():
+        return [frame async for frame in views._status_events(result_id)]
+
+    frames = asyncio.run(asyncio.wait_for(collect(), timeout))
+    parsed = []
+    for frame in frames:
+        if frame.startswith(":"):
+            parsed.append(("keep-alive", None))
+            continue
+        kind, data = frame.strip().split("\n")
+        parsed.append((kind.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return parsed
+
+
+@pytest.fixture
+def on_subscribe(monkeypatch):
+    """Run a callback between the stream's subscribe and its read of the row."""
+    callbacks = []
+
+    @asynccontextmanager
+    async def subscription(analysis_id):
+        async with events.status_subscription(analysis_id) as pubsub:
+            for callback in callbacks:
+                callback()
+            yield pubsub
+
+    monkeypatch.setattr(views, "status_subscription", subscription)
+    return callbacks.append
+
+
+def test_terminal_row_is_sent_without_waiting(analysis, redis_server, settings):
+    settings.ANALYSIS_EVENTS_MAX_DURATION = 60
+    AnalysisResult.objects.filter(id=analysis.id).update(status=AnalysisResult.Status.DONE)
+
+    frames = run_events(analysis.id, timeout=2)
+
+    assert [kind for kind, _ in frames] == ["status", "done"]
+    assert frames[0][1] == {"status": AnalysisResult.Status.DONE}
+    assert frames[1][1]["id"] == str(analysis.id)
+
+
+def test_message_published_before_the_row_is_read_is_not_lost(
+    analysis, redis_server, settings, on_subscribe
+):
+    settings.ANALYSIS_EVENTS_MAX_DURATION = 60
+    # The worker finishes after the subscribe but before the stream's read
+    # of the row sees it; only the published message tells the stream
+    on_subscribe(lambda: publish(redis_server, analysis.id, status=AnalysisResult.Status.DONE))
+
+    frames = run_events(analysis.id, timeout=2)
+
+    assert [data for kind, data in frames if kind == "status"] == [
+        {"status": AnalysisResult.Status.PENDING},
+        {"status": AnalysisResult.Status.DONE},
+    ]
+    assert frames[-1][0] == "done"
+
+
+def test_section_fields_are_forwarded(analysis, redis_server, settings, on_subscribe):
+    settings.ANALYSIS_EVENTS_MAX_DURATION = 60
+
+    def finish():
+        publish(redis_server, analysis.id, status=AnalysisResult.Status.PROCESSING)
+        publish(
+            redis_server, analysis.id,
+            status=AnalysisResult.Status.PROCESSING, section="score",
+            fields={"match_score": 81, "sections": {"score": "done"}},
+        )
+        publish(redis_server, analysis.id, status=AnalysisResult.Status.FAILED)
+
+    on_subscribe(finish)
+
+    frames = run_events(analysis.id, timeout=2)
+
+    assert [kind for kind, _ in frames] == ["status", "status", "field", "status", "status", "done"]
+    assert frames[2][1] == {"match_score": 81, "sections": {"score": "done"}}
+    assert frames[-2][1] == {"status": AnalysisResult.Status.FAILED}
+
+
+def test_silence_sends_heartbeats_until_the_max_duration(analysis, redis_server, settings):
+    settings.ANALYSIS_EVENTS_HEARTBEAT = 0.1
+    settings.ANALYSIS_EVENTS_MAX_DURATION = 0.35
+
+    frames = run_events(analysis.id, timeout=2)
+
+    # The stream closes without a result; the client reconnects
+    assert frames[0] == ("status", {"status": AnalysisResult.Status.PENDING})
+    assert [kind for kind, _ in frames[1:]] == ["keep-alive"] * len(frames[1:])
+    assert 2 <= len(frames[1:]) <= 3
+
+
+def test_iter_status_messages_yields_messages_and_heartbeats(redis_server):
+    async def collect():
+        received = []
+        async with events.status_subscription("abc") as pubsub:
+            publish(redis_server, "abc", status="processing")
+            async for message in events.iter_status_messages(pubsub, heartbeat=0.1, max_duration=0.25):
+                received.append(message)
+        return received
+
+    received = asyncio.run(collect())
+
+    assert received[0] == {"status": "processing"}
+    # Silence after it, and nothing for the subscribe confirmation
+    assert received[1:] == [None, None]
+
@@ -0,0 +1,64 @@
+import pytest
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from rest_framework.test import APIClient
+
+from apps.analysis import views
+from apps.analysis.jd_texts import text_for, text_hash, texts_for
+from apps.analysis.models import JobDescription, JobDescriptionText
+
+JD_TEXT = ("We are hiring a backend engineer to build Python and Django services. " * 3).strip()
+
+
+def test_identical_texts_share_one_row(db):
+    first, second, other = texts_for([JD_TEXT, JD_TEXT, "Frontend role: React."])
+
+    assert first.pk == second.pk != other.pk
+    assert text_for(JD_TEXT).pk == first.pk
+    assert JobDescriptionText.objects.count() == 2
+    assert "django" in first.keywords["terms"]
+    assert first.minhash is not None
+
+
+def test_resubmitted_posting_reuses_the_stored_text(analysis, monkeypatch):
+    monkeypatch.setattr(views, "enqueue_analysis", lambda *args, **kwargs: None)
+    monkeypatch.setattr(views, "enqueue_analyses", lambda *args, **kwargs: None)
+    analysis.resume.is_paid = True
+    analysis.resume.save()
+    client = APIClient()
+    client.force_authenticate(analysis.resume.user)
+
+    for _ in range(2):
+        client.post(
+            "/api/v1/analysis/",
+            {"resume_id": analysis.resume.id, "job_description": JD_TEXT},
+            format="json",
+        )
+    client.post(
+        "/api/v1/analysis/batch/",
+        {"resume_id": analysis.resume.id, "jobs": [{"job_description": JD_TEXT}] * 2},
+        format="json",
+    )
+
+    shared = JobDescriptionText.objects.get(sha256=text_hash(JD_TEXT))
+    assert shared.job_descriptions.count() == 4
+    assert JobDescription.objects.filter(text=shared).first().raw_text == JD_TEXT
+
+
+@pytest.mark.django_db(transaction=True)
+def test_migration_moves_existing_texts_into_shared_rows(django_user_model):
+    executor = MigrationExecutor(connection)
+    executor.migrate([("analysis", "0010_jobdescriptiontext")])
+    old_apps = executor.loader.project_state([("analysis", "0010_jobdescriptiontext")]).apps
+    OldJobDescription = old_apps.get_model("analysis", "JobDescription")
+    user = django_user_model.objects.create_user(email="jd@example.com", password="pw")
+    for text in (JD_TEXT, "Another posting.", JD_TEXT):
+        OldJobDescription.objects.create(user_id=user.id, raw_text=text)
+
+    executor = MigrationExecutor(connection)
+    executor.loader.build_graph()
+    executor.migrate(executor.loader.graph.leaf_nodes())
+
+    assert JobDescriptionText.objects.count() == 2
+    texts = [jd.raw_text for jd in JobDescription.objects.order_by("id")]
+    assert texts == [JD_TEXT, "Another posting.", JD_TEXT]
@@ -0,0 +1,155 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from apps.analysis import near_duplicates, views
+from apps.analysis.jd_texts import text_for, text_hash
+from apps.analysis.models import AnalysisResult, JobDescription, JobDescriptionText
+from apps.resumes.models import Resume
+
+JD = """Senior Backend Engineer - Payments Platform
+
+About the role
+We are looking for a senior backend engineer to join the payments platform team.
+You will design, build and operate the services that move money for millions of
+customers, working closely with product, risk and finance.
+
+What you will do
+- Design and build reliable Python and Django services for card and bank payments
+- Own the ledger and reconciliation pipelines running on PostgreSQL and Kafka
+- Improve observability, on-call tooling and incident response for the platform
+- Mentor engineers and lead technical design reviews across the team
+
+What we are looking for
+- 5+ years building production backend systems in Python, Go or Java
+- Deep experience with relational databases, queues and distributed systems
+- Experience running services on AWS with Kubernetes and Terraform
+- Clear written communication and a habit of shipping small increments
+
+Benefits
+- Competitive salary and equity
+- 30 days of paid holiday plus public holidays
+- Private health, dental and vision insurance
+- Annual learning budget and home office allowance
+"""
+TRACKING = "\nApply now: https://jobs.example.com/apply?utm_source=linkedin&ref=8812\n"
+
+
+def _reorder_benefits(text: str) -> str:
+    head, benefits = text.split("Benefits\n")
+    lines = benefits.strip().splitlines()
+    return head + "Benefits\n" + "\n".join(reversed(lines))
+
+
+def _other_team(text: str) -> str:
+    return (
+        text.replace("payments platform", "search infrastructure")
+        .replace("Payments Platform", "Search")
+        .replace("money", "queries")
+    )
+
+
+def _score(a: str, b: str) -> float:
+    return near_duplicates.similarity(near_duplicates.minhash(a), near_duplicates.minhash(b))
+
+
+def test_variants_of_the_same_posting_are_near_duplicates(settings):
+    threshold = settings.ANALYSIS_NEAR_DUPLICATE_THRESHOLD
+    assert _score(JD, _reorder_benefits(JD)) == 1.0
+    assert _score(JD, "  ".join(JD.split(" ")).replace("\n", "\n\n")) == 1.0
+    assert _score(JD, JD + TRACKING) >= threshold
+    # Same template, different team and role: not a duplicate
+    assert _score(JD, _other_team(JD)) < threshold
+    assert _score(JD, "Frontend engineer: React, TypeScript, accessibility.") == 0.0
+
+
+def test_unrelated_postings_share_no_band():
+    keys = set(near_duplicates.band_keys(near_duplicates.minhash(JD)))
+    other = near_duplicates.band_keys(near_duplicates.minhash("Frontend engineer. " * 30))
+
+    assert len(keys) == near_duplicates.BANDS
+    assert not keys & set(other)
+
+
+@pytest.fixture
+def earlier(analysis):
+    """A finished analysis of the resume against JD."""
+    analysis.job_description.text = text_for(JD)
+    analysis.job_description.save()
+    analysis.status = AnalysisResult.Status.DONE
+    analysis.match_score = 81
+    analysis.hire_probability = 0.6
+    analysis.cover_letter = "Dear hiring team"
+    analysis.provider = "claude"
+    analysis.save()
+    return analysis
+
+
+@pytest.fixture
+def client(earlier, monkeypatch):
+    monkeypatch.setattr(views, "enqueue_analysis", lambda *args, **kwargs: None)
+    earlier.resume.is_paid = True
+    earlier.resume.save()
+    api = APIClient()
+    api.force_authenticate(earlier.resume.user)
+    return api
+
+
+def post_analysis(client, resume, text):
+    return client.post(
+        "/api/v1/analysis/",
+        {"resume_id": resume.id, "job_description": text},
+        format="json",
+    )
+
+
+def test_near_duplicate_jd_reuses_the_earlier_analysis(client, earlier):
+    response = post_analysis(client, earlier.resume, _reorder_benefits(JD) + TRACKING)
+
+    assert response.status_code == 201
+    result = AnalysisResult.objects.get(id=response.data["id"])
+    assert result.status == AnalysisResult.Status.DONE
+    assert result.reused_from_id == earlier.id
+    assert (result.match_score, result.cover_letter) == (81, "Dear hiring team")
+    assert result.job_description.text.minhash_bands.count() == near_duplicates.BANDS
+
+
+def test_different_jd_is_analyzed(client, earlier):
+    response = post_analysis(client, earlier.resume, _other_team(JD))
+
+    assert response.status_code == 202
+    assert AnalysisResult.objects.get(id=response.data["id"]).reused_from is None
+
+
+def test_near_duplicates_are_per_resume_and_can_be_disabled(earlier, settings):
+    jd = JobDescription.objects.create(user=earlier.resume.user, text=text_for(JD + TRACKING))
+    assert near_duplicates.find_near_duplicate(earlier.resume, jd) == earlier
+
+    other_resume = Resume.objects.create(
+        user=earlier.resume.user,
+        file="resumes/other.pdf",
+        original_filename="other.pdf",
+        file_size=1024,
+        mime_type="application/pdf",
+        parsed_text="Go engineer.",
+    )
+    assert near_duplicates.find_near_duplicate(other_resume, jd) is None
+
+    settings.ANALYSIS_NEAR_DUPLICATE_ENABLED = False
+    assert near_duplicates.find_near_duplicate(earlier.resume, jd) is None
+
+
+def test_backfill_command_indexes_unindexed_texts(db):
+    texts = [
+        JobDescriptionText.objects.create(sha256=text_hash(text), text=text)
+        for text in (JD, JD + TRACKING)
+    ]
+
+    call_command("index_job_descriptions", "--chunk-size", "1", stdout=io.StringIO())
+
+    for text in texts:
+        text.refresh_from_db()
+        assert text.minhash is not None and text.keywords["terms"]
+        assert text.minhash_bands.count() == near_duplicates.BANDS
@@ -0,0 +1,83 @@
+import pytest
+
+from apps.analysis import prescore as prescore_module
+from apps.analysis.models import AnalysisResult
+from apps.analysis.prescore import build_keyword_vector, prescore
+from apps.analysis.tasks import mark_analysis_failed
+
+JD = (
+    "Senior Backend Engineer. Strong Python and Django experience required. "
+    "You will build REST APIs on PostgreSQL and Redis, deploy on AWS with Docker "
+    "and Kubernetes, and run Celery queues. Machine learning experience is a plus; "
+    "machine learning pipelines in production."
+)
+
+
+def test_matching_resume_scores_higher_than_unrelated_one():
+    strong, _ = prescore(
+        "Python engineer: Django REST APIs, PostgreSQL, Redis, Celery, Docker, "
+        "Kubernetes on AWS. Built machine learning pipelines.",
+        JD,
+    )
+    weak, _ = prescore("Pastry chef with ten years of French baking.", JD)
+    assert strong > 80
+    assert weak < 10
+
+
+def test_missing_keywords_are_ranked_skills_first():
+    _, missing = prescore("Python and Django developer.", JD)
+    assert "python" not in missing and "django" not in missing
+    assert "kubernetes" in missing and "queues" not in missing  # capped at the top ten
+    # Words of a missing phrase are not repeated on their own
+    assert "machine learning" in missing
+    assert "machine" not in missing and "learning" not in missing
+
+
+def test_stopword_only_jd_has_no_score():
+    assert prescore("anything", "We are looking for the best and the")[0] is None
+
+
+def test_jd_vector_is_computed_once_per_text(monkeypatch):
+    calls = []
+    original = prescore_module.build_keyword_vector
+
+    def counting(jd_text):
+        calls.append(jd_text)
+        return original(jd_text)
+
+    monkeypatch.setattr(prescore_module, "build_keyword_vector", counting)
+    prescore("resume one", JD)
+    prescore("resume two", JD)
+    assert len(calls) == 1
+
+
+def test_keyword_vector_boosts_skills():
+    vector = build_keyword_vector("python python teamwork teamwork")
+    weights = dict(zip(vector["terms"], vector["weights"]))
+    assert weights["python"] > weights["teamwork"]
+
+
+def test_failed_analysis_falls_back_to_the_prescore(analysis, monkeypatch):
+    monkeypatch.setattr("apps.analysis.tasks.publish_status", lambda *args: None)
+    analysis.provisional_score = 55
+
+    mark_analysis_failed(analysis, RuntimeError("all providers down"))
+
+    analysis.refresh_from_db()
+    assert analysis.status == AnalysisResult.Status.DONE
+    assert analysis.is_degraded
+    assert analysis.match_score == 55
+    assert analysis.error_message == "all providers down"
+
+
+@pytest.mark.parametrize("enabled,score", [(False, 55), (True, None)])
+def test_no_fallback_without_prescore_or_when_disabled(analysis, monkeypatch, settings, enabled, score):
+    monkeypatch.setattr("apps.analysis.tasks.publish_status", lambda *args: None)
+    settings.ANALYSIS_DEGRADED_FALLBACK = enabled
+    analysis.provisional_score = score
+
+    mark_analysis_failed(analysis, RuntimeError("down"))
+
+    analysis.refresh_from_db()
+    assert analysis.status == AnalysisResult.Status.FAILED
+    assert not analysis.is_degraded
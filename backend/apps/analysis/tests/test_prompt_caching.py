@@ -0,0 +1,55 @@
+import pytest
+from django.test import override_settings
+
+from apps.analysis import ai_service, providers
+from apps.analysis.fake_provider import start_fake_provider
+
+RESUME = "Senior Python engineer who scaled Django and Celery services. " * 120
+
+
+@pytest.fixture
+def fake_provider_settings():
+    server = start_fake_provider()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    providers._reset_after_fork()
+    with override_settings(
+        ANTHROPIC_BASE_URL=base_url,
+        OPENAI_BASE_URL=f"{base_url}/v1",
+        ANTHROPIC_API_KEY="test",
+        OPENAI_API_KEY="test",
+    ):
+        yield
+    providers._reset_after_fork()
+    server.shutdown()
+
+
+def test_prefix_is_shared_across_job_descriptions():
+    first = ai_service.build_analysis_prompt(RESUME, "Backend role using Django.")
+    second = ai_service.build_analysis_prompt(RESUME, "Data role using Spark.")
+    assert first["system"] == second["system"]
+    assert first["resume"] == second["resume"]
+    assert first["job_description"] != second["job_description"]
+
+
+def test_claude_request_marks_the_resume_block_cacheable():
+    prompt = ai_service.build_analysis_prompt(RESUME, "Backend role.")
+    resume_block, jd_block = ai_service._claude_request(prompt)["messages"][0]["content"]
+    assert resume_block["cache_control"] == {"type": "ephemeral"}
+    assert "cache_control" not in jd_block
+
+    with override_settings(ANTHROPIC_PROMPT_CACHING=False):
+        request = ai_service._claude_request(prompt)
+    assert "cache_control" not in request["messages"][0]["content"][0]
+
+
+@pytest.mark.parametrize("provider", ["claude", "openai"])
+def test_repeat_resume_reads_the_prefix_from_cache(fake_provider_settings, provider):
+    first = ai_service.build_analysis_prompt(RESUME, "Backend role using Django.")
+    second = ai_service.build_analysis_prompt(RESUME, "Data role using Spark.")
+
+    _, cold = ai_service._call_provider(provider, first)
+    _, warm = ai_service._call_provider(provider, second)
+
+    assert cold["cache_read_tokens"] == 0
+    assert warm["cache_read_tokens"] > 0
+    assert warm["input_tokens"] < cold["input_tokens"] + cold["cache_write_tokens"]
@@ -0,0 +1,165 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from apps.analysis import providers
+
+
+@pytest.fixture(autouse=True)
+def fresh_providers(settings):
+    settings.ANTHROPIC_API_KEY = "test"
+    settings.OPENAI_API_KEY = "test"
+    providers._reset_after_fork()
+    yield
+    providers._reset_after_fork()
+
+
+def test_sync_client_is_reused_within_the_process():
+    client = providers.get_client("claude")
+
+    assert providers.get_client("claude") is client
+    assert providers.get_client("openai") is not client
+
+
+def test_sync_client_is_rebuilt_after_a_fork():
+    client = providers.get_client("claude")
+
+    providers._reset_after_fork()
+
+    assert providers.get_client("claude") is not client
+
+
+def test_async_client_is_built_once_per_event_loop():
+    async def clients():
+        return providers.get_async_client("claude"), providers.get_async_client("claude")
+
+    first, again = asyncio.run(clients())
+    other_loop, _ = asyncio.run(clients())
+
+    assert first is again
+    assert other_loop is not first
+
+
+def test_timeouts_and_connection_limits_reach_the_sdk(settings, monkeypatch):
+    settings.ANTHROPIC_CONNECT_TIMEOUT = 3.0
+    settings.ANTHROPIC_READ_TIMEOUT = 45.0
+    settings.ANTHROPIC_MAX_CONCURRENCY = 4
+    built = []
+
+    class RecordingClient(httpx.Client):
+        def __init__(self, **kwargs):
+            built.append(kwargs)
+            super().__init__(**kwargs)
+
+    monkeypatch.setattr(httpx, "Client", RecordingClient)
+
+    client = providers.get_client("claude")
+
+    [options] = built
+    assert options["timeout"] == httpx.Timeout(45.0, connect=3.0)
+    assert options["limits"].max_connections == 4
+    assert options["limits"].max_keepalive_connections == 4
+    assert client.timeout == httpx.Timeout(45.0, connect=3.0)
+    assert isinstance(client._client, RecordingClient)
+
+
+class Gauge:
+    """Track the peak number of holders of a provider slot."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.current = self.peak = 0
+
+    def enter(self):
+        with self.lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def exit(self):
+        with self.lock:
+            self.current -= 1
+
+
+def test_max_concurrency_caps_sync_calls(settings):
+    settings.ANTHROPIC_MAX_CONCURRENCY = 2
+    gauge = Gauge()
+
+    def call():
+        with providers.provider_slot("claude"):
+            gauge.enter()
+            time.sleep(0.02)
+            gauge.exit()
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert gauge.peak == 2
+
+
+def test_max_concurrency_is_one_cap_across_threads_and_event_loops(settings):
+    settings.ANTHROPIC_MAX_CONCURRENCY = 3
+    gauge = Gauge()
+
+    def sync_calls():
+        for _ in range(4):
+            with providers.provider_slot("claude"):
+                gauge.enter()
+                time.sleep(0.01)
+                gauge.exit()
+
+    async def async_call():
+        async with providers.async_provider_slot("claude"):
+            gauge.enter()
+            await asyncio.sleep(0.01)
+            gauge.exit()
+
+    def loop_calls():
+        async def main():
+            await asyncio.gather(*(async_call() for _ in range(6)))
+
+        asyncio.run(main())
+
+    threads = [
+        threading.Thread(target=target)
+        for target in (sync_calls, sync_calls, loop_calls, loop_calls)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert gauge.peak == 3
+    # Every slot came back
+    assert providers._slots["claude"]._free == 3
+
+
+def test_cancelled_waiter_does_not_leak_a_slot(settings):
+    settings.ANTHROPIC_MAX_CONCURRENCY = 1
+
+    async def main():
+        async def hold(release):
+            async with providers.async_provider_slot("claude"):
+                await release.wait()
+
+        release = asyncio.Event()
+        holder = asyncio.create_task(hold(release))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(hold(asyncio.Event()))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        release.set()
+        await holder
+        await asyncio.gather(waiter, return_exceptions=True)
+        # The slot is free again for the next call
+        async with providers.async_provider_slot("claude"):
+            pass
+
+    asyncio.run(asyncio.wait_for(main(), 2))
+
+    assert providers._slots["claude"]._free == 1
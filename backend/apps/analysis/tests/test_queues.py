@@ -0,0 +1,109 @@
+import random
+import time
+import uuid
+from collections import Counter
+
+import pytest
+from rest_framework.test import APIClient
+
+from apps.analysis import dispatch, metrics, queues, tasks
+from apps.analysis.fake_provider import SAMPLE_ANALYSIS
+from apps.analysis.models import AnalysisResult
+
+
+@pytest.fixture
+def sent(monkeypatch, settings):
+    """Queues run_analysis_task was sent to, in order."""
+    settings.ANALYSIS_EXECUTION_MODE = "celery"
+    calls = []
+
+    def fake_apply_async(args, kwargs=None, queue=None, **options):
+        calls.append((queue, kwargs))
+
+    monkeypatch.setattr(dispatch.run_analysis_task, "apply_async", fake_apply_async)
+    return calls
+
+
+def test_weighted_order_favours_heavier_queues(settings):
+    settings.ANALYSIS_QUEUE_WEIGHTS = {"fast": 6, "slow": 1}
+    random.seed(3)
+
+    firsts = Counter(queues.weighted_order(["slow", "fast"])[0] for _ in range(7000))
+
+    assert 5500 < firsts["fast"] < 6500
+    # Every queue is still polled, just after the heavier ones more often
+    assert sorted(queues.weighted_order(["slow", "fast"])) == ["fast", "slow"]
+
+
+def test_weighted_cycle_lists_all_consumed_queues(settings):
+    cycle = queues.weighted_cycle()
+    cycle.update(["analysis.bulk", "analysis.interactive", "analysis.staff"])
+
+    assert sorted(cycle.consume(3)) == ["analysis.bulk", "analysis.interactive", "analysis.staff"]
+
+
+def test_queue_wait_is_recorded_per_queue():
+    queues.record_queue_wait("analysis.bulk", time.time() - 12)
+    queues.record_queue_wait("analysis.bulk", time.time() - 0.2)
+    queues.record_queue_wait(None, time.time())
+
+    counters = metrics.get_counters(*queues.wait_metric_names("analysis.bulk"))
+    assert counters["queue.analysis.bulk.jobs"] == 2
+    assert 12000 <= counters["queue.analysis.bulk.wait_ms"] < 13000
+    assert counters["queue.analysis.bulk.wait_le_1s"] == 1
+    assert counters["queue.analysis.bulk.wait_le_30s"] == 1
+
+
+@pytest.mark.parametrize(
+    "is_staff,queue", [(False, "analysis.interactive"), (True, "analysis.staff")]
+)
+def test_single_analyses_are_routed_by_origin(analysis, sent, is_staff, queue):
+    user = analysis.resume.user
+    user.is_staff = is_staff
+    user.save()
+    analysis.resume.is_paid = True
+    analysis.resume.save()
+    client = APIClient()
+    client.force_authenticate(user)
+
+    response = client.post(
+        "/api/v1/analysis/",
+        {"resume_id": analysis.resume.id, "job_description": "Python and Django engineer " * 5},
+        format="json",
+    )
+
+    assert response.status_code == 202
+    assert [q for q, _ in sent] == [queue]
+    created = AnalysisResult.objects.get(id=response.data["id"])
+    assert queues.queue_for(created.origin) == queue
+
+
+def test_batches_go_to_the_bulk_queue(sent):
+    dispatch.enqueue_analyses(["a"])
+    dispatch.enqueue_analysis("b", origin=AnalysisResult.Origin.BACKFILL)
+
+    assert [q for q, _ in sent] == ["analysis.bulk", "analysis.bulk"]
+    assert all(kwargs["enqueued_at"] <= time.time() for _, kwargs in sent)
+
+
+def test_batch_records_a_queue_wait_per_analysis(db, settings):
+    settings.ANALYSIS_EXECUTION_MODE = "celery"
+    # Unknown ids: each task records its wait, then finds no row
+    ids = [str(uuid.uuid4()) for _ in range(3)]
+
+    dispatch.enqueue_analyses(ids)
+
+    counters = metrics.get_counters("queue.analysis.bulk.jobs")
+    assert counters["queue.analysis.bulk.jobs"] == 3
+
+
+def test_task_records_its_queue_wait(analysis, monkeypatch):
+    monkeypatch.setattr(tasks, "run_analysis", lambda *args: (SAMPLE_ANALYSIS, "claude", {}))
+    monkeypatch.setattr(tasks, "publish_status", lambda *args: None)
+
+    tasks.run_analysis_task(
+        str(analysis.id), queue="analysis.interactive", enqueued_at=time.time() - 3
+    )
+
+    counters = metrics.get_counters("queue.analysis.interactive.jobs")
+    assert counters["queue.analysis.interactive.jobs"] == 1
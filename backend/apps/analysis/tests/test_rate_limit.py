@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from apps.analysis import ai_service, rate_limit
+
+
+@pytest.fixture
+def limiter(settings):
+    settings.AI_RATE_LIMIT_ENABLED = True
+    settings.ANTHROPIC_RPM_LIMIT = 50
+    settings.ANTHROPIC_TPM_LIMIT = 40000
+    settings.AI_RATE_LIMIT_MAX_WAIT = 10
+    rate_limit._reset_after_fork()
+    yield settings
+    rate_limit._reset_after_fork()
+
+
+@pytest.fixture
+def buckets(monkeypatch):
+    """try_acquire() answers: seconds to wait, one per attempt."""
+    waits = []
+    calls = []
+
+    def fake_try_acquire(provider, tokens):
+        calls.append((provider, tokens))
+        return waits.pop(0) if waits else 0.0
+
+    monkeypatch.setattr(rate_limit, "try_acquire", fake_try_acquire)
+    return waits, calls
+
+
+def test_acquire_waits_until_capacity_frees_up(limiter, buckets, monkeypatch):
+    waits, calls = buckets
+    waits.extend([2.0, 1.0])
+    sleeps = []
+    monkeypatch.setattr(rate_limit.time, "sleep", sleeps.append)
+
+    rate_limit.acquire("claude", 900)
+
+    assert calls == [("claude", 900)] * 3
+    assert 2.0 <= sleeps[0] <= 2.4 and 1.0 <= sleeps[1] <= 1.2
+
+
+def test_acquire_gives_up_after_the_max_wait(limiter, buckets, monkeypatch):
+    waits, _ = buckets
+    waits.append(60.0)
+    monkeypatch.setattr(rate_limit.time, "sleep", lambda seconds: None)
+
+    with pytest.raises(rate_limit.RateLimitTimeout):
+        rate_limit.acquire("claude", 900)
+    assert ai_service.is_transient_error(rate_limit.RateLimitTimeout())
+
+
+def test_aacquire_waits_without_blocking(limiter, buckets, monkeypatch):
+    waits, calls = buckets
+    waits.append(0.01)
+
+    asyncio.run(rate_limit.aacquire("openai", 100))
+
+    assert len(calls) == 2
+
+
+def test_limiter_fails_open_when_redis_is_unreachable(limiter):
+    limiter.REDIS_URL = "redis://127.0.0.1:1/0"
+
+    assert rate_limit.try_acquire("claude", 900) == 0.0
+    rate_limit.refund("claude", 100)
+
+
+def test_disabled_or_unlimited_providers_skip_redis(limiter, monkeypatch):
+    monkeypatch.setattr(rate_limit, "_script", pytest.fail)
+    limiter.AI_RATE_LIMIT_ENABLED = False
+    assert rate_limit.try_acquire("claude", 900) == 0.0
+    rate_limit.refund("claude", 100)
+
+    limiter.AI_RATE_LIMIT_ENABLED = True
+    limiter.OPENAI_RPM_LIMIT = 0
+    limiter.OPENAI_TPM_LIMIT = 0
+    assert rate_limit.try_acquire("openai", 900) == 0.0
+
+
+def test_provider_calls_reserve_and_refund_tokens(limiter, monkeypatch):
+    acquired, refunded = [], []
+    monkeypatch.setattr(rate_limit, "acquire", lambda provider, tokens: acquired.append(tokens))
+    monkeypatch.setattr(rate_limit, "refund", lambda provider, tokens: refunded.append(tokens))
+    prompt = ai_service.build_analysis_prompt("Python engineer", "Python role", "score")
+
+    def call(prompt):
+        return "{}", {"input_tokens": 40, "output_tokens": 10}, False
+
+    ai_service._limited_call(call, "claude", prompt)
+
+    assert acquired[0] >= prompt["max_tokens"]
+    assert refunded == [acquired[0] - 50]
@@ -0,0 +1,103 @@
+import asyncio
+import json
+
+import pytest
+
+from apps.analysis import ai_service, metrics
+from apps.analysis.fake_provider import SAMPLE_ANALYSIS
+from apps.analysis.streaming import recover_fields
+
+COMPLETE = {f: SAMPLE_ANALYSIS[f] for f in ai_service.ANALYSIS_FIELDS}
+# Cut off by max_tokens halfway through the cover letter
+TRUNCATED = json.dumps(COMPLETE)[:-20]
+
+
+def test_completed_fields_are_recovered_from_truncated_json():
+    assert recover_fields(TRUNCATED) == {
+        f: COMPLETE[f] for f in ("match_score", "hire_probability", "rewritten_bullets")
+    }
+
+
+def test_off_schema_fields_count_as_missing():
+    raw = json.dumps({**COMPLETE, "match_score": "high", "rewritten_bullets": [1, 2]})
+    data, missing = ai_service.read_analysis_response(raw, "claude")
+    assert missing == ["match_score", "rewritten_bullets"]
+    assert data == {"hire_probability": 0.41, "cover_letter": COMPLETE["cover_letter"]}
+    with pytest.raises(ValueError):
+        ai_service.parse_analysis_response(raw, "claude")
+
+
+@pytest.fixture
+def claude_calls(monkeypatch):
+    """Queue of (raw, truncated) replies for the sync and async Claude calls."""
+    replies, prompts = [], []
+
+    def call(prompt):
+        prompts.append(prompt)
+        raw, truncated = replies.pop(0)
+        return raw, {"input_tokens": 100, "output_tokens": 50}, truncated
+
+    async def acall(prompt):
+        return call(prompt)
+
+    monkeypatch.setattr(ai_service, "_call_claude", call)
+    monkeypatch.setattr(ai_service, "_acall_claude", acall)
+    return replies, prompts
+
+
+def _counters():
+    return metrics.get_counters(
+        ai_service.RESPONSE_METRIC,
+        ai_service.TRUNCATED_METRIC,
+        ai_service.CONTINUATION_METRIC,
+        ai_service.FAILED_METRIC,
+    )
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+def test_truncated_response_is_continued_for_the_missing_field(claude_calls, is_async):
+    replies, prompts = claude_calls
+    replies += [(TRUNCATED, True), (json.dumps({"cover_letter": "Dear team"}), False)]
+    prompt = ai_service.build_analysis_prompt("resume", "job description")
+
+    if is_async:
+        data, usage = asyncio.run(ai_service._acall_provider("claude", prompt))
+    else:
+        data, usage = ai_service._call_provider("claude", prompt)
+
+    assert data == {**COMPLETE, "cover_letter": "Dear team"}
+    assert usage == {"input_tokens": 200, "output_tokens": 100}
+    continuation = prompts[1]
+    assert continuation["fields"] == ("cover_letter",)
+    assert continuation["resume"] == prompt["resume"]  # cached prefix unchanged
+    assert '"cover_letter"' in continuation["job_description"]
+    assert '"match_score"' not in continuation["job_description"]
+    assert continuation["max_tokens"] == ai_service.ANALYSIS_SECTIONS["cover_letter"]["max_tokens"]
+    assert _counters() == {
+        ai_service.RESPONSE_METRIC: 1,
+        ai_service.TRUNCATED_METRIC: 1,
+        ai_service.CONTINUATION_METRIC: 1,
+        ai_service.FAILED_METRIC: 0,
+    }
+
+
+def test_gives_up_after_max_continuations(claude_calls, settings):
+    settings.ANALYSIS_MAX_CONTINUATIONS = 1
+    replies, prompts = claude_calls
+    replies += [(TRUNCATED, True), ("not json", False)]
+
+    with pytest.raises(ValueError, match="cover_letter"):
+        ai_service._call_provider("claude", ai_service.build_analysis_prompt("r", "j"))
+
+    assert len(prompts) == 2
+    assert _counters()[ai_service.FAILED_METRIC] == 1
+
+
+def test_complete_responses_need_no_continuation(claude_calls):
+    replies, prompts = claude_calls
+    replies.append((f"```json\n{json.dumps(COMPLETE)}\n```", False))
+
+    data, _ = ai_service._call_provider("claude", ai_service.build_analysis_prompt("r", "j"))
+
+    assert data == COMPLETE
+    assert len(prompts) == 1
@@ -0,0 +1,57 @@
+from django.test import override_settings
+
+from apps.analysis import ai_service, metrics
+from apps.analysis.result_cache import (
+    HIT_METRIC,
+    MISS_METRIC,
+    analysis_cache_key,
+    get_cached_analysis,
+    store_analysis,
+)
+
+
+def test_key_is_stable_for_identical_inputs():
+    assert analysis_cache_key("resume", "jd") == analysis_cache_key("resume", "jd")
+    assert analysis_cache_key("resume", "jd") != analysis_cache_key("resume", "other jd")
+
+
+def test_key_changes_with_model_and_provider():
+    with override_settings(AI_PROVIDER="claude", ANTHROPIC_MODEL="model-a"):
+        key_a = analysis_cache_key("resume", "jd")
+    with override_settings(AI_PROVIDER="claude", ANTHROPIC_MODEL="model-b"):
+        key_b = analysis_cache_key("resume", "jd")
+    with override_settings(AI_PROVIDER="openai"):
+        key_c = analysis_cache_key("resume", "jd")
+    assert len({key_a, key_b, key_c}) == 3
+
+
+def test_key_changes_with_prompt_version(monkeypatch):
+    before = analysis_cache_key("resume", "jd")
+    monkeypatch.setattr("apps.analysis.result_cache.PROMPT_VERSION", "edited")
+    assert analysis_cache_key("resume", "jd") != before
+
+
+def test_prompt_version_fingerprints_the_template():
+    assert ai_service.PROMPT_VERSION
+    assert len(ai_service.PROMPT_VERSION) == 12
+
+
+def test_round_trip_and_counters():
+    assert get_cached_analysis("resume", "jd") is None
+    store_analysis("resume", "jd", {"match_score": 80}, "claude")
+    assert get_cached_analysis("resume", "jd") == {
+        "data": {"match_score": 80},
+        "provider": "claude",
+    }
+    assert metrics.get_counters(HIT_METRIC, MISS_METRIC) == {HIT_METRIC: 1, MISS_METRIC: 1}
+
+
+def test_worker_lookups_do_not_count():
+    get_cached_analysis("resume", "jd", record_metrics=False)
+    assert metrics.get_counters(MISS_METRIC) == {MISS_METRIC: 0}
+
+
+@override_settings(ANALYSIS_CACHE_ENABLED=False)
+def test_disabled_cache_never_hits():
+    store_analysis("resume", "jd", {"match_score": 80}, "claude")
+    assert get_cached_analysis("resume", "jd") is None
@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+import pytest
+
+from apps.analysis import ai_service, views
+from apps.analysis.models import AnalysisResult
+from apps.analysis.tests.test_response_recovery import COMPLETE, TRUNCATED
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture
+def claude_stream(monkeypatch, settings):
+    """Stream TRUNCATED (cut off by max_tokens), then answer continuations."""
+    settings.AI_PROVIDER = "claude"
+    monkeypatch.setattr(views, "publish_status", lambda *args, **kwargs: None)
+    continuations = []
+
+    async def stream(prompt, outcome):
+        for start in range(0, len(TRUNCATED), 40):
+            yield TRUNCATED[start:start + 40]
+        outcome["usage"] = {"input_tokens": 100, "output_tokens": 50}
+        outcome["truncated"] = True
+
+    async def acall(prompt):
+        continuations.append(prompt)
+        return json.dumps({"cover_letter": "Dear team"}), {"input_tokens": 10, "output_tokens": 5}, False
+
+    monkeypatch.setattr(ai_service, "_stream_claude", stream)
+    monkeypatch.setattr(ai_service, "_acall_claude", acall)
+    return continuations
+
+
+def run_stream(result_id) -> list[tuple[str, dict]]:
+    async def collect():
+        return [frame async for frame in views._stream_analysis_events(result_id)]
+
+    events = []
+    for frame in asyncio.run(collect()):
+        kind, data = frame.strip().split("\n")
+        events.append((kind.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+def test_truncated_stream_is_continued_instead_of_failing(analysis, claude_stream):
+    events = run_stream(analysis.id)
+
+    assert [prompt["fields"] for prompt in claude_stream] == [("cover_letter",)]
+    fields = [data for kind, data in events if kind == "field"]
+    assert fields[-1] == {"cover_letter": "Dear team"}
+    analysis.refresh_from_db()
+    assert analysis.status == AnalysisResult.Status.DONE
+    assert analysis.cover_letter == "Dear team"
+    assert analysis.match_score == COMPLETE["match_score"]
+    assert events[-1][0] == "done"
+
+
+def test_stream_fails_when_continuations_do_not_recover(analysis, claude_stream, settings):
+    settings.ANALYSIS_MAX_CONTINUATIONS = 0
+    run_stream(analysis.id)
+
+    analysis.refresh_from_db()
+    assert analysis.status == AnalysisResult.Status.FAILED
+    assert claude_stream == []
@@ -0,0 +1,59 @@
+import json
+
+from apps.analysis.fake_provider import SAMPLE_ANALYSIS
+from apps.analysis.streaming import IncrementalJSONParser
+
+
+def feed_all(parser, chunks):
+    events = []
+    for chunk in chunks:
+        events.extend(parser.feed(chunk))
+    return events
+
+
+def fields(events):
+    return {key: value for kind, key, value in events if kind == "field"}
+
+
+def streamed(events, key):
+    return "".join(value for kind, k, value in events if kind == "delta" and k == key)
+
+
+def test_single_character_chunks_yield_every_field():
+    text = json.dumps(SAMPLE_ANALYSIS)
+    parser = IncrementalJSONParser(stream_fields={"cover_letter"})
+    events = feed_all(parser, list(text))
+
+    assert fields(events) == SAMPLE_ANALYSIS
+    assert streamed(events, "cover_letter") == SAMPLE_ANALYSIS["cover_letter"]
+    assert parser.text == text
+
+
+def test_fields_are_emitted_as_soon_as_they_complete():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"match_score": 72, "ats_') == [("field", "match_score", 72)]
+    assert parser.feed('flags": ["a", "b"]') == []
+    assert parser.feed("}") == [("field", "ats_flags", ["a", "b"])]
+
+
+def test_escapes_split_across_chunks():
+    value = 'Line one\nquote " backslash \\ snowman ☃ done'
+    text = json.dumps({"cover_letter": value}, ensure_ascii=True)
+
+    for split in range(1, len(text)):
+        parser = IncrementalJSONParser(stream_fields={"cover_letter"})
+        events = feed_all(parser, [text[:split], text[split:]])
+        assert streamed(events, "cover_letter") == value, split
+        assert fields(events) == {"cover_letter": value}, split
+
+
+def test_braces_and_commas_inside_strings_are_not_structure():
+    payload = {"rewritten_bullets": ["Cut costs {30%}, then [more]"], "match_score": 5}
+    parser = IncrementalJSONParser()
+    assert fields(parser.feed(json.dumps(payload))) == payload
+
+
+def test_leading_markdown_fence_is_ignored():
+    parser = IncrementalJSONParser()
+    events = feed_all(parser, ["```json\n", '{"match_score": 1}', "\n```"])
+    assert fields(events) == {"match_score": 1}
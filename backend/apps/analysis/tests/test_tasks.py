@@ -0,0 +1,229 @@
+import asyncio
+
+import anthropic
+import httpx
+import pytest
+from celery.exceptions import Retry
+
+from apps.analysis import ai_service, tasks
+from apps.analysis.fake_provider import SAMPLE_ANALYSIS
+from apps.analysis.models import AnalysisResult
+from apps.analysis.serializers import AnalysisResultSerializer
+
+
+@pytest.fixture(autouse=True)
+def single_call(settings):
+    settings.ANALYSIS_SPLIT_SECTIONS = False
+
+
+@pytest.fixture
+def provider_calls(monkeypatch):
+    calls = []
+
+    def fake_run_analysis(resume_text, jd_text):
+        calls.append((resume_text, jd_text))
+        return SAMPLE_ANALYSIS, "claude", {
+            "input_tokens": 120,
+            "output_tokens": 600,
+            "cache_read_tokens": 1500,
+            "cache_write_tokens": 0,
+        }
+
+    monkeypatch.setattr(tasks, "run_analysis", fake_run_analysis)
+    monkeypatch.setattr(tasks, "publish_status", lambda *args: None)
+    return calls
+
+
+def test_task_claims_and_completes_pending_analysis(analysis, provider_calls):
+    tasks.run_analysis_task(str(analysis.id))
+
+    analysis.refresh_from_db()
+    assert analysis.status == AnalysisResult.Status.DONE
+    assert analysis.match_score == SAMPLE_ANALYSIS["match_score"]
+    assert analysis.provider == "claude"
+    assert analysis.cache_read_tokens == 1500
+    assert len(provider_calls) == 1
+
+
+def test_second_delivery_of_the_task_is_skipped(analysis, provider_calls):
+    tasks.run_analysis_task(str(analysis.id))
+    tasks.run_analysis_task(str(analysis.id))
+
+    assert len(provider_calls) == 1
+
+
+@pytest.mark.parametrize(
+    "status", [AnalysisResult.Status.PROCESSING, AnalysisResult.Status.FAILED]
+)
+def test_task_skips_rows_it_cannot_claim(analysis, provider_calls, status):
+    AnalysisResult.objects.filter(id=analysis.id).update(status=status)
+
+    tasks.run_analysis_task(str(analysis.id))
+
+    analysis.refresh_from_db()
+    assert analysis.status == status
+    assert provider_calls == []
+
+
+def test_provider_error_marks_analysis_failed(analysis, monkeypatch):
+    def failing_run_analysis(resume_text, jd_text):
+        raise ValueError("bad response")
+
+    monkeypatch.setattr(tasks, "run_analysis", failing_run_analysis)
+    monkeypatch.setattr(tasks, "publish_status", lambda *args: None)
+
+    tasks.run_analysis_task(str(analysis.id))
+
+    analysis.refresh_from_db()
+    assert analysis.status == AnalysisResult.Status.FAILED
+    assert analysis.error_message == "bad response"
+
+
+@pytest.fixture
+def section_calls(monkeypatch, settings):
+    """Section calls that finish in the order score, bullets, cover letter."""
+    settings.ANALYSIS_SPLIT_SECTIONS = True
+    delays = {"score": 0.0, "bullets": 0.05, "cover_letter": 0.1}
+    failing = set()
+    snapshots = {}
+
+    async def fake_run_analysis_async(resume_text, jd_text, section=None):
+        await asyncio.sleep(delays[section])
+        if section in failing:
+            raise ValueError(f"{section} failed")
+        fields = ai_service.ANALYSIS_SECTIONS[section]["fields"]
+        return {f: SAMPLE_ANALYSIS[f] for f in fields}, "claude", {"output_tokens": 100}
+
+    def record_publish(analysis_id, status, **extra):
+        if "section" in extra:
+            row = AnalysisResult.objects.get(id=analysis_id)
+            snapshots[extra["section"]] = (row.match_score, row.cover_letter)
+
+    monkeypatch.setattr(ai_service, "run_analysis_async", fake_run_analysis_async)
+    monkeypatch.setattr(tasks, "publish_status", record_publish)
+    return failing, snapshots
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sections_are_saved_as_each_finishes(analysis, section_calls):
+    _, snapshots = section_calls
+
+    tasks.run_analysis_task(str(analysis.id))
+
+    # The score was persisted before the cover letter existed
+    assert snapshots["score"] == (SAMPLE_ANALYSIS["match_score"], "")
+    assert snapshots["cover_letter"][1] == SAMPLE_ANALYSIS["cover_letter"]
+    analysis.refresh_from_db()
+    assert analysis.status == AnalysisResult.Status.DONE
+    assert analysis.sections == {"score": "done", "bullets": "done", "cover_letter": "done"}
+    assert analysis.output_tokens == 300
+
+
+@pytest.mark.django_db(transaction=True)
+def test_failed_section_keeps_the_finished_ones(analysis, section_calls):
+    failing, _ = section_calls
+    failing.add("cover_letter")
+
+    tasks.run_analysis_task(str(analysis.id))
+
+    analysis.refresh_from_db()
+    assert analysis.status == AnalysisResult.Status.FAILED
+    assert analysis.match_score == SAMPLE_ANALYSIS["match_score"]
+    assert analysis.sections["cover_letter"] == "failed"
+    assert analysis.sections["score"] == "done"
+
+
+def test_serializer_reports_section_status(analysis):
+    assert set(AnalysisResultSerializer(analysis).data["sections"].values()) == {"pending"}
+    analysis.sections = {"score": "done", "bullets": "processing", "cover_letter": "processing"}
+    analysis.status = AnalysisResult.Status.PROCESSING
+    assert AnalysisResultSerializer(analysis).data["sections"]["score"] == "done"
+
+
+def _rate_limited():
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    response = httpx.Response(429, headers={"retry-after": "20"}, request=request)
+    return anthropic.RateLimitError("rate limited", response=response, body=None)
+
+
+def test_transient_error_releases_the_row_and_retries(analysis, monkeypatch, settings):
+    settings.ANALYSIS_RETRY_BACKOFF_BASE = 1
+    retries = []
+
+    def failing_run_analysis(resume_text, jd_text):
+        raise _rate_limited()
+
+    def fake_retry(exc, countdown, kwargs):
+        retries.append(countdown)
+        return Retry(exc=exc, when=countdown)
+
+    monkeypatch.setattr(tasks, "run_analysis", failing_run_analysis)
+    monkeypatch.setattr(tasks, "publish_status", lambda *args: None)
+    monkeypatch.setattr(tasks.run_analysis_task, "retry", fake_retry)
+
+    with pytest.raises(Retry):
+        tasks.run_analysis_task(str(analysis.id))
+
+    analysis.refresh_from_db()
+    assert analysis.status == AnalysisResult.Status.PENDING
+    # Backoff would allow at most 1s, but the provider asked for 20
+    assert retries == [20.0]
+
+
+def test_retried_task_completes_after_a_transient_error(analysis, provider_calls, monkeypatch):
+    attempts = []
+    succeed = tasks.run_analysis
+
+    def flaky_run_analysis(resume_text, jd_text):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise httpx.ConnectError("connection reset")
+        return succeed(resume_text, jd_text)
+
+    monkeypatch.setattr(tasks, "run_analysis", flaky_run_analysis)
+    monkeypatch.setattr(tasks.random, "uniform", lambda a, b: 0)
+
+    # apply() runs the retry inline
+    tasks.run_analysis_task.apply(args=[str(analysis.id)], throw=False)
+
+    analysis.refresh_from_db()
+    assert analysis.status == AnalysisResult.Status.DONE
+    assert len(attempts) == 2
+
+
+def test_transient_error_fails_once_retries_are_exhausted(analysis, monkeypatch):
+    def failing_run_analysis(resume_text, jd_text):
+        raise _rate_limited()
+
+    monkeypatch.setattr(tasks, "run_analysis", failing_run_analysis)
+    monkeypatch.setattr(tasks, "publish_status", lambda *args: None)
+    monkeypatch.setattr(tasks.random, "uniform", lambda a, b: 0)
+
+    tasks.run_analysis_task.apply(
+        args=[str(analysis.id)], retries=tasks.run_analysis_task.max_retries
+    )
+
+    analysis.refresh_from_db()
+    assert analysis.status == AnalysisResult.Status.FAILED
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sectioned_retry_only_reruns_unfinished_sections(analysis, section_calls, monkeypatch):
+    calls = []
+    run_one = ai_service.run_analysis_async
+
+    async def counting_run_analysis_async(resume_text, jd_text, section=None):
+        calls.append(section)
+        return await run_one(resume_text, jd_text, section)
+
+    monkeypatch.setattr(ai_service, "run_analysis_async", counting_run_analysis_async)
+    analysis.sections = {"score": "done", "bullets": "failed", "cover_letter": "failed"}
+    analysis.match_score = 55
+    analysis.save()
+
+    tasks.run_analysis_task(str(analysis.id))
+
+    assert sorted(calls) == ["bullets", "cover_letter"]
+    analysis.refresh_from_db()
+    assert analysis.status == AnalysisResult.Status.DONE
+    assert analysis.match_score == 55
@@ -1,8 +1,19 @@
 from django.urls import path
 
-from .views import AnalysisCreateView, AnalysisDetailView
+from .views import (
+    AnalysisBatchCreateView,
+    AnalysisBatchDetailView,
+    AnalysisCreateView,
+    AnalysisDetailView,
+    analysis_events,
+    analysis_stream,
+)
 
 urlpatterns = [
     path("", AnalysisCreateView.as_view(), name="analysis-create"),
+    path("batch/", AnalysisBatchCreateView.as_view(), name="analysis-batch-create"),
+    path("batch/<uuid:pk>/", AnalysisBatchDetailView.as_view(), name="analysis-batch-detail"),
     path("<uuid:pk>/", AnalysisDetailView.as_view(), name="analysis-detail"),
+    path("<uuid:pk>/stream/", analysis_stream, name="analysis-stream"),
+    path("<uuid:pk>/events/", analysis_events, name="analysis-events"),
 ]
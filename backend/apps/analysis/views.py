@@ -1,15 +1,44 @@
+import asyncio
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.resumes.ats import resume_ats_flags
 from apps.resumes.models import Resume
 
-from .models import AnalysisResult, JobDescription
-from .serializers import AnalysisCreateSerializer, AnalysisResultSerializer
-from .tasks import run_analysis_task
+from . import provider_health
+from .ai_service import complete_streamed_analysis, provider_order, stream_analysis
+from .dispatch import (
+    enqueue_analyses,
+    enqueue_analysis,
+    prefill_analysis,
+    release_awaiting_analyses,
+)
+from .events import iter_status_messages, publish_status, status_subscription
+from .jd_texts import text_for, texts_for
+from .models import AnalysisBatch, AnalysisResult, JobDescription
+from .result_cache import store_analysis
+from .serializers import (
+    AnalysisBatchCreateSerializer,
+    AnalysisCreateSerializer,
+    AnalysisResultSerializer,
+)
+from .sse import authenticate, event_stream_response, format_event, unauthorized
+from .streaming import IncrementalJSONParser
+from .tasks import apply_analysis_data, mark_analysis_failed
 from .throttles import AIAnalysisThrottle
 
+logger = logging.getLogger(__name__)
+
 
 class AnalysisCreateView(APIView):
     throttle_classes = [AIAnalysisThrottle]
@@ -28,19 +57,56 @@ class AnalysisCreateView(APIView):
                 status=status.HTTP_402_PAYMENT_REQUIRED,
             )
 
+        if resume.parse_status == Resume.ParseStatus.FAILED:
+            return _unparsed_resume_response(resume)
+
         job_desc = JobDescription.objects.create(
             user=request.user,
             title=d.get("job_title", ""),
             company=d.get("company", ""),
-            raw_text=d["job_description"],
+            text=text_for(d["job_description"]),
         )
-
-        result = AnalysisResult.objects.create(
+        result = AnalysisResult(
             resume=resume,
             job_description=job_desc,
+            origin=(
+                AnalysisResult.Origin.STAFF if request.user.is_staff else AnalysisResult.Origin.PAID
+            ),
         )
 
-        run_analysis_task.delay(str(result.id))
+        if resume.parse_status != Resume.ParseStatus.DONE:
+            # Still being parsed: the analysis is chained after the parse
+            # task, which releases it through the resume_parsed signal. Also
+            # release here in case parsing finished just before the save.
+            result.awaiting_resume = True
+            result.save()
+            release_awaiting_analyses(resume.id)
+            result.refresh_from_db()
+            return Response(
+                AnalysisResultSerializer(result).data,
+                status=status.HTTP_202_ACCEPTED,
+            )
+
+        prefill_analysis(result, resume_ats_flags(resume))
+        result.save()
+        if result.status == AnalysisResult.Status.DONE:
+            return Response(
+                AnalysisResultSerializer(result).data,
+                status=status.HTTP_201_CREATED,
+            )
+
+        if d["stream"]:
+            # The client drives the provider call through AnalysisStreamView.
+            # Queue a delayed fallback in case the stream is never opened; the
+            # task is a no-op if the stream has already claimed the row.
+            if not getattr(settings, "CELERY_TASK_ALWAYS_EAGER", False):
+                enqueue_analysis(
+                    str(result.id),
+                    countdown=settings.ANALYSIS_STREAM_FALLBACK_DELAY,
+                    origin=result.origin,
+                )
+        else:
+            enqueue_analysis(str(result.id), origin=result.origin)
 
         return Response(
             AnalysisResultSerializer(result).data,
@@ -48,6 +114,107 @@ class AnalysisCreateView(APIView):
         )
 
 
+class AnalysisBatchCreateView(APIView):
+    """
+    POST /api/v1/analysis/batch/ — analyze one resume against many job
+    descriptions. Counts as a single request against AIAnalysisThrottle.
+    """
+
+    throttle_classes = [AIAnalysisThrottle]
+
+    def post(self, request):
+        serializer = AnalysisBatchCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        d = serializer.validated_data
+
+        resume = get_object_or_404(Resume, id=d["resume_id"], user=request.user)
+
+        if not resume.is_paid and not request.user.is_staff:
+            return Response(
+                {"detail": "Payment is required before running analysis."},
+                status=status.HTTP_402_PAYMENT_REQUIRED,
+            )
+
+        if resume.parse_status == Resume.ParseStatus.FAILED:
+            return _unparsed_resume_response(resume)
+        # Analyses of a resume still being parsed wait for the parse task
+        awaiting = resume.parse_status != Resume.ParseStatus.DONE
+
+        with transaction.atomic():
+            batch = AnalysisBatch.objects.create(user=request.user, resume=resume)
+            texts = texts_for([job["job_description"] for job in d["jobs"]])
+            job_descs = JobDescription.objects.bulk_create([
+                JobDescription(
+                    user=request.user,
+                    title=job["job_title"],
+                    company=job["company"],
+                    text=text,
+                )
+                for job, text in zip(d["jobs"], texts)
+            ])
+
+            resume_flags = None if awaiting else resume_ats_flags(resume)
+            results = []
+            for job_desc in job_descs:
+                result = AnalysisResult(
+                    resume=resume,
+                    job_description=job_desc,
+                    batch=batch,
+                    execution_mode=d["mode"],
+                    origin=AnalysisResult.Origin.BATCH,
+                    awaiting_resume=awaiting,
+                )
+                if not awaiting:
+                    prefill_analysis(result, resume_flags)
+                results.append(result)
+            AnalysisResult.objects.bulk_create(results)
+
+            pending = [
+                str(result.id)
+                for result in results
+                if result.status == AnalysisResult.Status.PENDING
+            ]
+            if awaiting:
+                transaction.on_commit(lambda: release_awaiting_analyses(resume.id))
+            elif d["mode"] == AnalysisResult.ExecutionMode.INTERACTIVE:
+                transaction.on_commit(lambda: enqueue_analyses(pending))
+
+        return Response(
+            {
+                "id": batch.id,
+                "results": AnalysisResultSerializer(results, many=True).data,
+            },
+            status=status.HTTP_202_ACCEPTED if pending else status.HTTP_201_CREATED,
+        )
+
+
+def _unparsed_resume_response(resume):
+    return Response(
+        {"detail": resume.parse_error or "This resume could not be parsed."},
+        status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+    )
+
+
+class AnalysisBatchDetailView(APIView):
+    def get(self, request, pk):
+        # Aggregate progress in one query; ownership enforced via FK traversal
+        Status = AnalysisResult.Status
+        progress = AnalysisResult.objects.filter(
+            batch_id=pk, batch__user=request.user
+        ).aggregate(
+            total=Count("id"),
+            **{
+                choice.value: Count("id", filter=Q(status=choice.value))
+                for choice in Status
+            },
+        )
+        if not progress["total"]:
+            raise Http404
+        progress["id"] = pk
+        progress["complete"] = progress[Status.DONE] + progress[Status.FAILED] == progress["total"]
+        return Response(progress)
+
+
 class AnalysisDetailView(APIView):
     def get(self, request, pk):
         # Ownership enforced via FK traversal — never exposes another user's data
@@ -57,3 +224,151 @@ class AnalysisDetailView(APIView):
             resume__user=request.user,
         )
         return Response(AnalysisResultSerializer(result).data)
+
+
+async def _stream_analysis_events(result_id):
+    """
+    Run a pending analysis on the provider's streaming API, emitting each
+    top-level field as soon as it is complete and the cover letter as it is
+    written. The finished result is persisted exactly like run_analysis_task.
+    """
+    claimed = await AnalysisResult.objects.filter(
+        id=result_id, status=AnalysisResult.Status.PENDING, awaiting_resume=False
+    ).aupdate(status=AnalysisResult.Status.PROCESSING)
+
+    result = await AnalysisResult.objects.select_related(
+        "resume", "job_description__text"
+    ).aget(id=result_id)
+
+    if not claimed:
+        # Already answered from cache, finished, or owned by a worker
+        yield format_event("status", {"status": result.status})
+        if result.status in (AnalysisResult.Status.DONE, AnalysisResult.Status.FAILED):
+            yield format_event("done", AnalysisResultSerializer(result).data)
+        return
+
+    yield format_event("status", {"status": result.status})
+    await sync_to_async(publish_status)(result_id, result.status)
+
+    resume_text = result.resume.parsed_text
+    jd_text = result.job_description.raw_text
+    # Streaming never hedges; it just skips a provider whose circuit is open
+    provider = provider_order()[0]
+    parser = IncrementalJSONParser(stream_fields={"cover_letter"})
+    outcome = {}
+    sent = {}
+
+    start = time.monotonic()
+    try:
+        try:
+            async for chunk in stream_analysis(resume_text, jd_text, provider, outcome):
+                for kind, key, value in parser.feed(chunk):
+                    if kind == "field":
+                        sent[key] = value
+                    yield format_event(kind, {key: value})
+            # Fields cut off by max_tokens (or invalid) are requested again
+            data, usage = await complete_streamed_analysis(
+                parser.text, resume_text, jd_text, provider, outcome
+            )
+            for key, value in data.items():
+                if key not in sent or sent[key] != value:
+                    yield format_event("field", {key: value})
+        except Exception:
+            provider_health.record_failure(provider)
+            raise
+        provider_health.record_success(provider, time.monotonic() - start)
+
+        await sync_to_async(apply_analysis_data)(result, data, provider, usage)
+        await sync_to_async(store_analysis)(resume_text, jd_text, data, provider)
+    except (asyncio.CancelledError, GeneratorExit):
+        # Client went away mid-stream — hand the analysis to a worker
+        released = await AnalysisResult.objects.filter(
+            id=result_id, status=AnalysisResult.Status.PROCESSING
+        ).aupdate(status=AnalysisResult.Status.PENDING)
+        if released:
+            await sync_to_async(publish_status)(result_id, AnalysisResult.Status.PENDING)
+            await sync_to_async(enqueue_analysis)(str(result_id), origin=result.origin)
+        raise
+    except Exception as exc:
+        logger.exception("Streaming analysis failed for %s", result_id)
+        await sync_to_async(mark_analysis_failed)(result, exc)
+
+    yield format_event("done", AnalysisResultSerializer(result).data)
+
+
+async def analysis_stream(request, pk):
+    """
+    GET /api/v1/analysis/<id>/stream/ — Server-Sent Events for one analysis.
+    Plain async view (not DRF) so it is served natively by config.asgi.
+    """
+    if request.method != "GET":
+        return JsonResponse({"detail": "Method not allowed."}, status=405)
+
+    user = await authenticate(request)
+    if user is None:
+        return unauthorized()
+
+    # Ownership enforced via FK traversal — never exposes another user's data
+    exists = await AnalysisResult.objects.filter(id=pk, resume__user=user).aexists()
+    if not exists:
+        raise Http404
+
+    return event_stream_response(_stream_analysis_events(pk))
+
+
+_TERMINAL_STATUSES = (AnalysisResult.Status.DONE, AnalysisResult.Status.FAILED)
+
+
+async def _status_events(result_id):
+    """
+    Push status transitions for one analysis as they are published by
+    run_analysis_task, then the full result once it reaches a terminal state.
+    """
+    # Subscribe before reading the row so no transition can slip in between
+    async with status_subscription(result_id) as pubsub:
+        current = await AnalysisResult.objects.filter(id=result_id).values_list(
+            "status", flat=True
+        ).aget()
+        yield format_event("status", {"status": current})
+
+        if current not in _TERMINAL_STATUSES:
+            async for message in iter_status_messages(
+                pubsub,
+                heartbeat=settings.ANALYSIS_EVENTS_HEARTBEAT,
+                max_duration=settings.ANALYSIS_EVENTS_MAX_DURATION,
+            ):
+                if message is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                if "fields" in message:
+                    # A section finished; same "field" event as the stream endpoint
+                    yield format_event("field", message["fields"])
+                current = message["status"]
+                yield format_event("status", {"status": current})
+                if current in _TERMINAL_STATUSES:
+                    break
+
+    if current in _TERMINAL_STATUSES:
+        result = await AnalysisResult.objects.aget(id=result_id)
+        yield format_event("done", AnalysisResultSerializer(result).data)
+
+
+async def analysis_events(request, pk):
+    """
+    GET /api/v1/analysis/<id>/events/ — push-based replacement for polling
+    AnalysisDetailView. Authenticates once and holds a single connection that
+    is fed from Redis pub/sub instead of the database.
+    """
+    if request.method != "GET":
+        return JsonResponse({"detail": "Method not allowed."}, status=405)
+
+    user = await authenticate(request)
+    if user is None:
+        return unauthorized()
+
+    # Ownership enforced via FK traversal — never exposes another user's data
+    exists = await AnalysisResult.objects.filter(id=pk, resume__user=user).aexists()
+    if not exists:
+        raise Http404
+
+    return event_stream_response(_status_events(pk))
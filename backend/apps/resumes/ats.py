@@ -0,0 +1,114 @@
+import re
+
+# Deterministic ATS checks, run once at upload on the parser output
+# (parsers.extract_document). They replace asking the model for these flags
+# on every analysis; only keyword coverage depends on the job description,
+# and that comes from the analysis pre-score (keyword_flags below).
+
+MAX_KEYWORD_FLAGS = 5
+
+# Headers ATS parsers map to their standard fields, by the section they mean
+REQUIRED_SECTIONS = {
+    "Experience": frozenset({
+        "experience", "work experience", "professional experience", "relevant experience",
+        "employment", "employment history", "work history", "career history",
+    }),
+    "Education": frozenset({
+        "education", "education and training", "academic background", "qualifications",
+    }),
+    "Skills": frozenset({
+        "skills", "technical skills", "key skills", "core skills", "core competencies",
+        "competencies", "skills and competencies",
+    }),
+}
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(\.[\w-]+)+")
+_PHONE_RE = re.compile(r"(?<!\w)\+?\(?\d[\d\s().-]{7,}\d(?!\w)")
+
+_MONTHS = (
+    r"(jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+)
+DATE_STYLES = {
+    "month name (Jan 2020)": re.compile(rf"\b{_MONTHS}\s+\d{{4}}\b", re.IGNORECASE),
+    "numeric (01/2020)": re.compile(r"(?<![\d/.-])(0?[1-9]|1[0-2])[/.-]\d{4}(?![\d/.-])"),
+    "two-digit year (01/20)": re.compile(r"(?<![\d/.-])(0?[1-9]|1[0-2])/\d{2}(?![\d/.-])"),
+}
+
+
+def _normalize_header(line: str) -> str:
+    line = line.strip().rstrip(":").replace("&", " and ").lower()
+    return " ".join(re.sub(r"[^a-z ]", " ", line).split())
+
+
+def _section_flags(lines: list[str]) -> list[str]:
+    headers = {_normalize_header(line) for line in lines if len(line) <= 40}
+    return [
+        f"No standard '{name}' section header; ATS parsers may not find this section"
+        for name, aliases in REQUIRED_SECTIONS.items()
+        if not headers & aliases
+    ]
+
+
+def _contact_flags(text: str) -> list[str]:
+    flags = []
+    if not _EMAIL_RE.search(text):
+        flags.append("No email address found in the resume text")
+    phones = (m.group() for m in _PHONE_RE.finditer(text))
+    if not any(sum(c.isdigit() for c in phone) >= 9 for phone in phones):
+        flags.append("No phone number found in the resume text")
+    return flags
+
+
+def _date_flags(text: str) -> list[str]:
+    used = [style for style, pattern in DATE_STYLES.items() if pattern.search(text)]
+    if len(used) > 1:
+        return [f"Inconsistent date formats: {' and '.join(used)}"]
+    return []
+
+
+def _layout_flags(layout: dict) -> list[str]:
+    flags = []
+    if layout.get("tables"):
+        flags.append(
+            f"Uses {layout['tables']} table(s); many ATS parsers read table cells "
+            "out of order or skip them"
+        )
+    if layout.get("columns", 1) > 1:
+        flags.append("Multi-column layout; ATS parsers may merge the columns line by line")
+    if layout.get("images"):
+        flags.append(
+            f"Contains {layout['images']} image(s); any text inside them is invisible to ATS"
+        )
+    if layout.get("text_boxes"):
+        flags.append(
+            f"Text in {layout['text_boxes']} text box(es) is skipped by many ATS parsers"
+        )
+    return flags
+
+
+def check_resume(text: str, layout: dict) -> list[str]:
+    """
+    Return the ATS issues found in a parsed resume: layout (tables, columns,
+    images, text boxes), missing standard section headers, missing contact
+    details and mixed date formats.
+    """
+    flags = _layout_flags(layout)
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    if not lines:
+        return [
+            "No extractable text; the file may be a scanned image, which ATS cannot read",
+            *flags,
+        ]
+    return [*flags, *_section_flags(lines), *_contact_flags(text), *_date_flags(text)]
+
+
+def keyword_flags(missing_keywords: list[str]) -> list[str]:
+    """ATS flags for the most important JD keywords the resume lacks."""
+    return [f"Missing keyword: {keyword}" for keyword in missing_keywords[:MAX_KEYWORD_FLAGS]]
+
+
+def resume_ats_flags(resume) -> list[str]:
+    """The flags stored at upload, or a text-only check for older resumes."""
+    if resume.ats_flags is not None:
+        return resume.ats_flags
+    return check_resume(resume.parsed_text, resume.layout)
@@ -0,0 +1,105 @@
+import hashlib
+
+from django.core.files.uploadhandler import FileUploadHandler
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import Resume, ResumeBlob
+
+# Uploaded resume files are stored once per user and SHA-256 of their bytes
+# in ResumeBlob, so uploading the same file again adds a Resume row pointing
+# at the stored object instead of another copy, and takes its parsed text
+# from an earlier upload instead of extracting it again. Each blob counts the
+# resumes using it and its file is deleted with the last of them.
+
+
+class Sha256UploadHandler(FileUploadHandler):
+    """
+    Hash each uploaded file as its chunks stream in, passing them on
+    unchanged to the handlers that store it. ``digests`` maps the form field
+    name to the file's hex SHA-256 once it is complete.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.digests = {}
+        self._hash = None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self._hash = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self._hash.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        self.digests[self.field_name] = self._hash.hexdigest()
+        # The next handler builds the file
+        return None
+
+
+def file_sha256(file) -> str:
+    """Hex SHA-256 of a file object, for files no upload handler has hashed."""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def acquire_blob(user, sha256: str, file) -> tuple[ResumeBlob, bool]:
+    """
+    The user's blob holding ``sha256``, with a reference added, storing
+    ``file`` as a new blob if there is none yet. Returns (blob, created).
+    """
+    with transaction.atomic():
+        blob = ResumeBlob.objects.select_for_update().filter(user=user, sha256=sha256).first()
+        if blob is None:
+            blob = ResumeBlob(user=user, sha256=sha256, file=file, ref_count=1)
+            try:
+                with transaction.atomic():
+                    blob.save()
+                return blob, True
+            except IntegrityError:
+                # A concurrent upload of the same file stored it first: drop
+                # the copy save() wrote and use theirs
+                blob.file.delete(save=False)
+            blob = ResumeBlob.objects.select_for_update().get(user=user, sha256=sha256)
+        ResumeBlob.objects.filter(id=blob.id).update(ref_count=F("ref_count") + 1)
+        blob.ref_count += 1
+        return blob, False
+
+
+def release_blob(blob_id: int) -> None:
+    """
+    Drop a reference to a blob, deleting the blob once nothing uses it; its
+    stored file goes after the transaction commits (signals.delete_blob_file).
+    """
+    with transaction.atomic():
+        blob = ResumeBlob.objects.select_for_update().get(id=blob_id)
+        if blob.ref_count > 1:
+            ResumeBlob.objects.filter(id=blob.id).update(ref_count=F("ref_count") - 1)
+            return
+        blob.delete()
+
+
+def copy_parse(resume: Resume) -> bool:
+    """
+    Give a resume sharing a blob the text, layout and ATS flags of an earlier
+    upload of the same file that parsed successfully, without saving.
+    Returns whether there was one to copy.
+    """
+    parsed = (
+        Resume.objects.filter(blob=resume.blob, parse_status=Resume.ParseStatus.DONE)
+        .exclude(id=resume.id)
+        .order_by("-uploaded_at")
+        .first()
+    )
+    if parsed is None:
+        return False
+    resume.parsed_text = parsed.parsed_text
+    resume.layout = parsed.layout
+    resume.text_stats = parsed.text_stats
+    resume.ats_flags = parsed.ats_flags
+    resume.parse_status = Resume.ParseStatus.DONE
+    return True
@@ -0,0 +1,91 @@
+import logging
+
+from botocore.exceptions import BotoCoreError, ClientError
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+
+from .models import Resume, resume_upload_path
+from .validators import HEADER_SIZE, MAX_FILE_SIZE, detect_mime_type, validate_file_size
+
+logger = logging.getLogger(__name__)
+
+# Direct-to-bucket uploads. The client asks for a presigned POST, sends the
+# file straight to object storage, then confirms with the signed upload
+# token it was given. The web tier only reads the object's first HEADER_SIZE
+# bytes (one ranged GET) to check its magic bytes; text extraction runs in
+# parse_resume_task like any other upload.
+
+UPLOAD_TOKEN_SALT = "resumes.direct-upload"
+
+
+def direct_uploads_enabled() -> bool:
+    """RESUME_DIRECT_UPLOADS is on and files are stored in an S3 bucket."""
+    return settings.RESUME_DIRECT_UPLOADS and hasattr(default_storage, "bucket_name")
+
+
+def _key(name: str) -> str:
+    # Storage name to object key (adds AWS_LOCATION, if any)
+    return default_storage._normalize_name(name)
+
+
+def create_presigned_post(user, filename: str) -> dict:
+    """
+    A presigned POST for uploading one resume of at most MAX_FILE_SIZE bytes
+    under resume_upload_path(), and the token to confirm it with.
+    """
+    name = resume_upload_path(Resume(user=user), filename)
+    post = default_storage.connection.meta.client.generate_presigned_post(
+        Bucket=default_storage.bucket_name,
+        Key=_key(name),
+        Conditions=[["content-length-range", 1, MAX_FILE_SIZE]],
+        ExpiresIn=settings.RESUME_UPLOAD_URL_TTL,
+    )
+    token = signing.dumps(
+        {"user": user.id, "name": name, "filename": filename}, salt=UPLOAD_TOKEN_SALT
+    )
+    return {"url": post["url"], "fields": post["fields"], "upload_token": token}
+
+
+def read_upload_token(token: str, user) -> dict:
+    """The upload a token from create_presigned_post() was issued for."""
+    try:
+        upload = signing.loads(
+            token, salt=UPLOAD_TOKEN_SALT, max_age=settings.RESUME_UPLOAD_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        raise ValidationError("Invalid or expired upload token.")
+    if upload["user"] != user.id:
+        raise ValidationError("Invalid or expired upload token.")
+    return upload
+
+
+def inspect_upload(name: str) -> tuple[int, str]:
+    """
+    (size, MIME type) of an uploaded object, from a single ranged GET of its
+    first HEADER_SIZE bytes. Raises ValidationError if it is missing, too
+    large or not an accepted type.
+    """
+    try:
+        response = default_storage.bucket.Object(_key(name)).get(
+            Range=f"bytes=0-{HEADER_SIZE - 1}"
+        )
+        header = response["Body"].read()
+    except ClientError as exc:
+        if exc.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+            raise ValidationError("Upload not found. Upload the file before confirming it.")
+        raise
+    # "bytes 0-2047/<object size>"
+    content_range = response.get("ContentRange") or ""
+    size = int(content_range.rpartition("/")[2] or response["ContentLength"])
+    validate_file_size(size)
+    return size, detect_mime_type(header)
+
+
+def discard_upload(name: str) -> None:
+    """Delete a rejected upload. Best-effort: a failure is only logged."""
+    try:
+        default_storage.delete(name)
+    except (BotoCoreError, ClientError):
+        logger.warning("Could not delete rejected upload %s", name, exc_info=True)
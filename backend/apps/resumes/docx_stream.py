@@ -0,0 +1,112 @@
+import re
+import zipfile
+
+from lxml import etree
+
+# Streaming DOCX text extraction: word/document.xml and the header/footer
+# parts are read straight from the zip with an incremental parser, and each
+# element is dropped as soon as it is closed, so memory stays flat however
+# long the document is. Paragraphs come out in reading order, including the
+# ones inside table cells and text boxes, which python-docx's
+# Document.paragraphs skips.
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_P = f"{_W}p"
+_T = f"{_W}t"
+_TAB = f"{_W}tab"
+_BREAKS = {f"{_W}br", f"{_W}cr"}
+_TBL = f"{_W}tbl"
+_TXBX = f"{_W}txbxContent"
+_COLS = f"{_W}cols"
+_NUM = f"{_W}num"
+_BLIP = "{http://schemas.openxmlformats.org/drawingml/2006/main}blip"
+# Word stores each text box twice: as DrawingML and as a VML fallback
+_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+DOCUMENT_PART = "word/document.xml"
+_HEADER_FOOTER_RE = re.compile(r"word/(header|footer)(\d*)\.xml")
+
+
+def empty_layout() -> dict:
+    return {"tables": 0, "images": 0, "columns": 1, "text_boxes": 0}
+
+
+def iter_part_paragraphs(stream, layout: dict | None = None):
+    """
+    Yield the non-empty text of each paragraph of a WordprocessingML part, in
+    document order. A paragraph in a text box comes out before the paragraph
+    anchoring it. With ``layout``, tables, images, text boxes and section
+    columns are counted into it.
+    """
+    open_paragraphs = []
+    fallback = 0
+    for event, elem in etree.iterparse(
+        stream, events=("start", "end"), resolve_entities=False, no_network=True
+    ):
+        tag = elem.tag
+        if event == "start":
+            if tag == _FALLBACK:
+                fallback += 1
+            elif fallback:
+                pass
+            elif tag == _P:
+                open_paragraphs.append([])
+            elif layout is not None:
+                if tag == _TBL:
+                    layout["tables"] += 1
+                elif tag == _BLIP:
+                    layout["images"] += 1
+                elif tag == _TXBX:
+                    layout["text_boxes"] += 1
+                elif tag == _COLS and (elem.get(_NUM) or "").isdigit():
+                    layout["columns"] = max(layout["columns"], int(elem.get(_NUM)))
+            continue
+
+        if tag == _FALLBACK:
+            fallback -= 1
+        elif not fallback and open_paragraphs:
+            if tag == _T:
+                open_paragraphs[-1].append(elem.text or "")
+            elif tag == _TAB:
+                open_paragraphs[-1].append("\t")
+            elif tag in _BREAKS:
+                open_paragraphs[-1].append("\n")
+            elif tag == _P:
+                text = "".join(open_paragraphs.pop())
+                if text:
+                    yield text
+        # Whatever has closed is no longer needed
+        elem.clear(keep_tail=False)
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+
+def _part_order(name: str) -> tuple[str, int]:
+    match = _HEADER_FOOTER_RE.fullmatch(name)
+    return match.group(1), int(match.group(2) or 0)
+
+
+def iter_docx_paragraphs(file, layout: dict | None = None):
+    """
+    Yield the paragraphs of a DOCX file object in reading order: headers,
+    then the body (table cells and text boxes included), then footers.
+    Header and footer text repeated across sections comes out once. Only the
+    body is counted into ``layout``.
+    """
+    with zipfile.ZipFile(file) as archive:
+        parts = sorted(
+            (name for name in archive.namelist() if _HEADER_FOOTER_RE.fullmatch(name)),
+            key=_part_order,
+        )
+        headers = [name for name in parts if _part_order(name)[0] == "header"]
+        footers = [name for name in parts if _part_order(name)[0] == "footer"]
+        seen = set()
+        for name in [*headers, DOCUMENT_PART, *footers]:
+            is_body = name == DOCUMENT_PART
+            with archive.open(name) as stream:
+                for text in iter_part_paragraphs(stream, layout if is_body else None):
+                    if not is_body:
+                        if text in seen:
+                            continue
+                        seen.add(text)
+                    yield text
@@ -0,0 +1,186 @@
+import json
+import logging
+import os
+import queue
+import select
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from .parsers import extract_document_from_path
+
+logger = logging.getLogger(__name__)
+
+# PDF/DOCX extraction runs in a small pool of separate worker processes
+# (extraction_worker.py), so a pathological file cannot pin or bloat the
+# Celery worker that asked for it. Each job has a wall-clock timeout (the
+# worker is killed when it runs over), each worker has an address-space
+# limit (RLIMIT_AS), and workers are replaced after a number of jobs. Files
+# are handed over by path and memory-mapped by the worker, never copied
+# through the pipe. Plain subprocesses rather than multiprocessing: Celery's
+# prefork children are daemonic and may not start multiprocessing children.
+
+
+# Seconds a new worker may take to import its parsers and report ready;
+# not counted against the job's timeout
+STARTUP_TIMEOUT = 30
+
+
+class ExtractionError(Exception):
+    """The extraction worker timed out or died before answering."""
+
+
+class _Worker:
+    def __init__(self, memory_limit: int):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "apps.resumes.extraction_worker", str(memory_limit)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=settings.BASE_DIR,
+        )
+        self.jobs = 0
+        try:
+            self._reply(STARTUP_TIMEOUT, "Extraction worker did not start")
+        except ExtractionError:
+            self.kill()
+            raise
+
+    def _reply(self, timeout: float, timeout_message: str) -> dict:
+        ready, _, _ = select.select([self.process.stdout], [], [], timeout)
+        if not ready:
+            raise ExtractionError(timeout_message)
+        line = self.process.stdout.readline()
+        if not line:
+            # Killed by the kernel (RLIMIT_AS exceeded in C code, OOM) or crashed
+            code = self.process.wait()
+            raise ExtractionError(f"Extraction worker exited with code {code}")
+        return json.loads(line)
+
+    def run(self, job: dict, timeout: float) -> dict:
+        self.jobs += 1
+        try:
+            self.process.stdin.write(json.dumps(job).encode() + b"\n")
+            self.process.stdin.flush()
+        except BrokenPipeError:
+            raise ExtractionError("Extraction worker exited unexpectedly")
+        return self._reply(timeout, f"Extraction timed out after {timeout:g}s")
+
+    def close(self) -> None:
+        self.process.stdin.close()
+        try:
+            self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self.kill()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.wait()
+
+
+class ExtractionPool:
+    """
+    Up to ``size`` extraction worker processes, started on demand and reused
+    for up to ``max_jobs`` jobs each. A worker whose peak RSS passed half the
+    memory limit is replaced too: the allocator rarely returns that memory.
+    """
+
+    def __init__(self, size: int, timeout: float, memory_limit: int, max_jobs: int):
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.max_jobs = max_jobs
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+
+    def run(self, path: str, mime_type: str, max_chars: int | None = None) -> dict:
+        """
+        Extract the file at ``path`` in a worker: {"document", "pid",
+        "maxrss_kb"}. Raises ExtractionError on a timeout or a dead worker.
+        """
+        job = {"path": path, "mime_type": mime_type, "max_chars": max_chars}
+        with self._slots:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                worker = _Worker(self.memory_limit)
+            try:
+                reply = worker.run(job, self.timeout)
+            except Exception:
+                worker.kill()
+                raise
+            bloated = self.memory_limit and reply["maxrss_kb"] * 1024 > self.memory_limit / 2
+            if worker.jobs >= self.max_jobs or bloated:
+                worker.close()
+            else:
+                self._idle.put(worker)
+            return reply
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_lock = threading.Lock()
+_pool = None
+
+
+def _reset_after_fork():
+    # A forked child must start its own workers, not share the parent's pipes
+    global _lock, _pool
+    _lock = threading.Lock()
+    _pool = None
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_pool() -> ExtractionPool:
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ExtractionPool(
+                size=settings.RESUME_EXTRACTION_WORKERS,
+                timeout=settings.RESUME_EXTRACTION_TIMEOUT,
+                memory_limit=settings.RESUME_EXTRACTION_MEMORY_LIMIT,
+                max_jobs=settings.RESUME_EXTRACTION_MAX_JOBS,
+            )
+        return _pool
+
+
+def extract_isolated(path: str, mime_type: str) -> dict:
+    """
+    extract_document() of the file at ``path`` within RESUME_MAX_CHARS, in
+    the extraction pool (in-process with RESUME_EXTRACTION_ISOLATED off).
+    Raises ExtractionError if the worker times out or dies.
+    """
+    max_chars = settings.RESUME_MAX_CHARS
+    if not settings.RESUME_EXTRACTION_ISOLATED:
+        return extract_document_from_path(path, mime_type, max_chars)
+    return get_pool().run(path, mime_type, max_chars)["document"]
+
+
+@contextmanager
+def local_path(field_file):
+    """
+    A path on local disk holding a stored file: the file itself with
+    FileSystemStorage, otherwise a temporary copy streamed from storage.
+    """
+    try:
+        path = field_file.path
+    except NotImplementedError:
+        path = None
+    if path is not None:
+        yield path
+        return
+    suffix = os.path.splitext(field_file.name)[1]
+    with tempfile.NamedTemporaryFile(suffix=suffix) as copy, field_file.open("rb") as source:
+        shutil.copyfileobj(source, copy, 1 << 20)
+        copy.flush()
+        yield copy.name
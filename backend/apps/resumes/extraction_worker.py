@@ -0,0 +1,57 @@
+import json
+import os
+import resource
+import sys
+
+# Entry point of an extraction pool worker process (see extraction_pool.py):
+#   python -m apps.resumes.extraction_worker <address space limit in bytes>
+# Writes one JSON line, {"pid"}, once it is ready, then reads one JSON job
+# per line on stdin, {"path", "mime_type", "max_chars"}, and answers each with one JSON
+# line, {"document", "pid", "maxrss_kb"}, until stdin is closed. Runs
+# without Django.
+
+
+def _peak_rss_kb() -> int:
+    # VmHWM starts over at exec; ru_maxrss would still include the memory of
+    # the process that started this one
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def main() -> None:
+    memory_limit = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    # Replies go to the original stdout; anything a library prints goes to
+    # stderr instead of corrupting them
+    replies = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    # Imported before the limit is set, so only extraction counts against it
+    import docx  # noqa: F401
+    import pypdf  # noqa: F401
+
+    from .parsers import extract_document_from_path
+
+    if memory_limit:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    replies.write(json.dumps({"pid": os.getpid()}) + "\n")
+    replies.flush()
+
+    for line in sys.stdin:
+        job = json.loads(line)
+        document = extract_document_from_path(job["path"], job["mime_type"], job.get("max_chars"))
+        replies.write(json.dumps({
+            "document": document,
+            "pid": os.getpid(),
+            "maxrss_kb": _peak_rss_kb(),
+        }) + "\n")
+        replies.flush()
+
+
+if __name__ == "__main__":
+    main()
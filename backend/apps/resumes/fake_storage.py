@@ -0,0 +1,154 @@
+import base64
+import email.policy
+import hashlib
+import json
+import re
+import threading
+from email.parser import BytesParser
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+# Local stand-in for an S3-compatible bucket (path-style addressing), used by
+# tests and for trying direct uploads without a real bucket. Implements what
+# the resume upload flow needs: presigned POST uploads (enforcing the
+# policy's content-length-range), PUT, HEAD, ranged GET and DELETE.
+# Signatures are not checked. Point AWS_S3_ENDPOINT_URL at
+# http://host:port to use it.
+
+_RANGE_RE = re.compile(r"bytes=(\d+)-(\d*)")
+
+
+class FakeStorageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _object_key(self) -> tuple[str, str]:
+        bucket, _, key = unquote(self.path.split("?", 1)[0]).lstrip("/").partition("/")
+        return bucket, key
+
+    def _send(self, status: int, body: bytes = b"", headers: dict | None = None) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _error(self, status: int, code: str, message: str = "") -> None:
+        body = (
+            f'<?xml version="1.0" encoding="UTF-8"?>'
+            f"<Error><Code>{code}</Code><Message>{message}</Message></Error>"
+        ).encode()
+        self._send(status, body, {"Content-Type": "application/xml"})
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def _store(self, bucket: str, key: str, data: bytes, content_type: str) -> None:
+        with self.server.lock:
+            self.server.objects[(bucket, key)] = {
+                "data": data,
+                "content_type": content_type or "binary/octet-stream",
+                "etag": f'"{hashlib.md5(data).hexdigest()}"',
+                "modified": formatdate(usegmt=True),
+            }
+
+    def _log(self, bucket: str, key: str) -> None:
+        with self.server.lock:
+            self.server.requests.append((self.command, key, self.headers.get("Range")))
+
+    def do_POST(self):
+        bucket, _ = self._object_key()
+        raw = self._read_body()
+        message = BytesParser(policy=email.policy.HTTP).parsebytes(
+            f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + raw
+        )
+        fields, data, content_type = {}, None, ""
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            if name == "file":
+                data = part.get_payload(decode=True)
+                content_type = part.get_content_type()
+            else:
+                fields[name.lower()] = part.get_payload(decode=True).decode()
+        key = fields.get("key", "")
+        self._log(bucket, key)
+        if data is None or not key:
+            return self._error(400, "InvalidArgument", "POST requires a key and a file")
+
+        policy = json.loads(base64.b64decode(fields.get("policy", "") or "e30="))
+        for condition in policy.get("conditions", []):
+            if isinstance(condition, list) and condition[0] == "content-length-range":
+                low, high = condition[1], condition[2]
+                if len(data) < low:
+                    return self._error(400, "EntityTooSmall")
+                if len(data) > high:
+                    return self._error(400, "EntityTooLarge")
+            if isinstance(condition, dict) and "key" in condition and condition["key"] != key:
+                return self._error(403, "AccessDenied", "Key does not match the policy")
+
+        self._store(bucket, key, data, fields.get("content-type", content_type))
+        self._send(204)
+
+    def do_PUT(self):
+        bucket, key = self._object_key()
+        self._log(bucket, key)
+        self._store(bucket, key, self._read_body(), self.headers.get("Content-Type", ""))
+        self._send(200, headers={"ETag": self.server.objects[(bucket, key)]["etag"]})
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        bucket, key = self._object_key()
+        self._log(bucket, key)
+        obj = self.server.objects.get((bucket, key))
+        if obj is None:
+            return self._error(404, "NoSuchKey")
+        data, status = obj["data"], 200
+        headers = {
+            "Content-Type": obj["content_type"],
+            "ETag": obj["etag"],
+            "Last-Modified": obj["modified"],
+            "Accept-Ranges": "bytes",
+        }
+        match = _RANGE_RE.fullmatch(self.headers.get("Range", ""))
+        if match and self.command == "GET":
+            start = int(match.group(1))
+            end = min(int(match.group(2) or len(data) - 1), len(data) - 1)
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+            data, status = data[start:end + 1], 206
+        # HEAD gets the object's Content-Length without the body
+        self._send(status, data, headers)
+
+    def do_DELETE(self):
+        bucket, key = self._object_key()
+        self._log(bucket, key)
+        with self.server.lock:
+            self.server.objects.pop((bucket, key), None)
+        self._send(204)
+
+
+class FakeStorageServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+def start_fake_storage(host: str = "127.0.0.1", port: int = 0):
+    """
+    Serve the fake bucket on a background thread. ``server.objects`` maps
+    (bucket, key) to the stored objects and ``server.requests`` records
+    (method, key, Range header) for each request. Returns the server; its
+    endpoint URL is http://host:server.server_port. Call server.shutdown()
+    when done.
+    """
+    server = FakeStorageServer((host, port), FakeStorageHandler)
+    server.lock = threading.Lock()
+    server.objects = {}
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
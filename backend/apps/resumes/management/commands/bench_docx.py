@@ -0,0 +1,105 @@
+import multiprocessing
+import statistics
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from docx import Document
+
+from apps.resumes.parsers import extract_document_from_docx
+from apps.resumes.sample_pdfs import RESUME_LINES
+
+
+def _python_docx_text(file) -> str:
+    # The extraction the streaming parser replaced: the full python-docx
+    # object model, body paragraphs only
+    doc = Document(file)
+    return "\n".join(para.text for para in doc.paragraphs if para.text)
+
+
+def _streaming_text(file) -> str:
+    return extract_document_from_docx(file)["text"]
+
+
+def _budgeted_text(file) -> str:
+    return extract_document_from_docx(file, settings.RESUME_MAX_CHARS)["text"]
+
+
+EXTRACTORS = {
+    "python-docx": _python_docx_text,
+    "streaming": _streaming_text,
+    "budgeted": _budgeted_text,
+}
+
+
+def _status_kb(field: str) -> int:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(field):
+                return int(line.split()[1])
+    return 0
+
+
+def _measure(extractor: str, path: str, results) -> None:
+    # Runs in a forked child: its peak RSS over what it started with is the
+    # extraction's own
+    start_kb = _status_kb("VmRSS:")
+    started = time.perf_counter()
+    with open(path, "rb") as file:
+        chars = len(EXTRACTORS[extractor](file))
+    results.put((time.perf_counter() - started, (_status_kb("VmHWM:") - start_kb) / 1024, chars))
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate large DOCX resumes (long paragraph runs plus tables) and "
+        "compare the streaming extractor (whole text, and within "
+        "RESUME_MAX_CHARS) with python-docx: throughput over the uncompressed "
+        "XML and peak memory per file, each run in a fresh process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", default="1000,10000,50000",
+            help="Comma-separated paragraph counts of the generated documents.",
+        )
+        parser.add_argument("--runs", type=int, default=3)
+
+    def handle(self, *args, **options):
+        context = multiprocessing.get_context("fork")
+        with tempfile.TemporaryDirectory() as tmp:
+            for paragraphs in (int(size) for size in options["sizes"].split(",")):
+                path = Path(tmp) / f"resume-{paragraphs}.docx"
+                self._build(path, paragraphs)
+                with zipfile.ZipFile(path) as archive:
+                    xml_mb = sum(info.file_size for info in archive.infolist()) / 2**20
+                for extractor in EXTRACTORS:
+                    seconds, rss, chars = [], 0.0, 0
+                    for _ in range(options["runs"]):
+                        results = context.Queue()
+                        child = context.Process(target=_measure, args=(extractor, str(path), results))
+                        child.start()
+                        elapsed, peak, chars = results.get()
+                        child.join()
+                        seconds.append(elapsed)
+                        rss = max(rss, peak)
+                    median = statistics.median(seconds)
+                    self.stdout.write(
+                        f"{paragraphs:>7} paragraphs {xml_mb:6.1f}MB XML  {extractor:<12} "
+                        f"p50={median * 1000:8.0f}ms  {xml_mb / median:6.1f}MB/s  "
+                        f"peak +{rss:6.1f}MB  {chars} chars"
+                    )
+
+    def _build(self, path: Path, paragraphs: int) -> None:
+        doc = Document()
+        for i in range(paragraphs):
+            doc.add_paragraph(f"{RESUME_LINES[i % len(RESUME_LINES)]} ({i})")
+            if i % 100 == 99:
+                table = doc.add_table(rows=3, cols=2)
+                for row in table.rows:
+                    row.cells[0].text = "Skills"
+                    row.cells[1].text = "Python, Django, PostgreSQL, Redis"
+        doc.save(path)
@@ -0,0 +1,89 @@
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.resumes import sample_pdfs
+from apps.resumes.extraction_pool import ExtractionError, ExtractionPool
+
+MIME_TYPES = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Extract a corpus of resumes — a normal PDF, adversarial PDFs (page "
+        "flood, operator flood, Flate bomb, truncated file) and any files in "
+        "--corpus — through the extraction pool, and report each file's "
+        "latency, outcome and worker peak RSS. --baseline runs the same files "
+        "with no timeout or memory limit, like the old in-process extraction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--corpus", help="Directory of extra .pdf/.docx files to include.")
+        parser.add_argument("--runs", type=int, default=3)
+        parser.add_argument("--timeout", type=float, default=settings.RESUME_EXTRACTION_TIMEOUT)
+        parser.add_argument(
+            "--memory-limit", type=int, default=settings.RESUME_EXTRACTION_MEMORY_LIMIT // 2**20,
+            help="Worker address space limit in MB.",
+        )
+        parser.add_argument("--baseline", action="store_true")
+
+    def handle(self, *args, **options):
+        if options["baseline"]:
+            # Unbounded (a day), with a worker per job so peaks do not add up
+            pool = ExtractionPool(size=1, timeout=86400, memory_limit=0, max_jobs=1)
+        else:
+            pool = ExtractionPool(
+                size=1,
+                timeout=options["timeout"],
+                memory_limit=options["memory_limit"] * 2**20,
+                max_jobs=settings.RESUME_EXTRACTION_MAX_JOBS,
+            )
+        worst_latency = worst_rss = 0.0
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                for name, path, mime_type in self._corpus(Path(tmp), options["corpus"]):
+                    latency, rss = self._bench(pool, name, path, mime_type, options["runs"])
+                    worst_latency, worst_rss = max(worst_latency, latency), max(worst_rss, rss)
+            finally:
+                pool.close()
+        self.stdout.write(self.style.SUCCESS(
+            f"worst case: {worst_latency:.0f}ms, worker peak RSS {worst_rss:.0f}MB"
+        ))
+
+    def _corpus(self, tmp: Path, corpus: str | None):
+        generated = {"resume": sample_pdfs.resume_pdf, **sample_pdfs.ADVERSARIAL_PDFS}
+        for name, build in generated.items():
+            path = tmp / f"{name}.pdf"
+            path.write_bytes(build())
+            yield name, str(path), MIME_TYPES[".pdf"]
+        if corpus:
+            for path in sorted(Path(corpus).iterdir()):
+                if path.suffix.lower() in MIME_TYPES:
+                    yield path.name, str(path), MIME_TYPES[path.suffix.lower()]
+
+    def _bench(self, pool, name, path, mime_type, runs) -> tuple[float, float]:
+        latencies, rss, outcome = [], 0.0, ""
+        for _ in range(runs):
+            start = time.perf_counter()
+            try:
+                reply = pool.run(path, mime_type)
+            except ExtractionError as exc:
+                outcome = str(exc)
+            else:
+                rss = max(rss, reply["maxrss_kb"] / 1024)
+                chars = len(reply["document"]["text"])
+                outcome = f"{chars} chars" if chars else "no text"
+            latencies.append((time.perf_counter() - start) * 1000)
+        size_kb = Path(path).stat().st_size / 1024
+        self.stdout.write(
+            f"{name[:24]:<24} {size_kb:8.0f}KB  p50={statistics.median(latencies):8.0f}ms "
+            f"max={max(latencies):8.0f}ms  rss={rss:6.0f}MB  {outcome}"
+        )
+        return max(latencies), rss
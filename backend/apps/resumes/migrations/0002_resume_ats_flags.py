@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-18 14:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resumes", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resume",
+            name="ats_flags",
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="resume",
+            name="layout",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 14:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resumes", "0002_resume_ats_flags"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resume",
+            name="text_stats",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resumes", "0003_resume_text_stats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resume",
+            name="parse_error",
+            field=models.TextField(blank=True, default=""),
+            preserve_default=False,
+        ),
+        # Existing resumes were parsed at upload
+        migrations.AddField(
+            model_name="resume",
+            name="parse_status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("processing", "Processing"),
+                    ("done", "Done"),
+                    ("failed", "Failed"),
+                ],
+                default="done",
+                max_length=20,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="resume",
+            name="parse_status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("processing", "Processing"),
+                    ("done", "Done"),
+                    ("failed", "Failed"),
+                ],
+                default="pending",
+                max_length=20,
+            ),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.0.14 on 2026-10-18 15:38
+
+import apps.resumes.models
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resumes", "0004_resume_parse_status"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResumeBlob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sha256", models.CharField(max_length=64)),
+                (
+                    "file",
+                    models.FileField(upload_to=apps.resumes.models.resume_upload_path),
+                ),
+                ("ref_count", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="resume_blobs",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="resume",
+            name="blob",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="resumes",
+                to="resumes.resumeblob",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="resumeblob",
+            constraint=models.UniqueConstraint(
+                fields=("user", "sha256"), name="unique_resume_blob"
+            ),
+        ),
+    ]
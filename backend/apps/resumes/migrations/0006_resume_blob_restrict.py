@@ -0,0 +1,25 @@
+# Generated by Django 5.0.14 on 2026-10-18 15:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resumes", "0005_resume_blob"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="resume",
+            name="blob",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.RESTRICT,
+                related_name="resumes",
+                to="resumes.resumeblob",
+            ),
+        ),
+    ]
@@ -8,17 +8,68 @@ def resume_upload_path(instance, filename):
     return f"resumes/{instance.user.id}/{uuid.uuid4()}.{ext}"
 
 
+class ResumeBlob(models.Model):
+    """
+    A stored resume file, kept once per user and content hash and shared by
+    every Resume uploaded with those bytes (apps/resumes/blobs.py).
+    ``ref_count`` is the number of those resumes; the file is deleted from
+    storage when it drops to zero.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="resume_blobs",
+    )
+    sha256 = models.CharField(max_length=64)
+    file = models.FileField(upload_to=resume_upload_path)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "sha256"], name="unique_resume_blob"),
+        ]
+
+    def __str__(self):
+        return f"Resume blob {self.sha256[:12]}"
+
+
 class Resume(models.Model):
+    class ParseStatus(models.TextChoices):
+        PENDING = "pending", "Pending"
+        PROCESSING = "processing", "Processing"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="resumes",
     )
     file = models.FileField(upload_to=resume_upload_path)
+    # The shared stored file that ``file`` names; null for resumes uploaded
+    # before deduplication and for direct uploads. RESTRICT: a blob is only
+    # deleted through release_blob(), or together with its user and resumes
+    blob = models.ForeignKey(
+        ResumeBlob, null=True, blank=True, on_delete=models.RESTRICT, related_name="resumes"
+    )
     original_filename = models.CharField(max_length=255)
     file_size = models.PositiveIntegerField(help_text="File size in bytes")
     mime_type = models.CharField(max_length=100)
     parsed_text = models.TextField(blank=True, default="")
+    # Text extraction runs in parse_resume_task after the upload returns;
+    # parsed_text, layout, text_stats and ats_flags are set once it is done
+    parse_status = models.CharField(
+        max_length=20, choices=ParseStatus.choices, default=ParseStatus.PENDING
+    )
+    parse_error = models.TextField(blank=True)
+    # Layout facts from the parser and the ATS issues found at upload
+    # (apps/resumes/ats.py); ats_flags is null for resumes never checked
+    layout = models.JSONField(default=dict, blank=True)
+    # What text normalization removed: {"chars_removed", "tokens_removed"}
+    text_stats = models.JSONField(default=dict, blank=True)
+    ats_flags = models.JSONField(null=True, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     is_paid = models.BooleanField(default=False)
 
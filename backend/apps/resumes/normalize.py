@@ -0,0 +1,144 @@
+import re
+import unicodedata
+from collections import Counter
+
+from apps.analysis.compression import estimate_tokens
+
+# Cleans extracted resume text before it is stored in Resume.parsed_text:
+# per-page headers and footers, page numbers, hyphenation splits, ligatures
+# and stray whitespace otherwise end up in every prompt as paid tokens.
+
+# Lines this close to the top or bottom of a page are header/footer candidates
+EDGE_LINES = 2
+
+# Page numbers only in page-number context: "Page 2", "Page 2 of 3", "2 of 3",
+# "2/3", "- 2 -". A bare number is a year, a count or a phone fragment
+# unless it sits at a page edge and repeats as one (_repeated_edges).
+_DASH = r"[-\u2013\u2014]"
+_PAGE_NUMBER_RE = re.compile(
+    rf"^(page\s*\d{{1,3}}(\s*(/|of)\s*\d{{1,3}})?|\d{{1,3}}\s*(/|of)\s*\d{{1,3}}|{_DASH}\s*\d{{1,3}}\s*{_DASH})$",
+    re.IGNORECASE,
+)
+_DIGITS_RE = re.compile(r"\d+")
+_SPACE_RE = re.compile(r"[ \t\f\v\u00a0\u2000-\u200a\u202f\u205f\u3000]+")
+
+# Applied after NFKC, which already expands ligatures (U+FB01 -> "fi") and
+# full-width forms
+_CHAR_MAP = str.maketrans({
+    # Soft hyphen and zero-width characters
+    "\u00ad": None,
+    "\u200b": None,
+    "\u200c": None,
+    "\u200d": None,
+    "\ufeff": None,
+    # Typographic quotes and dashes
+    "\u2018": "'",
+    "\u2019": "'",
+    "\u201c": '"',
+    "\u201d": '"',
+    "\u2010": "-",
+    "\u2011": "-",
+    "\u2212": "-",
+    # Bullets, including the Symbol-font bullet in Word exports
+    "\u2022": "-",
+    "\u25cf": "-",
+    "\u25aa": "-",
+    "\u25e6": "-",
+    "\u2023": "-",
+    "\u2043": "-",
+    "\uf0b7": "-",
+})
+
+
+def _edge_key(line: str, page_number: int, page_count: int) -> str:
+    # "Jane Doe, page 2 of 3" and "Jane Doe, page 3 of 3" are the same
+    # footer; any other number (a year, a date range) must match exactly
+    return _DIGITS_RE.sub(
+        lambda match: "#" if int(match.group()) in (page_number, page_count) else match.group(),
+        line.casefold(),
+    )
+
+
+def _edge_positions(lines: list[str]) -> set[int]:
+    """Indexes of the first and last EDGE_LINES non-empty lines of a page."""
+    content = [index for index, line in enumerate(lines) if line]
+    return set(content[:EDGE_LINES] + content[-EDGE_LINES:])
+
+
+def _repeated_edges(pages: list[list[str]]) -> set[str]:
+    """Keys of lines at a page edge on at least half of the pages (min. two)."""
+    if len(pages) < 2:
+        return set()
+    counts = Counter()
+    for number, lines in enumerate(pages, 1):
+        counts.update({_edge_key(lines[index], number, len(pages)) for index in _edge_positions(lines)})
+    threshold = max(2, (len(pages) + 1) // 2)
+    return {key for key, count in counts.items() if count >= threshold}
+
+
+def truncate_text(text: str, max_chars: int | None) -> tuple[str, bool]:
+    """
+    ``text`` cut to the resume character budget, and whether it was cut.
+    Shared by extraction and the prompt builder so both keep the same text.
+    """
+    if max_chars is None or len(text) <= max_chars:
+        return text, False
+    return text[:max_chars], True
+
+
+def fills_budget(pages: list[str], max_chars: int | None) -> bool:
+    """
+    Whether ``pages`` already normalize to at least ``max_chars`` characters,
+    so extracting further pages would only add text that truncate_text()
+    drops.
+    """
+    return max_chars is not None and len(normalize_pages(pages)[0]) >= max_chars
+
+
+def normalize_pages(pages: list[str]) -> tuple[str, dict]:
+    """
+    Normalize extracted text, one string per page. Returns the cleaned text
+    and {"chars_removed", "tokens_removed"} relative to the pages joined
+    with newlines.
+
+    Repeated header/footer lines are found first; one pass over the lines
+    then drops them (at page edges only) and page numbers, folds unicode (NFKC plus quotes,
+    bullets and invisible characters), collapses whitespace, joins words
+    hyphenated across a line break and squeezes blank lines.
+    """
+    raw = "\n".join(pages)
+    split_pages = [
+        [_SPACE_RE.sub(" ", unicodedata.normalize("NFKC", line).translate(_CHAR_MAP)).strip()
+         for line in page.splitlines()]
+        for page in pages
+    ]
+    repeated = _repeated_edges(split_pages)
+
+    out = []
+    for number, lines in enumerate(split_pages, 1):
+        edges = _edge_positions(lines) if repeated else set()
+        for index, line in enumerate(lines):
+            if not line:
+                if out and out[-1]:
+                    out.append("")
+                continue
+            if _PAGE_NUMBER_RE.match(line) or (
+                index in edges and _edge_key(line, number, len(split_pages)) in repeated
+            ):
+                continue
+            previous = out[-1] if out else ""
+            # "manage-\nment" -> "management"; keep "-\nLed" (a bullet) and "e-\n"
+            if (
+                len(previous) > 1
+                and previous.endswith("-")
+                and previous[-2].isalpha()
+                and line[0].islower()
+            ):
+                out[-1] = previous[:-1] + line
+                continue
+            out.append(line)
+    text = "\n".join(out).strip()
+    return text, {
+        "chars_removed": len(raw) - len(text),
+        "tokens_removed": estimate_tokens(raw) - estimate_tokens(text),
+    }
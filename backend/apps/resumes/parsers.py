@@ -1,50 +1,201 @@
-import io
 import logging
+import mmap
+import os
+
+from .docx_stream import empty_layout, iter_docx_paragraphs
+from .normalize import fills_budget, normalize_pages, truncate_text
 
 logger = logging.getLogger(__name__)
 
+# Share of a PDF's characters that must start right of the page midline for
+# the layout to count as multi-column
+COLUMN_TEXT_SHARE = 0.3
+
+
+def _empty_document() -> dict:
+    return {"text": "", "layout": {}, "stats": {}}
+
+
+def _pdf_page_layout(page) -> tuple[str, int, int]:
+    """Text of one page, the number of characters starting right of the page's
+    midline, and the page's image count."""
+    width = float(page.mediabox.width) or 1.0
+    right_chars = 0
+
+    def visitor(text, cm, tm, font_dict, font_size):
+        nonlocal right_chars
+        x = tm[4] * cm[0] + tm[5] * cm[2] + cm[4]
+        if text.strip() and x > width / 2:
+            right_chars += len(text.strip())
 
-def extract_text_from_pdf(file) -> str:
+    text = page.extract_text(visitor_text=visitor) or ""
+    images = 0
+    xobjects = (page.get("/Resources") or {}).get("/XObject") or {}
+    for ref in xobjects.values():
+        if ref.get_object().get("/Subtype") == "/Image":
+            images += 1
+    return text, right_chars, images
+
+
+def iter_pdf_pages(reader):
     """
-    Extract plain text from a PDF file object using pypdf.
-    Returns empty string on failure (text extraction is best-effort).
+    (text, right-of-midline characters, images) of each page of a PdfReader,
+    extracted only when the caller asks for the next page.
+    """
+    for page in reader.pages:
+        yield _pdf_page_layout(page)
+
+
+def _budget_stats(stats: dict, pages_extracted: int, truncated: bool) -> dict:
+    return {**stats, "pages_extracted": pages_extracted, "truncated": truncated}
+
+
+def extract_document_from_pdf(file, max_chars: int | None = None) -> dict:
+    """
+    Extract text plus the layout facts the ATS checks need from a PDF:
+    {"text": str, "layout": {"pages", "images", "columns"}, "stats": {...}}.
+    The text is normalized (normalize.normalize_pages) and "stats" reports
+    what that removed. PDFs carry no table structure, so tables are not
+    reported. Returns empty text and layout on failure.
+
+    With ``max_chars``, pages are extracted only until their text fills that
+    budget and the text is truncated to it; "pages" still counts every page,
+    images and columns describe the pages read, and "stats" records
+    "pages_extracted" and whether the text was "truncated".
     """
     try:
         from pypdf import PdfReader
 
+        # pypdf reads what it needs from the (seekable) file itself
         file.seek(0)
-        reader = PdfReader(io.BytesIO(file.read()))
-        parts = []
-        for page in reader.pages:
-            text = page.extract_text()
-            if text:
-                parts.append(text)
-        return "\n".join(parts)
+        reader = PdfReader(file)
+        total_pages = len(reader.pages)
+        pages = []
+        right_chars = images = raw_chars = 0
+        # Normalizing drops text (repeated headers, page numbers), so the
+        # budget is only checked once the raw text could fill it, and then
+        # each time it doubles: linear however little of it survives
+        check_at = max_chars
+        for text, page_right_chars, page_images in iter_pdf_pages(reader):
+            pages.append(text)
+            right_chars += page_right_chars
+            images += page_images
+            raw_chars += len(text)
+            if check_at is not None and raw_chars >= check_at:
+                if fills_budget(pages, max_chars):
+                    break
+                check_at = raw_chars * 2
+        body_chars = sum(len("".join(text.split())) for text in pages) or 1
+        text, stats = normalize_pages(pages)
+        text, truncated = truncate_text(text, max_chars)
+        return {
+            "text": text,
+            "stats": _budget_stats(stats, len(pages), truncated or len(pages) < total_pages),
+            "layout": {
+                "pages": total_pages,
+                "images": images,
+                # Text that starts right of the midline: a sidebar or second
+                # column, not just right-aligned dates
+                "columns": 2 if right_chars / body_chars >= COLUMN_TEXT_SHARE else 1,
+            },
+        }
     except Exception:
         logger.exception("PDF text extraction failed")
-        return ""
+        return _empty_document()
 
 
-def extract_text_from_docx(file) -> str:
+def extract_text_from_pdf(file, max_chars: int | None = None) -> str:
     """
-    Extract plain text from a DOCX file object using python-docx.
-    Returns empty string on failure.
+    Extract plain text from a PDF file object using pypdf.
+    Returns empty string on failure (text extraction is best-effort).
     """
-    try:
-        from docx import Document
+    return extract_document_from_pdf(file, max_chars)["text"]
 
+
+def extract_document_from_docx(file, max_chars: int | None = None) -> dict:
+    """
+    Extract text plus layout facts from a DOCX:
+    {"text": str, "layout": {"tables", "images", "columns", "text_boxes"},
+    "stats": {...}}, with normalized text truncated to ``max_chars``. The
+    text covers headers, body paragraphs, table cells, text boxes and
+    footers, stream-parsed by docx_stream. Returns empty text and layout on
+    failure.
+
+    Once the text fills ``max_chars`` no more of it is kept, but the rest of
+    the body is still scanned so the layout describes the whole document.
+    """
+    try:
         file.seek(0)
-        doc = Document(io.BytesIO(file.read()))
-        return "\n".join(para.text for para in doc.paragraphs if para.text)
+        layout = empty_layout()
+        paragraphs = []
+        raw_chars = 0
+        check_at = max_chars
+        filled = False
+        for paragraph in iter_docx_paragraphs(file, layout):
+            if filled:
+                continue
+            paragraphs.append(paragraph)
+            raw_chars += len(paragraph) + 1
+            # Same doubling check as the PDF pages
+            if check_at is not None and raw_chars >= check_at:
+                filled = fills_budget(["\n".join(paragraphs)], max_chars)
+                check_at = raw_chars * 2
+        text, stats = normalize_pages(["\n".join(paragraphs)])
+        text, truncated = truncate_text(text, max_chars)
+        return {
+            "text": text,
+            "stats": _budget_stats(stats, 1, truncated or filled),
+            "layout": layout,
+        }
     except Exception:
         logger.exception("DOCX text extraction failed")
-        return ""
+        return _empty_document()
 
 
-def extract_text(file, mime_type: str) -> str:
-    """Dispatch to the appropriate extractor based on MIME type."""
+def extract_text_from_docx(file, max_chars: int | None = None) -> str:
+    """
+    Extract plain text from a DOCX file object.
+    Returns empty string on failure.
+    """
+    return extract_document_from_docx(file, max_chars)["text"]
+
+
+def extract_document(file, mime_type: str, max_chars: int | None = None) -> dict:
+    """
+    Dispatch to the appropriate document extractor based on MIME type.
+    ``max_chars`` is the resume character budget (RESUME_MAX_CHARS).
+    """
     if mime_type == "application/pdf":
-        return extract_text_from_pdf(file)
-    if mime_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-        return extract_text_from_docx(file)
-    return ""
+        document = extract_document_from_pdf(file, max_chars)
+    elif mime_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+        document = extract_document_from_docx(file, max_chars)
+    else:
+        return _empty_document()
+    if document["stats"]:
+        logger.info(
+            "Text normalization removed %d chars (~%d tokens)",
+            document["stats"]["chars_removed"],
+            document["stats"]["tokens_removed"],
+        )
+    return document
+
+
+def extract_document_from_path(path: str, mime_type: str, max_chars: int | None = None) -> dict:
+    """
+    extract_document() of a file on disk, without reading it into a buffer:
+    PDFs through a read-only memory map (pypdf seeks around the file a lot),
+    DOCX straight from the file, which zipfile reads member by member.
+    """
+    if not os.path.getsize(path):
+        return _empty_document()
+    with open(path, "rb") as file:
+        if mime_type != "application/pdf":
+            # zipfile needs seekable(), which mmap lacks before Python 3.13
+            return extract_document(file, mime_type, max_chars)
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return extract_document(mapped, mime_type, max_chars)
+
+
+def extract_text(file, mime_type: str, max_chars: int | None = None) -> str:
+    """Dispatch to the appropriate extractor based on MIME type."""
+    return extract_document(file, mime_type, max_chars)["text"]
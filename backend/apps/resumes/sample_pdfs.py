@@ -0,0 +1,104 @@
+import zlib
+
+# Hand-built PDFs for the extraction benchmark and tests: an ordinary resume
+# and adversarial files that stay under MAX_FILE_SIZE but are expensive to
+# parse (a page flood, a content-stream operator flood, a Flate bomb and a
+# truncated file).
+
+RESUME_LINES = [
+    "Jane Doe",
+    "jane@example.com | +1 (555) 123-4567",
+    "Summary",
+    "Backend engineer with eight years of Python experience.",
+    "Work Experience",
+    "Senior Engineer, Acme - Jan 2020 to Mar 2023",
+    *["- Built and operated Django services handling 40k requests per minute"] * 25,
+    "Education",
+    "BSc Computer Science, Sep 2012 to Jun 2016",
+    "Skills",
+    "Python, Django, PostgreSQL, Redis, Celery, Docker",
+]
+
+
+def text_stream(lines: list[str]) -> bytes:
+    """A page content stream drawing ``lines`` top to bottom."""
+    ops = [b"BT /F1 10 Tf 50 780 Td 12 TL"]
+    for line in lines:
+        escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        ops.append(f"({escaped}) '".encode("latin-1"))
+    ops.append(b"ET")
+    return b"\n".join(ops)
+
+
+def build_pdf(streams: list[bytes], flate: bool = False, compressed: bool = False) -> bytes:
+    """
+    A PDF with one page per content stream, Flate-compressed if ``flate`` or
+    already compressed if ``compressed``.
+    """
+    count = len(streams)
+    # 1: catalog, 2: pages, 3: font, then a page and its content per stream
+    page_ids = [4 + 2 * i for i in range(count)]
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % i for i in page_ids)
+        + b"] /Count %d >>" % count,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for page_id, stream in zip(page_ids, streams):
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (page_id + 1)
+        )
+        filter_ = b" /Filter /FlateDecode" if flate or compressed else b""
+        if flate:
+            stream = zlib.compress(stream, 9)
+        objects.append(
+            b"<< /Length %d%s >>\nstream\n" % (len(stream), filter_) + stream + b"\nendstream"
+        )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, xref
+    )
+    return bytes(out)
+
+
+def resume_pdf() -> bytes:
+    return build_pdf([text_stream(RESUME_LINES[:18]), text_stream(RESUME_LINES[18:])])
+
+
+def page_flood_pdf(pages: int = 5000) -> bytes:
+    """Thousands of short pages."""
+    return build_pdf([text_stream([f"Page {i}"]) for i in range(pages)], flate=True)
+
+
+def operator_flood_pdf(operators: int = 2_000_000) -> bytes:
+    """One page whose compressed content stream holds millions of text operators."""
+    return build_pdf([b"BT /F1 10 Tf " + b"(x) Tj 1 0 Td " * operators + b"ET"], flate=True)
+
+
+def flate_bomb_pdf(size: int = 1 << 30) -> bytes:
+    """One page whose ~1 MB content stream inflates to ``size`` bytes."""
+    compressor = zlib.compressobj(9)
+    chunk = b" " * (1 << 20)
+    stream = b"".join(compressor.compress(chunk) for _ in range(size // len(chunk)))
+    return build_pdf([stream + compressor.flush()], compressed=True)
+
+
+def truncated_pdf() -> bytes:
+    return resume_pdf()[:600]
+
+
+ADVERSARIAL_PDFS = {
+    "page_flood": page_flood_pdf,
+    "operator_flood": operator_flood_pdf,
+    "flate_bomb": flate_bomb_pdf,
+    "truncated": truncated_pdf,
+}
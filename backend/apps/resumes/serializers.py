@@ -1,9 +1,14 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.core.files.storage import default_storage
+from django.db import transaction
 from rest_framework import serializers
 
+from .blobs import acquire_blob, copy_parse, file_sha256
+from .direct_upload import discard_upload, inspect_upload, read_upload_token
 from .models import Resume
 from .validators import validate_resume_file
-from .parsers import extract_text
+
+ALLOWED_EXTENSIONS = {"pdf", "docx"}
 
 
 class ResumeSerializer(serializers.ModelSerializer):
@@ -19,6 +24,9 @@ class ResumeSerializer(serializers.ModelSerializer):
             "mime_type",
             "uploaded_at",
             "is_paid",
+            "ats_flags",
+            "parse_status",
+            "parse_error",
             "download_url",
             "file",
         ]
@@ -29,6 +37,9 @@ class ResumeSerializer(serializers.ModelSerializer):
             "mime_type",
             "uploaded_at",
             "is_paid",
+            "ats_flags",
+            "parse_status",
+            "parse_error",
             "download_url",
         ]
 
@@ -37,22 +48,30 @@ class ResumeSerializer(serializers.ModelSerializer):
         mime_type = validate_resume_file(value)
         # Stash for use in create()
         self._detected_mime = mime_type
+        # Hashed while it streamed in when the view installed
+        # Sha256UploadHandler
+        self._sha256 = self.context.get("upload_digests", {}).get("file") or file_sha256(value)
         return value
 
     def create(self, validated_data):
+        # Stored once per user and content (apps/resumes/blobs.py). A new
+        # file is parsed by parse_resume_task; a repeat upload takes the text
+        # of an earlier one and stays pending only if none parsed
         file = validated_data["file"]
-        mime_type = getattr(self, "_detected_mime", "")
-        parsed_text = extract_text(file, mime_type)
-        file.seek(0)
-
-        resume = Resume.objects.create(
-            user=self.context["request"].user,
-            file=file,
-            original_filename=file.name,
-            file_size=file.size,
-            mime_type=mime_type,
-            parsed_text=parsed_text,
-        )
+        user = self.context["request"].user
+        with transaction.atomic():
+            blob, created = acquire_blob(user, self._sha256, file)
+            resume = Resume(
+                user=user,
+                blob=blob,
+                file=blob.file.name,
+                original_filename=file.name,
+                file_size=file.size,
+                mime_type=getattr(self, "_detected_mime", ""),
+            )
+            if not created:
+                copy_parse(resume)
+            resume.save()
         return resume
 
     def get_download_url(self, obj):
@@ -63,3 +82,44 @@ class ResumeSerializer(serializers.ModelSerializer):
         if not obj.file:
             return None
         return default_storage.url(obj.file.name)
+
+
+class DirectUploadSerializer(serializers.Serializer):
+    filename = serializers.CharField(max_length=255)
+
+    def validate_filename(self, value):
+        # Only used to name the object; the content is checked on confirm
+        _, dot, extension = value.rpartition(".")
+        if not dot or extension.lower() not in ALLOWED_EXTENSIONS:
+            raise serializers.ValidationError("Only PDF and DOCX files are accepted.")
+        return value
+
+
+class DirectUploadConfirmSerializer(serializers.Serializer):
+    upload_token = serializers.CharField()
+
+    def validate_upload_token(self, value):
+        upload = read_upload_token(value, self.context["request"].user)
+        # Confirming twice returns the resume created the first time
+        self.existing = Resume.objects.filter(
+            user=self.context["request"].user, file=upload["name"]
+        ).first()
+        if self.existing is None:
+            try:
+                upload["size"], upload["mime_type"] = inspect_upload(upload["name"])
+            except DjangoValidationError:
+                discard_upload(upload["name"])
+                raise
+        return upload
+
+    def create(self, validated_data):
+        if self.existing is not None:
+            return self.existing
+        upload = validated_data["upload_token"]
+        return Resume.objects.create(
+            user=self.context["request"].user,
+            file=upload["name"],
+            original_filename=upload["filename"],
+            file_size=upload["size"],
+            mime_type=upload["mime_type"],
+        )
@@ -0,0 +1,18 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import Signal, receiver
+
+from .models import ResumeBlob
+
+# Sent by parse_resume_task with ``resume`` once its parse_status is final
+# (done or failed); analyses waiting on the parse listen for it
+resume_parsed = Signal()
+
+
+@receiver(post_delete, sender=ResumeBlob)
+def delete_blob_file(sender, instance, **kwargs):
+    # Whether its last resume was deleted (release_blob) or the blob went
+    # with its user. After commit, so a rollback keeps the row's file.
+    name = instance.file.name
+    storage = instance.file.storage
+    transaction.on_commit(lambda: storage.delete(name))
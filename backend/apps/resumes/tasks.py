@@ -0,0 +1,52 @@
+import logging
+
+from celery import shared_task
+
+from .ats import check_resume
+from .extraction_pool import extract_isolated, local_path
+from .models import Resume
+from .signals import resume_parsed
+
+logger = logging.getLogger(__name__)
+
+NO_TEXT_ERROR = "No text could be extracted. Upload a text-based PDF or DOCX (not a scan)."
+
+
+@shared_task
+def parse_resume_task(resume_id: int):
+    """
+    Extract an uploaded resume's text and layout, run the ATS checks and
+    mark it done (or failed when no text came out), then send
+    resume_parsed.
+    """
+    claimed = Resume.objects.filter(
+        id=resume_id, parse_status=Resume.ParseStatus.PENDING
+    ).update(parse_status=Resume.ParseStatus.PROCESSING)
+    if not claimed:
+        logger.info("Resume %s missing or already parsed — task skipped", resume_id)
+        return
+    resume = Resume.objects.get(id=resume_id)
+
+    try:
+        with local_path(resume.file) as path:
+            document = extract_isolated(path, resume.mime_type)
+    except Exception as exc:
+        logger.exception("Could not extract resume %s", resume_id)
+        document, error = None, str(exc)
+    else:
+        error = "" if document["text"] else NO_TEXT_ERROR
+
+    if document and not error:
+        resume.parsed_text = document["text"]
+        resume.layout = document["layout"]
+        resume.text_stats = document["stats"]
+        # Checked once here instead of by the model on every analysis
+        resume.ats_flags = check_resume(document["text"], document["layout"])
+        resume.parse_status = Resume.ParseStatus.DONE
+    else:
+        resume.parse_status = Resume.ParseStatus.FAILED
+        resume.parse_error = error
+    resume.save(update_fields=[
+        "parsed_text", "layout", "text_stats", "ats_flags", "parse_status", "parse_error"
+    ])
+    resume_parsed.send(sender=Resume, resume=resume)
@@ -0,0 +1,110 @@
+import io
+
+import pytest
+from docx import Document
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.resumes.ats import check_resume, keyword_flags, resume_ats_flags
+from apps.resumes.models import Resume
+from apps.resumes.parsers import extract_document_from_docx
+
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+CLEAN_RESUME = """Jane Doe
+jane@example.com | +1 (555) 123-4567
+
+Summary
+Backend engineer.
+
+Work Experience
+Senior Engineer, Acme — Jan 2020 to Mar 2023
+
+Education
+BSc Computer Science, Sep 2012 to Jun 2016
+
+Skills
+Python, Django, PostgreSQL
+"""
+
+
+def test_clean_resume_has_no_flags():
+    assert check_resume(CLEAN_RESUME, {"columns": 1}) == []
+
+
+def test_missing_sections_and_contact_details():
+    flags = check_resume("Jane Doe\nWhere I've Worked\nAcme, 2020 to 2023", {})
+    assert any("'Experience'" in flag for flag in flags)
+    assert any("'Education'" in flag for flag in flags)
+    assert any("'Skills'" in flag for flag in flags)
+    assert "No email address found in the resume text" in flags
+    assert "No phone number found in the resume text" in flags
+
+
+def test_mixed_date_formats():
+    text = CLEAN_RESUME.replace("Mar 2023", "03/2023")
+    assert check_resume(text, {}) == [
+        "Inconsistent date formats: month name (Jan 2020) and numeric (01/2020)"
+    ]
+
+
+def test_layout_flags():
+    flags = check_resume(CLEAN_RESUME, {"tables": 2, "columns": 2, "images": 1, "text_boxes": 1})
+    assert len(flags) == 4
+    assert flags[0].startswith("Uses 2 table(s)")
+
+
+def test_empty_text_is_flagged_as_unreadable():
+    assert check_resume("", {"images": 1})[0].startswith("No extractable text")
+
+
+def test_keyword_flags_are_capped():
+    assert keyword_flags([f"k{i}" for i in range(10)]) == [f"Missing keyword: k{i}" for i in range(5)]
+
+
+def _docx_bytes(table=False, columns=1) -> bytes:
+    doc = Document()
+    for line in CLEAN_RESUME.splitlines():
+        doc.add_paragraph(line)
+    if table:
+        doc.add_table(rows=2, cols=2)
+    if columns > 1:
+        sect_pr = doc.sections[0]._sectPr
+        sect_pr.xpath("./w:cols")[0].set(
+            "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}num", str(columns)
+        )
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def test_docx_layout_is_extracted():
+    document = extract_document_from_docx(io.BytesIO(_docx_bytes(table=True, columns=2)))
+    assert "Work Experience" in document["text"]
+    assert document["layout"] == {"tables": 1, "images": 0, "columns": 2, "text_boxes": 0}
+
+
+@pytest.mark.django_db
+def test_upload_stores_ats_flags(settings, tmp_path, django_capture_on_commit_callbacks):
+    settings.MEDIA_ROOT = tmp_path
+    user = User.objects.create_user(email="candidate@example.com", password="pw")
+    client = APIClient()
+    client.force_authenticate(user)
+
+    upload = SimpleUploadedFile("resume.docx", _docx_bytes(table=True), content_type=DOCX_MIME)
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post("/api/v1/resumes/", {"file": upload}, format="multipart")
+
+    assert response.status_code == 201
+    resume = Resume.objects.get(id=response.data["id"])
+    assert resume.parse_status == Resume.ParseStatus.DONE
+    assert resume.layout["tables"] == 1
+    assert len(resume.ats_flags) == 1 and resume.ats_flags[0].startswith("Uses 1 table(s)")
+
+
+def test_unchecked_resumes_fall_back_to_a_text_check():
+    resume = Resume(parsed_text=CLEAN_RESUME, layout={"columns": 2}, ats_flags=None)
+    assert resume_ats_flags(resume) == [
+        "Multi-column layout; ATS parsers may merge the columns line by line"
+    ]
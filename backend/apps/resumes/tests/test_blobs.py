@@ -0,0 +1,104 @@
+import hashlib
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.resumes import serializers, tasks
+from apps.resumes.models import Resume, ResumeBlob
+from apps.resumes.tests.test_ats import DOCX_MIME, _docx_bytes
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def content():
+    return _docx_bytes()
+
+
+@pytest.fixture
+def client(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    api = APIClient()
+    api.force_authenticate(User.objects.create_user(email="candidate@example.com", password="pw"))
+    return api
+
+
+def upload(client, content, callbacks_fixture):
+    file = SimpleUploadedFile("resume.docx", content, content_type=DOCX_MIME)
+    with callbacks_fixture(execute=True):
+        response = client.post("/api/v1/resumes/", {"file": file}, format="multipart")
+    assert response.status_code == 201
+    return Resume.objects.get(id=response.data["id"])
+
+
+def stored_files(tmp_path):
+    return [path for path in tmp_path.rglob("*") if path.is_file()]
+
+
+def test_upload_is_hashed_while_streaming_and_stored_as_a_blob(
+    client, content, monkeypatch, django_capture_on_commit_callbacks
+):
+    monkeypatch.setattr(serializers, "file_sha256", lambda file: pytest.fail("hashed after upload"))
+    resume = upload(client, content, django_capture_on_commit_callbacks)
+
+    assert resume.blob.sha256 == hashlib.sha256(content).hexdigest()
+    assert resume.blob.ref_count == 1
+    assert resume.file.name == resume.blob.file.name
+    assert resume.parse_status == Resume.ParseStatus.DONE
+
+
+def test_repeat_upload_reuses_the_file_and_text(
+    client, content, tmp_path, monkeypatch, django_capture_on_commit_callbacks
+):
+    first = upload(client, content, django_capture_on_commit_callbacks)
+    monkeypatch.setattr(tasks, "extract_isolated", lambda *args: pytest.fail("parsed again"))
+    second = upload(client, content, django_capture_on_commit_callbacks)
+
+    assert second.blob_id == first.blob_id
+    assert second.file.name == first.file.name
+    assert ResumeBlob.objects.get().ref_count == 2
+    assert len(stored_files(tmp_path)) == 1
+    assert second.parse_status == Resume.ParseStatus.DONE
+    assert second.parsed_text == first.parsed_text
+    assert second.ats_flags == first.ats_flags
+
+
+def test_other_users_do_not_share_blobs(client, content, django_capture_on_commit_callbacks):
+    first = upload(client, content, django_capture_on_commit_callbacks)
+    client.force_authenticate(User.objects.create_user(email="other@example.com", password="pw"))
+    second = upload(client, content, django_capture_on_commit_callbacks)
+
+    assert second.blob_id != first.blob_id
+    assert second.file.name != first.file.name
+
+
+def test_file_is_deleted_with_its_last_reference(
+    client, content, tmp_path, django_capture_on_commit_callbacks
+):
+    first = upload(client, content, django_capture_on_commit_callbacks)
+    second = upload(client, content, django_capture_on_commit_callbacks)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert client.delete(f"/api/v1/resumes/{first.id}/").status_code == 204
+    assert ResumeBlob.objects.get().ref_count == 1
+    assert len(stored_files(tmp_path)) == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert client.delete(f"/api/v1/resumes/{second.id}/").status_code == 204
+    assert not ResumeBlob.objects.exists()
+    assert stored_files(tmp_path) == []
+
+
+def test_deleting_the_user_deletes_their_blob_files(
+    client, content, tmp_path, django_capture_on_commit_callbacks
+):
+    resume = upload(client, content, django_capture_on_commit_callbacks)
+    upload(client, content, django_capture_on_commit_callbacks)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        resume.user.delete()
+    assert not Resume.objects.exists()
+    assert not ResumeBlob.objects.exists()
+    assert stored_files(tmp_path) == []
@@ -0,0 +1,120 @@
+import httpx
+import pytest
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.resumes.fake_storage import start_fake_storage
+from apps.resumes.models import Resume
+from apps.resumes.tests.test_ats import DOCX_MIME, _docx_bytes
+from apps.resumes.validators import HEADER_SIZE, MAX_FILE_SIZE
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def bucket(settings):
+    server = start_fake_storage()
+    # Configured like prod.py (Django 5.0 drops STORAGES OPTIONS when
+    # overriding it, for DEFAULT_FILE_STORAGE compatibility)
+    settings.AWS_ACCESS_KEY_ID = "test"
+    settings.AWS_SECRET_ACCESS_KEY = "test"
+    settings.AWS_STORAGE_BUCKET_NAME = "resumes"
+    settings.AWS_S3_ENDPOINT_URL = f"http://127.0.0.1:{server.server_port}"
+    settings.AWS_S3_REGION_NAME = "us-east-1"
+    settings.AWS_S3_ADDRESSING_STYLE = "path"
+    settings.AWS_S3_SIGNATURE_VERSION = "s3v4"
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "default": {"BACKEND": "storages.backends.s3boto3.S3Boto3Storage"},
+    }
+    settings.RESUME_DIRECT_UPLOADS = True
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def client():
+    api = APIClient()
+    api.force_authenticate(User.objects.create_user(email="candidate@example.com", password="pw"))
+    return api
+
+
+def presign(client, filename="resume.docx"):
+    response = client.post("/api/v1/resumes/uploads/", {"filename": filename}, format="json")
+    assert response.status_code == 201
+    return response.data
+
+
+def upload(post, content: bytes) -> httpx.Response:
+    return httpx.post(
+        post["url"], data=post["fields"], files={"file": ("resume.docx", content, DOCX_MIME)}
+    )
+
+
+def confirm(client, post):
+    return client.post(
+        "/api/v1/resumes/uploads/confirm/", {"upload_token": post["upload_token"]}, format="json"
+    )
+
+
+def test_direct_upload_reads_only_the_header(client, bucket, django_capture_on_commit_callbacks):
+    content = _docx_bytes()
+    post = presign(client)
+    assert upload(post, content).status_code == 204
+    bucket.requests.clear()
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        response = confirm(client, post)
+
+    assert response.status_code == 201
+    assert response.data["parse_status"] == Resume.ParseStatus.PENDING
+    assert response.data["file_size"] == len(content)
+    assert bucket.requests == [("GET", post["fields"]["key"], f"bytes=0-{HEADER_SIZE - 1}")]
+
+    # The background parse downloads the whole file
+    for callback in callbacks:
+        callback()
+    resume = Resume.objects.get(id=response.data["id"])
+    assert resume.parse_status == Resume.ParseStatus.DONE
+    assert resume.mime_type == DOCX_MIME
+    assert "Work Experience" in resume.parsed_text
+
+    # Confirming again returns the same resume
+    again = confirm(client, post)
+    assert again.status_code == 200 and again.data["id"] == resume.id
+
+
+def test_rejected_upload_is_deleted(client, bucket):
+    post = presign(client)
+    upload(post, b"plain text, not a resume " * 10)
+
+    response = confirm(client, post)
+
+    assert response.status_code == 400
+    assert "Unsupported file type" in str(response.data["upload_token"])
+    assert not bucket.objects
+    assert not Resume.objects.exists()
+
+
+def test_upload_limits(client, bucket):
+    post = presign(client)
+    assert upload(post, b"%PDF" + b"0" * MAX_FILE_SIZE).status_code == 400
+
+    # Not uploaded yet
+    response = confirm(client, post)
+    assert response.status_code == 400
+    assert "Upload not found" in str(response.data["upload_token"])
+
+    other = User.objects.create_user(email="other@example.com", password="pw")
+    stranger = APIClient()
+    stranger.force_authenticate(other)
+    assert confirm(stranger, post).status_code == 400
+
+    bad_name = client.post("/api/v1/resumes/uploads/", {"filename": "resume.exe"}, format="json")
+    assert bad_name.status_code == 400
+
+
+def test_direct_uploads_can_be_disabled(client, settings):
+    settings.RESUME_DIRECT_UPLOADS = False
+    response = client.post("/api/v1/resumes/uploads/", {"filename": "resume.pdf"}, format="json")
+    assert response.status_code == 404
@@ -0,0 +1,85 @@
+import io
+import zipfile
+
+from docx import Document
+
+from apps.resumes.docx_stream import empty_layout, iter_docx_paragraphs
+from apps.resumes.parsers import extract_document_from_docx
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+MC_NS = "http://schemas.openxmlformats.org/markup-compatibility/2006"
+
+
+def _save(doc) -> io.BytesIO:
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def test_paragraphs_tables_headers_and_footers_in_reading_order():
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "Jane Doe | jane@example.com"
+    doc.sections[0].footer.paragraphs[0].text = "References on request"
+    doc.add_paragraph("Summary")
+    table = doc.add_table(rows=2, cols=2)
+    for row, cells in zip(table.rows, [["Skills", "Python, Django"], ["Languages", "English"]]):
+        for cell, text in zip(row.cells, cells):
+            cell.text = text
+    doc.add_paragraph("Education")
+
+    layout = empty_layout()
+    assert list(iter_docx_paragraphs(_save(doc), layout)) == [
+        "Jane Doe | jane@example.com",
+        "Summary",
+        "Skills",
+        "Python, Django",
+        "Languages",
+        "English",
+        "Education",
+        "References on request",
+    ]
+    assert layout == {"tables": 1, "images": 0, "columns": 1, "text_boxes": 0}
+
+
+def _docx_with_body(body: str) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr(
+            "word/document.xml",
+            f'<w:document xmlns:w="{W_NS}" xmlns:mc="{MC_NS}"><w:body>{body}</w:body></w:document>',
+        )
+    buffer.seek(0)
+    return buffer
+
+
+def test_text_boxes_are_read_once_and_runs_keep_tabs_and_breaks():
+    text_box = "<w:txbxContent><w:p><w:r><w:t>Skills: Python</w:t></w:r></w:p></w:txbxContent>"
+    body = (
+        "<w:p><w:r><w:t>Acme</w:t><w:tab/><w:t>2020</w:t><w:br/><w:t>Engineer</w:t></w:r></w:p>"
+        f"<w:p><w:r><mc:AlternateContent><mc:Choice>{text_box}</mc:Choice>"
+        f"<mc:Fallback>{text_box}</mc:Fallback></mc:AlternateContent></w:r></w:p>"
+    )
+    layout = empty_layout()
+    assert list(iter_docx_paragraphs(_docx_with_body(body), layout)) == [
+        "Acme\t2020\nEngineer",
+        "Skills: Python",
+    ]
+    assert layout["text_boxes"] == 1
+
+
+def test_docx_extraction_stops_keeping_text_at_the_budget():
+    doc = Document()
+    for i in range(2000):
+        doc.add_paragraph(f"Shipped feature {i} of the billing service")
+    doc.add_table(rows=1, cols=1)
+    document = extract_document_from_docx(_save(doc), max_chars=1000)
+
+    assert len(document["text"]) == 1000
+    assert document["stats"]["truncated"] is True
+    # The table after the cut-off is still seen
+    assert document["layout"]["tables"] == 1
+
+
+def test_broken_docx_extracts_nothing():
+    assert extract_document_from_docx(io.BytesIO(b"PK\x03\x04 not a zip"))["text"] == ""
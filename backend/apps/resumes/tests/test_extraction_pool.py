@@ -0,0 +1,91 @@
+import pytest
+
+from apps.resumes import extraction_pool, sample_pdfs
+from apps.resumes.extraction_pool import ExtractionError, ExtractionPool
+from apps.resumes.models import Resume
+from apps.resumes.tasks import parse_resume_task
+
+PDF = "application/pdf"
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def make(**options):
+        pool = ExtractionPool(
+            **{"size": 1, "timeout": 10, "memory_limit": 512 * 1024 * 1024, "max_jobs": 50, **options}
+        )
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.close()
+
+
+@pytest.fixture
+def write_pdf(tmp_path):
+    def write(data: bytes) -> str:
+        path = tmp_path / f"{len(list(tmp_path.iterdir()))}.pdf"
+        path.write_bytes(data)
+        return str(path)
+
+    return write
+
+
+def test_workers_extract_and_are_recycled(make_pool, write_pdf):
+    pool = make_pool(max_jobs=2)
+    path = write_pdf(sample_pdfs.resume_pdf())
+
+    replies = [pool.run(path, PDF) for _ in range(3)]
+
+    assert "Work Experience" in replies[0]["document"]["text"]
+    assert replies[0]["document"]["layout"]["pages"] == 2
+    pids = [reply["pid"] for reply in replies]
+    assert pids[0] == pids[1] != pids[2]
+
+
+def test_slow_jobs_are_killed(make_pool, write_pdf):
+    pool = make_pool(timeout=0.2)
+
+    with pytest.raises(ExtractionError, match="timed out"):
+        pool.run(write_pdf(sample_pdfs.operator_flood_pdf(500_000)), PDF)
+
+    # The next job gets a fresh worker
+    assert pool.run(write_pdf(sample_pdfs.resume_pdf()), PDF)["document"]["text"]
+
+
+def test_memory_is_capped(make_pool, write_pdf):
+    limit = 256 * 1024 * 1024
+    pool = make_pool(memory_limit=limit)
+
+    first = pool.run(write_pdf(sample_pdfs.flate_bomb_pdf(300 * 1024 * 1024)), PDF)
+
+    assert first["document"]["text"] == ""
+    assert first["maxrss_kb"] * 1024 < limit
+    # A worker that came close to the limit is not reused
+    second = pool.run(write_pdf(sample_pdfs.resume_pdf()), PDF)
+    assert second["pid"] != first["pid"]
+
+
+@pytest.mark.django_db
+def test_parse_task_records_timeouts(make_pool, monkeypatch, settings, tmp_path):
+    from apps.accounts.models import User
+
+    settings.MEDIA_ROOT = tmp_path
+    (tmp_path / "slow.pdf").write_bytes(sample_pdfs.operator_flood_pdf(500_000))
+    resume = Resume.objects.create(
+        user=User.objects.create_user(email="candidate@example.com", password="pw"),
+        file="slow.pdf",
+        original_filename="slow.pdf",
+        file_size=1,
+        mime_type=PDF,
+    )
+    monkeypatch.setattr(extraction_pool, "_pool", make_pool(timeout=0.2))
+
+    parse_resume_task(resume.id)
+
+    resume.refresh_from_db()
+    assert resume.parse_status == Resume.ParseStatus.FAILED
+    assert "timed out" in resume.parse_error
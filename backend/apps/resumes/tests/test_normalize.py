@@ -0,0 +1,65 @@
+from apps.resumes.normalize import normalize_pages
+
+
+def _page(number: int, body: list[str]) -> str:
+    return "\n".join(["Jane Doe  |  Resume", *body, f"Confidential - page {number} of 3", str(number)])
+
+
+def test_repeated_headers_footers_and_page_numbers_are_dropped():
+    bodies = [["Acme", "Built APIs", "Led a team"], ["Initech", "Ran ETL"], ["Education", "BSc"]]
+    text, stats = normalize_pages([_page(n, body) for n, body in enumerate(bodies, 1)])
+    assert text.splitlines() == [line for body in bodies for line in body]
+    assert stats["chars_removed"] > 0 and stats["tokens_removed"] > 0
+
+
+def test_a_single_page_keeps_its_edges():
+    text, _ = normalize_pages(["Jane Doe\nEngineer\nLondon"])
+    assert text == "Jane Doe\nEngineer\nLondon"
+
+
+def test_hyphenated_words_are_joined():
+    text, _ = normalize_pages(["Led change manage-\nment for 40 people\nPython-\nDeveloper"])
+    assert text == "Led change management for 40 people\nPython-\nDeveloper"
+
+
+def test_unicode_is_folded():
+    text, _ = normalize_pages(["\u2022 E\ufb03cient \u201cwork\ufb02ow\u201d tools\u00ad\u200b"])
+    assert text == '- Efficient "workflow" tools'
+
+
+def test_whitespace_is_collapsed():
+    text, stats = normalize_pages(["  Senior\t\u00a0 Engineer  \n\n\n\nAcme   Corp  "])
+    assert text == "Senior Engineer\n\nAcme Corp"
+    assert stats["chars_removed"] == len("  Senior\t\u00a0 Engineer  \n\n\n\nAcme   Corp  ") - len(text)
+
+
+def test_years_and_numbers_are_not_page_numbers():
+    text, _ = normalize_pages(["Education\n2019\nTeam of\n150\n(415)\nPage 1 of 1"])
+    assert text == "Education\n2019\nTeam of\n150\n(415)"
+
+
+def test_page_number_formats_are_dropped():
+    for line in ["Page 2", "page 2 of 3", "2 of 3", "2/3", "- 2 -", "– 2 –"]:
+        assert normalize_pages([f"Summary\n{line}"])[0] == "Summary"
+
+
+def test_date_ranges_and_years_across_pages_are_kept():
+    pages = [
+        "Jane Doe\nAcme 2019-2021\nBuilt APIs\nLed a team\n2019\nPage 1 of 2",
+        "Jane Doe\nAcme 2021-2023\nRan ETL\nBSc, Initech 2019-2021\nPage 2 of 2",
+    ]
+    text, _ = normalize_pages(pages)
+    assert text.splitlines() == [
+        "Acme 2019-2021", "Built APIs", "Led a team", "2019",
+        "Acme 2021-2023", "Ran ETL", "BSc, Initech 2019-2021",
+    ]
+
+
+def test_repeated_lines_away_from_page_edges_are_kept():
+    pages = [
+        "Jane Doe\nSummary\nPython\nDjango\nAWS\nReferences",
+        "Jane Doe\nProjects\nPython\nAPIs\nETL\nReferences",
+    ]
+    text, _ = normalize_pages(pages)
+    assert text.count("Python") == 2
+    assert "Jane Doe" not in text
@@ -0,0 +1,71 @@
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.resumes import tasks
+from apps.resumes.models import Resume
+from apps.resumes.sample_pdfs import build_pdf
+from apps.resumes.signals import resume_parsed
+from apps.resumes.tests.test_ats import DOCX_MIME, _docx_bytes
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def client(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    api = APIClient()
+    api.force_authenticate(User.objects.create_user(email="candidate@example.com", password="pw"))
+    return api
+
+
+def upload(client):
+    file = SimpleUploadedFile("resume.docx", _docx_bytes(), content_type=DOCX_MIME)
+    return client.post("/api/v1/resumes/", {"file": file}, format="multipart")
+
+
+def test_upload_returns_before_parsing(client, monkeypatch, django_capture_on_commit_callbacks):
+    monkeypatch.setattr(tasks, "extract_isolated", lambda *args: pytest.fail("parsed in request"))
+    with django_capture_on_commit_callbacks() as callbacks:
+        response = upload(client)
+
+    assert response.status_code == 201
+    assert response.data["parse_status"] == Resume.ParseStatus.PENDING
+    assert Resume.objects.get(id=response.data["id"]).parsed_text == ""
+    assert len(callbacks) == 1
+
+
+def test_parse_task_extracts_text_and_signals(client, django_capture_on_commit_callbacks):
+    parsed = []
+
+    def receiver(sender, resume, **kwargs):
+        parsed.append(resume)
+
+    resume_parsed.connect(receiver)
+    try:
+        with django_capture_on_commit_callbacks(execute=True):
+            response = upload(client)
+    finally:
+        resume_parsed.disconnect(receiver)
+
+    resume = Resume.objects.get(id=response.data["id"])
+    assert resume.parse_status == Resume.ParseStatus.DONE
+    assert "Work Experience" in resume.parsed_text
+    assert resume.text_stats and resume.ats_flags == []
+    assert [r.id for r in parsed] == [resume.id]
+
+    # A repeated task (redelivery) leaves the parsed resume alone
+    tasks.parse_resume_task(resume.id)
+    assert Resume.objects.get(id=resume.id).parsed_text == resume.parsed_text
+
+
+def test_resume_without_text_fails_to_parse(client, django_capture_on_commit_callbacks):
+    # A PDF with no text layer, like a scan
+    file = SimpleUploadedFile("scan.pdf", build_pdf([b"BT ET"]), content_type="application/pdf")
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post("/api/v1/resumes/", {"file": file}, format="multipart")
+
+    resume = Resume.objects.get(id=response.data["id"])
+    assert resume.parse_status == Resume.ParseStatus.FAILED
+    assert resume.parse_error == tasks.NO_TEXT_ERROR
@@ -0,0 +1,56 @@
+import io
+import string
+
+import pytest
+from django.test import override_settings
+
+from apps.analysis.ai_service import resume_prompt_block
+from apps.resumes.normalize import truncate_text
+from apps.resumes.parsers import extract_document_from_pdf
+from apps.resumes.sample_pdfs import build_pdf, text_stream
+
+
+def _long_pdf(pages: int) -> bytes:
+    # Lines differ in words, not just digits, so normalization keeps them
+    words = string.ascii_lowercase
+    return build_pdf([
+        text_stream([f"Project {words[page % 26]}{words[line % 26]} shipped a Django service" for line in range(40)])
+        for page in range(pages)
+    ])
+
+
+def test_pdf_extraction_stops_at_the_budget():
+    data = _long_pdf(30)
+    full = extract_document_from_pdf(io.BytesIO(data))
+    document = extract_document_from_pdf(io.BytesIO(data), max_chars=5000)
+
+    assert len(full["text"]) > 5000
+    assert document["text"] == full["text"][:5000]
+    assert document["layout"]["pages"] == 30
+    assert document["stats"]["truncated"] is True
+    assert document["stats"]["pages_extracted"] < 30
+    assert full["stats"] == {**full["stats"], "pages_extracted": 30, "truncated": False}
+
+
+def test_pdf_under_the_budget_is_read_whole():
+    document = extract_document_from_pdf(io.BytesIO(_long_pdf(2)), max_chars=50_000)
+    assert document["stats"]["pages_extracted"] == 2
+    assert document["stats"]["truncated"] is False
+
+
+@pytest.mark.parametrize("text, max_chars, expected", [
+    ("abcdef", None, ("abcdef", False)),
+    ("abcdef", 6, ("abcdef", False)),
+    ("abcdef", 4, ("abcd", True)),
+])
+def test_truncate_text(text, max_chars, expected):
+    assert truncate_text(text, max_chars) == expected
+
+
+@override_settings(RESUME_MAX_CHARS=10)
+def test_prompt_block_uses_the_extraction_budget():
+    resume_prompt_block.cache_clear()
+    try:
+        assert resume_prompt_block("x" * 50) == f"<resume>\n{'x' * 10}\n</resume>"
+    finally:
+        resume_prompt_block.cache_clear()
@@ -1,8 +1,15 @@
 from django.urls import path
 
-from .views import ResumeListCreateView, ResumeDetailView
+from .views import (
+    DirectUploadConfirmView,
+    DirectUploadView,
+    ResumeDetailView,
+    ResumeListCreateView,
+)
 
 urlpatterns = [
     path("", ResumeListCreateView.as_view(), name="resume-list-create"),
     path("<int:pk>/", ResumeDetailView.as_view(), name="resume-detail"),
+    path("uploads/", DirectUploadView.as_view(), name="resume-direct-upload"),
+    path("uploads/confirm/", DirectUploadConfirmView.as_view(), name="resume-direct-upload-confirm"),
 ]
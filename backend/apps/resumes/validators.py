@@ -2,6 +2,8 @@ import filetype
 from django.core.exceptions import ValidationError
 
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5 MB
+# Bytes read for magic-byte detection
+HEADER_SIZE = 2048
 
 ALLOWED_MIME_TYPES = {
     "application/pdf",
@@ -14,15 +16,27 @@ def validate_resume_file(file):
     Validate upload by reading magic bytes (not trusting extension).
     Raises ValidationError on failure.
     """
-    if file.size > MAX_FILE_SIZE:
-        raise ValidationError(
-            f"File too large. Maximum allowed size is 5 MB; received {file.size} bytes."
-        )
+    validate_file_size(file.size)
 
     # Read first 2 KB for MIME detection
-    header = file.read(2048)
+    header = file.read(HEADER_SIZE)
     file.seek(0)
 
+    return detect_mime_type(header)
+
+
+def validate_file_size(size: int) -> None:
+    if size > MAX_FILE_SIZE:
+        raise ValidationError(
+            f"File too large. Maximum allowed size is 5 MB; received {size} bytes."
+        )
+
+
+def detect_mime_type(header: bytes) -> str:
+    """
+    MIME type of a file from its first HEADER_SIZE bytes. Raises
+    ValidationError unless it is an accepted type.
+    """
     kind = filetype.guess(header)
     detected_mime = kind.mime if kind else "application/octet-stream"
     if detected_mime not in ALLOWED_MIME_TYPES:
@@ -1,10 +1,15 @@
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.views import APIView
 
+from .blobs import Sha256UploadHandler, release_blob
 from .models import Resume
-from .serializers import ResumeSerializer
+from .direct_upload import create_presigned_post, direct_uploads_enabled
+from .serializers import DirectUploadConfirmSerializer, DirectUploadSerializer, ResumeSerializer
+from .tasks import parse_resume_task
 
 
 class ResumeListCreateView(generics.ListCreateAPIView):
@@ -15,8 +20,69 @@ class ResumeListCreateView(generics.ListCreateAPIView):
         # Always scoped to the authenticated user — no cross-user access
         return Resume.objects.filter(user=self.request.user)
 
+    def initial(self, request, *args, **kwargs):
+        # Hash uploads as they stream in; installed before request.data is
+        # parsed
+        self.upload_hasher = Sha256UploadHandler(request._request)
+        request.upload_handlers.insert(0, self.upload_hasher)
+        super().initial(request, *args, **kwargs)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["upload_digests"] = self.upload_hasher.digests
+        return context
+
     def perform_create(self, serializer):
-        serializer.save()
+        resume = serializer.save()
+        # Parsing a large PDF can take seconds; the upload returns without it.
+        # A repeat upload of an already parsed file needs no parse at all
+        if resume.parse_status == Resume.ParseStatus.PENDING:
+            transaction.on_commit(lambda: parse_resume_task.delay(resume.id))
+
+
+def _direct_uploads_disabled():
+    return Response(
+        {"detail": "Direct uploads are not enabled; POST the file to /api/v1/resumes/."},
+        status=status.HTTP_404_NOT_FOUND,
+    )
+
+
+class DirectUploadView(APIView):
+    """
+    POST /api/v1/resumes/uploads/ — a presigned POST for uploading a resume
+    straight to the bucket, and the token to confirm it with.
+    """
+
+    def post(self, request):
+        if not direct_uploads_enabled():
+            return _direct_uploads_disabled()
+        serializer = DirectUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(
+            create_presigned_post(request.user, serializer.validated_data["filename"]),
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class DirectUploadConfirmView(APIView):
+    """
+    POST /api/v1/resumes/uploads/confirm/ — check an uploaded object's size
+    and magic bytes and create its Resume; parsing runs in the background.
+    """
+
+    def post(self, request):
+        if not direct_uploads_enabled():
+            return _direct_uploads_disabled()
+        serializer = DirectUploadConfirmSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        existing = serializer.existing
+        resume = serializer.save()
+        if existing is None:
+            transaction.on_commit(lambda: parse_resume_task.delay(resume.id))
+        return Response(
+            ResumeSerializer(resume, context={"request": request}).data,
+            status=status.HTTP_200_OK if existing else status.HTTP_201_CREATED,
+        )
 
 
 class ResumeDetailView(generics.RetrieveDestroyAPIView):
@@ -27,6 +93,12 @@ class ResumeDetailView(generics.RetrieveDestroyAPIView):
         return get_object_or_404(Resume, id=self.kwargs["pk"], user=self.request.user)
 
     def perform_destroy(self, instance):
-        # Remove the physical file from storage before deleting the DB row
-        instance.file.delete(save=False)
-        instance.delete()
+        if instance.blob_id is None:
+            # Not shared: remove the physical file before deleting the DB row
+            instance.file.delete(save=False)
+            instance.delete()
+            return
+        # The stored file goes with the last resume using it
+        with transaction.atomic():
+            instance.delete()
+            release_blob(instance.blob_id)
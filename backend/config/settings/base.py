@@ -1,6 +1,7 @@
 from pathlib import Path
 from datetime import timedelta
 from decouple import config, Csv
+from kombu import Queue
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
@@ -117,6 +118,161 @@ ANTHROPIC_API_KEY = config("ANTHROPIC_API_KEY", default="")
 ANTHROPIC_MODEL = config("ANTHROPIC_MODEL", default="claude-sonnet-4-6")
 OPENAI_API_KEY = config("OPENAI_API_KEY", default="")
 OPENAI_MODEL = config("OPENAI_MODEL", default="gpt-4o")
+# Mark the instructions + resume prefix cacheable on Anthropic (OpenAI caches
+# long prefixes automatically)
+ANTHROPIC_PROMPT_CACHING = config("ANTHROPIC_PROMPT_CACHING", default=True, cast=bool)
+
+# Provider HTTP clients are pooled per worker process (apps/analysis/providers.py).
+# Base URLs are blank for the public APIs; point them at a local stand-in to test.
+# *_MAX_CONCURRENCY caps the provider's in-flight requests per process, sync
+# and async calls together.
+ANTHROPIC_BASE_URL = config("ANTHROPIC_BASE_URL", default="")
+ANTHROPIC_CONNECT_TIMEOUT = config("ANTHROPIC_CONNECT_TIMEOUT", default=5.0, cast=float)  # seconds
+ANTHROPIC_READ_TIMEOUT = config("ANTHROPIC_READ_TIMEOUT", default=120.0, cast=float)  # seconds
+ANTHROPIC_MAX_CONCURRENCY = config("ANTHROPIC_MAX_CONCURRENCY", default=8, cast=int)
+OPENAI_BASE_URL = config("OPENAI_BASE_URL", default="")
+OPENAI_CONNECT_TIMEOUT = config("OPENAI_CONNECT_TIMEOUT", default=5.0, cast=float)  # seconds
+OPENAI_READ_TIMEOUT = config("OPENAI_READ_TIMEOUT", default=120.0, cast=float)  # seconds
+OPENAI_MAX_CONCURRENCY = config("OPENAI_MAX_CONCURRENCY", default=8, cast=int)
+AI_HTTP_KEEPALIVE_EXPIRY = config("AI_HTTP_KEEPALIVE_EXPIRY", default=60.0, cast=float)  # seconds
+
+# Failover / hedging between Claude and OpenAI (both API keys must be set).
+# With failover on, an error from the primary retries on the other provider.
+# With hedging on, a primary slower than AI_HEDGE_PERCENTILE of its recent
+# latency is raced against the secondary and the first valid answer wins;
+# hedging implies failover.
+AI_FAILOVER_ENABLED = config("AI_FAILOVER_ENABLED", default=False, cast=bool)
+AI_HEDGING_ENABLED = config("AI_HEDGING_ENABLED", default=False, cast=bool)
+AI_HEDGE_PERCENTILE = config("AI_HEDGE_PERCENTILE", default=90, cast=int)
+AI_HEDGE_LATENCY_WINDOW = config("AI_HEDGE_LATENCY_WINDOW", default=200, cast=int)  # samples
+AI_HEDGE_MIN_SAMPLES = config("AI_HEDGE_MIN_SAMPLES", default=20, cast=int)
+AI_HEDGE_DEFAULT_DELAY = config("AI_HEDGE_DEFAULT_DELAY", default=30.0, cast=float)  # seconds
+AI_HEDGE_MIN_DELAY = config("AI_HEDGE_MIN_DELAY", default=5.0, cast=float)  # seconds
+# Circuit breaker: open after N consecutive errors, retry after the timeout
+AI_CIRCUIT_FAILURE_THRESHOLD = config("AI_CIRCUIT_FAILURE_THRESHOLD", default=5, cast=int)
+AI_CIRCUIT_RESET_TIMEOUT = config("AI_CIRCUIT_RESET_TIMEOUT", default=60.0, cast=float)  # seconds
+
+# Cluster-wide provider rate limits, shared by every worker through Redis
+# token buckets (apps/analysis/rate_limit.py). Set them to your account
+# tier's limits; 0 leaves that dimension unlimited. A call waits at most
+# AI_RATE_LIMIT_MAX_WAIT for capacity before it fails as transient.
+AI_RATE_LIMIT_ENABLED = config("AI_RATE_LIMIT_ENABLED", default=True, cast=bool)
+ANTHROPIC_RPM_LIMIT = config("ANTHROPIC_RPM_LIMIT", default=50, cast=int)
+ANTHROPIC_TPM_LIMIT = config("ANTHROPIC_TPM_LIMIT", default=40000, cast=int)
+OPENAI_RPM_LIMIT = config("OPENAI_RPM_LIMIT", default=500, cast=int)
+OPENAI_TPM_LIMIT = config("OPENAI_TPM_LIMIT", default=30000, cast=int)
+AI_RATE_LIMIT_MAX_WAIT = config("AI_RATE_LIMIT_MAX_WAIT", default=30.0, cast=float)  # seconds
+
+# run_analysis_task retries transient provider errors (429, 5xx, timeouts)
+# after a jittered exponential backoff: up to BASE * 2**attempt seconds,
+# capped at MAX, and never sooner than the provider's Retry-After
+ANALYSIS_RETRY_BACKOFF_BASE = config("ANALYSIS_RETRY_BACKOFF_BASE", default=10.0, cast=float)  # seconds
+ANALYSIS_RETRY_BACKOFF_MAX = config("ANALYSIS_RETRY_BACKOFF_MAX", default=300.0, cast=float)  # seconds
+
+# Seconds before a worker picks up a streaming analysis whose SSE stream was
+# never opened
+ANALYSIS_STREAM_FALLBACK_DELAY = config("ANALYSIS_STREAM_FALLBACK_DELAY", default=60, cast=int)
+
+# Status push (GET /analysis/<id>/events/): heartbeat interval and the longest
+# a single event stream is held open before the client must reconnect
+ANALYSIS_EVENTS_HEARTBEAT = config("ANALYSIS_EVENTS_HEARTBEAT", default=15, cast=int)  # seconds
+ANALYSIS_EVENTS_MAX_DURATION = config("ANALYSIS_EVENTS_MAX_DURATION", default=300, cast=int)  # seconds
+
+# How queued analyses run: "celery" (one prefork process per in-flight call) or
+# "async" (run_async_analysis_worker multiplexes many calls per process). In
+# async mode raise ANTHROPIC/OPENAI_MAX_CONCURRENCY to match the concurrency.
+ANALYSIS_EXECUTION_MODE = config("ANALYSIS_EXECUTION_MODE", default="celery")
+ANALYSIS_ASYNC_CONCURRENCY = config("ANALYSIS_ASYNC_CONCURRENCY", default=50, cast=int)
+# An async worker whose heartbeat is this old is presumed dead: the analyses
+# it had taken are requeued (counting as a retry) by the workers still running
+ANALYSIS_ASYNC_VISIBILITY_TIMEOUT = config("ANALYSIS_ASYNC_VISIBILITY_TIMEOUT", default=60, cast=int)  # seconds
+
+# Workers run an analysis as concurrent section calls (score, bullets, cover
+# letter), saving each as it finishes, so the score is ready in seconds.
+# The SSE stream endpoint always uses one streamed call.
+ANALYSIS_SPLIT_SECTIONS = config("ANALYSIS_SPLIT_SECTIONS", default=True, cast=bool)
+
+# Worker queue per AnalysisResult.origin, so batches and backfills never
+# delay a paying user's single analysis. Run a worker pool per queue
+# (celery worker -Q analysis.interactive) to size each separately; a worker
+# consuming several queues polls them in a random order weighted by
+# ANALYSIS_QUEUE_WEIGHTS (Celery via CELERY_BROKER_TRANSPORT_OPTIONS, and
+# run_async_analysis_worker). Queue waits: analysis_queue_stats.
+ANALYSIS_QUEUES = {
+    "paid": "analysis.interactive",
+    "staff": "analysis.staff",
+    "batch": "analysis.bulk",
+    "backfill": "analysis.bulk",
+}
+ANALYSIS_QUEUE_WEIGHTS = {
+    "analysis.interactive": config("ANALYSIS_QUEUE_WEIGHT_INTERACTIVE", default=6, cast=int),
+    "analysis.staff": config("ANALYSIS_QUEUE_WEIGHT_STAFF", default=3, cast=int),
+    "analysis.bulk": config("ANALYSIS_QUEUE_WEIGHT_BULK", default=1, cast=int),
+}
+
+# Estimated-token budget for the resume in the prompt. Longer resumes keep
+# their most recent lines and key sections (apps/analysis/compression.py),
+# the same for every JD so the resume stays a cached prompt prefix; up to
+# ANALYSIS_RESUME_EXCERPT_BUDGET tokens of the left-out lines that match the
+# JD follow after the prefix (0 disables)
+ANALYSIS_RESUME_TOKEN_BUDGET = config("ANALYSIS_RESUME_TOKEN_BUDGET", default=1500, cast=int)
+ANALYSIS_RESUME_EXCERPT_BUDGET = config("ANALYSIS_RESUME_EXCERPT_BUDGET", default=300, cast=int)
+
+# Follow-up requests, per provider call, for the fields a response that hit
+# max_tokens (or came back malformed) is missing, instead of a full rerun
+ANALYSIS_MAX_CONTINUATIONS = config("ANALYSIS_MAX_CONTINUATIONS", default=1, cast=int)
+
+# When every provider call for an analysis fails, finish it with the local
+# keyword pre-score (flagged is_degraded) instead of failing it outright
+ANALYSIS_DEGRADED_FALLBACK = config("ANALYSIS_DEGRADED_FALLBACK", default=True, cast=bool)
+
+# Most job descriptions accepted by one POST /analysis/batch/ request
+ANALYSIS_BATCH_MAX_JOBS = config("ANALYSIS_BATCH_MAX_JOBS", default=25, cast=int)
+
+# Offline bulk mode (run_bulk_analyses): analyses created with mode "bulk" are
+# submitted through the provider batch APIs in groups of up to this many
+ANALYSIS_BULK_MAX_REQUESTS = config("ANALYSIS_BULK_MAX_REQUESTS", default=5000, cast=int)
+ANALYSIS_BULK_POLL_INTERVAL = config("ANALYSIS_BULK_POLL_INTERVAL", default=60, cast=int)  # seconds
+
+# --- Analysis result cache ---
+# Entries are keyed on a hash of the prompt inputs, provider, model and prompt
+# version, so a model or prompt change invalidates them automatically.
+ANALYSIS_CACHE_ENABLED = config("ANALYSIS_CACHE_ENABLED", default=True, cast=bool)
+ANALYSIS_CACHE_TTL = config("ANALYSIS_CACHE_TTL", default=7 * 24 * 3600, cast=int)  # seconds
+
+# Near-duplicate JDs (apps/analysis/near_duplicates.py): a new analysis of a
+# resume against a JD at least this similar (estimated Jaccard similarity of
+# word shingles) to one it was analyzed against within ANALYSIS_CACHE_TTL
+# reuses that analysis
+ANALYSIS_NEAR_DUPLICATE_ENABLED = config("ANALYSIS_NEAR_DUPLICATE_ENABLED", default=True, cast=bool)
+ANALYSIS_NEAR_DUPLICATE_THRESHOLD = config("ANALYSIS_NEAR_DUPLICATE_THRESHOLD", default=0.9, cast=float)
+
+# --- Direct resume uploads ---
+# With S3 storage, clients can upload resumes straight to the bucket with a
+# presigned POST and then confirm them (apps/resumes/direct_upload.py), so
+# file bytes never pass through the web tier. The bucket needs a CORS rule
+# allowing POST from the frontend origin.
+RESUME_DIRECT_UPLOADS = config("RESUME_DIRECT_UPLOADS", default=False, cast=bool)
+RESUME_UPLOAD_URL_TTL = config("RESUME_UPLOAD_URL_TTL", default=600, cast=int)  # seconds
+# How long after the presigned POST is issued the upload can be confirmed
+RESUME_UPLOAD_TOKEN_MAX_AGE = config("RESUME_UPLOAD_TOKEN_MAX_AGE", default=3600, cast=int)  # seconds
+
+# --- Resume text extraction ---
+# Characters of resume text kept: PDF extraction stops at the page that
+# fills it, and the prompt builder truncates to it too
+RESUME_MAX_CHARS = config("RESUME_MAX_CHARS", default=16000, cast=int)
+# parse_resume_task extracts text in separate worker processes
+# (apps/resumes/extraction_pool.py): this many per Celery process, each
+# killed after RESUME_EXTRACTION_TIMEOUT seconds on a job, limited to
+# RESUME_EXTRACTION_MEMORY_LIMIT bytes of address space and replaced after
+# RESUME_EXTRACTION_MAX_JOBS jobs
+RESUME_EXTRACTION_ISOLATED = config("RESUME_EXTRACTION_ISOLATED", default=True, cast=bool)
+RESUME_EXTRACTION_WORKERS = config("RESUME_EXTRACTION_WORKERS", default=1, cast=int)
+RESUME_EXTRACTION_TIMEOUT = config("RESUME_EXTRACTION_TIMEOUT", default=20, cast=float)
+RESUME_EXTRACTION_MEMORY_LIMIT = config(
+    "RESUME_EXTRACTION_MEMORY_LIMIT", default=512 * 1024 * 1024, cast=int
+)
+RESUME_EXTRACTION_MAX_JOBS = config("RESUME_EXTRACTION_MAX_JOBS", default=50, cast=int)
 
 # --- Frontend origin (used for Stripe redirect URLs) ---
 FRONTEND_ORIGIN = config("FRONTEND_ORIGIN", default="http://localhost:5173")
@@ -128,10 +284,37 @@ STRIPE_WEBHOOK_SECRET = config("STRIPE_WEBHOOK_SECRET", default="")
 STRIPE_UPLOAD_PRICE_USD = config("STRIPE_UPLOAD_PRICE_USD", default="2.00")
 STRIPE_CURRENCY = config("STRIPE_CURRENCY", default="usd")
 
+# --- Redis ---
+REDIS_URL = config("REDIS_URL", default="redis://localhost:6379/0")
+
+# --- Caches ---
+# "analysis" holds cached analysis results and counters. Redis evicts under
+# memory pressure according to its maxmemory-policy — run it with
+# volatile-lru so only TTL'd cache entries (never Celery queues) are dropped.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "analysis": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+        "KEY_PREFIX": "resume_roaster",
+        "TIMEOUT": ANALYSIS_CACHE_TTL,
+    },
+}
+
 # --- Celery ---
-CELERY_BROKER_URL = config("REDIS_URL", default="redis://localhost:6379/0")
-CELERY_RESULT_BACKEND = config("REDIS_URL", default="redis://localhost:6379/0")
+CELERY_BROKER_URL = REDIS_URL
+CELERY_RESULT_BACKEND = REDIS_URL
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "UTC"
+# Workers consume every analysis queue plus the default one unless started
+# with -Q; analyses are long, so each process reserves one task at a time
+CELERY_TASK_QUEUES = [
+    Queue("celery"),
+    *(Queue(name) for name in dict.fromkeys(ANALYSIS_QUEUES.values())),
+]
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_BROKER_TRANSPORT_OPTIONS = {"queue_order_strategy": "apps.analysis.queues:weighted_cycle"}
@@ -20,6 +20,25 @@ CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:5173",
 ]
 
+# In-process cache in dev (no Redis needed); LocMemCache evicts least
+# recently used entries once MAX_ENTRIES is reached. It is per-process, so
+# entries and counters are not shared with a separate Celery worker or with
+# the analysis_cache_stats command — point CACHES at Redis to see them.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "analysis": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "analysis",
+        "TIMEOUT": ANALYSIS_CACHE_TTL,  # noqa: F405
+        "OPTIONS": {"MAX_ENTRIES": 1000},
+    },
+}
+
+# No shared Redis in dev, so no cluster-wide provider rate limiting
+AI_RATE_LIMIT_ENABLED = False
+
 # Email — print to console in dev
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
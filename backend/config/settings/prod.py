@@ -29,6 +29,7 @@ AWS_QUERYSTRING_EXPIRE = 900         # 15-min TTL
 AWS_S3_SIGNATURE_VERSION = "s3v4"
 AWS_S3_FILE_OVERWRITE = False
 AWS_S3_ADDRESSING_STYLE = "path"     # required for non-AWS S3-compatible endpoints
+RESUME_DIRECT_UPLOADS = config("RESUME_DIRECT_UPLOADS", default=True, cast=bool)
 
 # --- Security headers ---
 # Railway terminates TLS at its proxy; SSL redirect is handled there.
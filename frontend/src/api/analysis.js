@@ -1,6 +1,11 @@
 import client from './client'
+import { readEventStream } from './sse'
 
 export const analysisApi = {
   create: (data) => client.post('/analysis/', data),
   get: (id) => client.get(`/analysis/${id}/`),
+  createBatch: (data) => client.post('/analysis/batch/', data),
+  getBatch: (id) => client.get(`/analysis/batch/${id}/`),
+  stream: (id, onEvent) => readEventStream(`/analysis/${id}/stream/`, onEvent),
+  events: (id, onEvent) => readEventStream(`/analysis/${id}/events/`, onEvent),
 }
@@ -1,3 +1,4 @@
+import axios from 'axios'
 import client from './client'
 
 export const resumeApi = {
@@ -6,6 +7,18 @@ export const resumeApi = {
     client.post('/resumes/', formData, {
       headers: { 'Content-Type': 'multipart/form-data' },
     }),
+  // Direct-to-bucket upload: presigned POST, upload, confirm
+  presignUpload: (filename) => client.post('/resumes/uploads/', { filename }),
+  uploadToBucket: ({ url, fields }, file) => {
+    const formData = new FormData()
+    Object.entries(fields).forEach(([name, value]) => formData.append(name, value))
+    // The bucket requires the file to be the last field
+    formData.append('file', file)
+    // Plain axios: the bucket must not receive the API's Authorization header
+    return axios.post(url, formData)
+  },
+  confirmUpload: (uploadToken) =>
+    client.post('/resumes/uploads/confirm/', { upload_token: uploadToken }),
   get: (id) => client.get(`/resumes/${id}/`),
   delete: (id) => client.delete(`/resumes/${id}/`),
 }
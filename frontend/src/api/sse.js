@@ -0,0 +1,35 @@
+// Minimal Server-Sent Events reader built on fetch, so the JWT can travel in
+// the Authorization header (EventSource cannot set request headers).
+export async function readEventStream(path, onEvent) {
+  const base = import.meta.env.VITE_API_BASE_URL || '/api/v1'
+  const token = localStorage.getItem('access_token')
+  const response = await fetch(`${base}${path}`, {
+    headers: {
+      Accept: 'text/event-stream',
+      ...(token ? { Authorization: `Bearer ${token}` } : {}),
+    },
+  })
+  if (!response.ok) {
+    throw new Error(`Event stream failed with status ${response.status}`)
+  }
+
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader()
+  let buffer = ''
+  for (;;) {
+    const { value, done } = await reader.read()
+    if (done) break
+    buffer += value
+    let boundary
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const frame = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+      let event = 'message'
+      const data = []
+      for (const line of frame.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7)
+        else if (line.startsWith('data: ')) data.push(line.slice(6))
+      }
+      if (data.length) onEvent(event, JSON.parse(data.join('\n')))
+    }
+  }
+}
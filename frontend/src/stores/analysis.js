@@ -4,6 +4,7 @@ import { analysisApi } from '../api/analysis'
 
 const POLL_INTERVAL_MS = 3000
 const MAX_POLL_ATTEMPTS = 60
+const MAX_EVENT_RECONNECTS = 3
 
 export const useAnalysisStore = defineStore('analysis', () => {
   const current = ref(null)
@@ -20,6 +21,7 @@ export const useAnalysisStore = defineStore('analysis', () => {
         job_description: jobDescription,
         job_title: jobTitle,
         company,
+        stream: true,
       })
       current.value = data
       return data
@@ -54,5 +56,54 @@ export const useAnalysisStore = defineStore('analysis', () => {
     })
   }
 
-  return { current, loading, error, submitAnalysis, pollAnalysis }
+  // Wait for a queued analysis to finish using pushed status events; the
+  // server closes the stream periodically, so reconnect until it is done and
+  // fall back to interval polling if the event stream is unavailable.
+  async function waitForAnalysis(id) {
+    try {
+      for (let attempt = 0; attempt < MAX_EVENT_RECONNECTS; attempt++) {
+        await analysisApi.events(id, (event, data) => {
+          if (event === 'status' || event === 'field') {
+            current.value = { ...current.value, ...data }
+          } else if (event === 'done') {
+            current.value = data
+          }
+        })
+        const status = current.value?.status
+        if (status === 'done' || status === 'failed') return current.value
+      }
+      throw new Error('Analysis timed out.')
+    } catch {
+      return pollAnalysis(id)
+    }
+  }
+
+  // Run the analysis over the SSE endpoint, merging fields into `current` as
+  // they arrive. If the stream ends without a result (e.g. a worker already
+  // owns the analysis), wait for its pushed status instead.
+  async function streamAnalysis(id) {
+    await analysisApi.stream(id, (event, data) => {
+      if (event === 'status' || event === 'field') {
+        current.value = { ...current.value, ...data }
+      } else if (event === 'delta') {
+        const [key, text] = Object.entries(data)[0]
+        current.value = { ...current.value, [key]: (current.value?.[key] || '') + text }
+      } else if (event === 'done') {
+        current.value = data
+      }
+    })
+    const status = current.value?.status
+    if (status === 'done' || status === 'failed') return current.value
+    return waitForAnalysis(id)
+  }
+
+  return {
+    current,
+    loading,
+    error,
+    submitAnalysis,
+    pollAnalysis,
+    waitForAnalysis,
+    streamAnalysis,
+  }
 })
@@ -21,10 +21,30 @@ export const useResumeStore = defineStore('resume', () => {
   }
 
   async function uploadResume(file) {
+    const data = (await uploadDirect(file)) || (await uploadThroughApi(file))
+    resumes.value.unshift(data)
+    return data
+  }
+
+  // Straight to the bucket; null when the server has direct uploads disabled
+  async function uploadDirect(file) {
+    let response
+    try {
+      response = await resumeApi.presignUpload(file.name)
+    } catch (e) {
+      if (e.response?.status === 404) return null
+      throw e
+    }
+    const post = response.data
+    await resumeApi.uploadToBucket(post, file)
+    const { data } = await resumeApi.confirmUpload(post.upload_token)
+    return data
+  }
+
+  async function uploadThroughApi(file) {
     const formData = new FormData()
     formData.append('file', file)
     const { data } = await resumeApi.upload(formData)
-    resumes.value.unshift(data)
     return data
   }
 